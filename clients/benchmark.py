@@ -0,0 +1,199 @@
+"""
+MiniCoin Benchmark - Gerador de carga para medir vazão e latência
+Abre N conexões com o servidor MiniCoin e dispara uma mistura
+configurável de requisições, em laço fechado (cada conexão envia a
+próxima requisição assim que recebe a resposta) ou em laço aberto
+(requisições chegam a uma taxa fixa, independente das respostas).
+
+O relatório, em JSON, contém:
+- Operações por segundo
+- Latência p50/p95/p99/p999 (ms)
+- Contagem de operações e erros por ação
+
+No laço aberto a latência é medida a partir do instante em que a
+requisição deveria ter sido enviada, evitando a omissão coordenada.
+"""
+
+import asyncio
+import logging
+import math
+import random
+import time
+from typing import Dict, List, Optional
+
+from clients.simulator import MiniCoinClient, PooledConnection
+
+
+DEFAULT_MIX = {"deposit": 40, "withdraw": 20, "balance": 30, "history": 5, "verify": 5}
+PERCENTILES = (("p50", 0.50), ("p95", 0.95), ("p99", 0.99), ("p999", 0.999))
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """
+    Converte "deposit=50,balance=30,..." em um dicionário de pesos.
+
+    Raises:
+        ValueError: Ação desconhecida ou peso inválido
+    """
+    mix = {}
+    for item in text.split(","):
+        if not item.strip():
+            continue
+        action, _, weight = item.partition("=")
+        action = action.strip().lower()
+        if action not in DEFAULT_MIX:
+            raise ValueError(f"Unknown action in mix: {action}")
+        mix[action] = float(weight) if weight else 1.0
+        if mix[action] < 0:
+            raise ValueError(f"Negative weight for {action}")
+    if not any(mix.values()):
+        raise ValueError("Request mix must have at least one positive weight")
+    return mix
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Percentil pelo método do posto mais próximo (lista já ordenada)."""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(round(fraction * len(sorted_values), 9))
+    return sorted_values[max(0, min(len(sorted_values), rank) - 1)]
+
+
+class LoadGenerator:
+    """
+    Executa um benchmark contra um servidor MiniCoin.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8888,
+                 connections: int = 8, mix: Optional[Dict[str, float]] = None,
+                 duration: float = 10.0, rate: Optional[float] = None,
+                 account: Optional[str] = None, history_limit: int = 50,
+                 seed: Optional[int] = None, protocol: str = "json"):
+        """
+        Inicializa o gerador de carga.
+
+        Args:
+            host: Endereço do servidor
+            port: Porta do servidor
+            connections: Número de conexões simultâneas
+            mix: Pesos por ação (padrão: DEFAULT_MIX)
+            duration: Duração da medição em segundos
+            rate: Requisições/s no laço aberto (None = laço fechado)
+            account: Conta alvo (None = conta padrão)
+            history_limit: Tamanho da página nas requisições de histórico
+            seed: Semente do gerador aleatório (reprodutibilidade)
+            protocol: json ou binary
+        """
+        self.host = host
+        self.port = port
+        self.connections = max(1, connections)
+        self.mix = {action: weight for action, weight in (mix or DEFAULT_MIX).items() if weight > 0}
+        self.duration = duration
+        self.rate = rate
+        self.account = account
+        self.history_limit = history_limit
+        self.protocol = protocol
+        self.random = random.Random(seed)
+
+        self.latencies: List[float] = []
+        self.per_action: Dict[str, Dict[str, int]] = {
+            action: {"ok": 0, "error": 0} for action in self.mix
+        }
+        self.failures = 0
+
+    def _next_action(self):
+        """Sorteia a próxima ação e seus parâmetros conforme a mistura."""
+        actions = list(self.mix)
+        action = self.random.choices(actions, weights=[self.mix[a] for a in actions])[0]
+        if action == "deposit":
+            return action, {"amount": 1.0}
+        if action == "withdraw":
+            return action, {"amount": 0.5}
+        if action == "history":
+            return action, {"limit": self.history_limit}
+        return action, {}
+
+    async def _issue(self, connection: PooledConnection, started: float):
+        """Envia uma requisição e registra sua latência a partir de `started`."""
+        action, params = self._next_action()
+        try:
+            response = await connection.request(action, **params)
+        except Exception:
+            self.failures += 1
+            return
+        self.latencies.append(time.perf_counter() - started)
+        status = "ok" if response.get("status") == "ok" else "error"
+        self.per_action[action][status] += 1
+
+    async def _closed_loop(self, connection: PooledConnection, deadline: float):
+        while time.perf_counter() < deadline:
+            await self._issue(connection, time.perf_counter())
+
+    async def _open_loop(self, connections: List[PooledConnection], deadline: float):
+        interval = 1.0 / self.rate
+        start = time.perf_counter()
+        inflight = set()
+        sent = 0
+        while True:
+            scheduled = start + sent * interval
+            if scheduled >= deadline:
+                break
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            task = asyncio.create_task(self._issue(connections[sent % len(connections)], scheduled))
+            inflight.add(task)
+            task.add_done_callback(inflight.discard)
+            sent += 1
+        if inflight:
+            await asyncio.wait(inflight, timeout=max(5.0, self.duration))
+
+    async def run(self) -> dict:
+        """
+        Executa o benchmark.
+
+        Returns:
+            Relatório com vazão e latências
+        """
+        logging.getLogger("MiniCoinClient").setLevel(logging.WARNING)
+
+        connections = [
+            PooledConnection(MiniCoinClient(self.host, self.port, f"bench-{i}",
+                                               account=self.account, protocol=self.protocol))
+            for i in range(self.connections)
+        ]
+        await asyncio.gather(*(connection.open() for connection in connections))
+
+        started = time.perf_counter()
+        deadline = started + self.duration
+        try:
+            if self.rate:
+                await self._open_loop(connections, deadline)
+            else:
+                await asyncio.gather(*(self._closed_loop(c, deadline) for c in connections))
+        finally:
+            elapsed = time.perf_counter() - started
+            await asyncio.gather(*(connection.close() for connection in connections))
+
+        return self.report(elapsed)
+
+    def report(self, elapsed: float) -> dict:
+        """Monta o relatório em formato serializável em JSON."""
+        latencies = sorted(self.latencies)
+        latency_ms = {name: round(percentile(latencies, fraction) * 1000, 3)
+                      for name, fraction in PERCENTILES}
+        latency_ms["mean"] = round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0
+        latency_ms["max"] = round(latencies[-1] * 1000, 3) if latencies else 0.0
+
+        return {
+            "mode": "open-loop" if self.rate else "closed-loop",
+            "protocol": self.protocol,
+            "target_rate": self.rate,
+            "connections": self.connections,
+            "duration_s": round(elapsed, 3),
+            "operations": len(latencies),
+            "ops_per_sec": round(len(latencies) / elapsed, 1) if elapsed > 0 else 0.0,
+            "failures": self.failures,
+            "latency_ms": latency_ms,
+            "per_action": self.per_action,
+        }
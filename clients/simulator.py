@@ -8,6 +8,9 @@ Funcionalidades:
 - Envio de retiradas válidas
 - Tentativas de retiradas inválidas (overdraft)
 - Consultas de saldo e histórico
+- Protocolo JSON (padrão) ou binário compacto (protocol="binary")
+- Pool de conexões persistentes com várias requisições em andamento
+  por conexão (MiniCoinPool)
 - Logging detalhado de todas as operações
 """
 
@@ -17,7 +20,13 @@ import logging
 import random
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import AsyncIterator, List, Dict, Optional
+
+from minicoin.protocol import (
+    FLAG_FULL, NO_BLOCK, OP_BALANCE, OP_JSON, OP_PING, OP_VERIFY, OPCODES,
+    PROTOCOL_VERSION, PROTOCOLS, STATUS_BUSY, STATUS_OK, encode_request, from_minor, read_response,
+    to_minor
+)
 
 
 def setup_logging(log_file: str = "logs/client.log"):
@@ -39,13 +48,28 @@ def setup_logging(log_file: str = "logs/client.log"):
 class MiniCoinClient:
     """Cliente para conectar ao servidor MiniCoin e realizar transações."""
 
-    def __init__(self, host: str = "127.0.0.1", port: int = 8888, client_id: Optional[str] = None):
-        """Inicializa o cliente MiniCoin."""
+    def __init__(self, host: str = "127.0.0.1", port: int = 8888, client_id: Optional[str] = None,
+                 max_frame_size: int = 16 * 1024 * 1024, account: Optional[str] = None,
+                 protocol: str = "json"):
+        """
+        Inicializa o cliente MiniCoin (account=None usa a conta padrão).
+
+        Com protocol="binary", connect() negocia o protocolo binário e
+        depósitos, retiradas, saldo, verificação e ping não passam por
+        JSON; as demais ações seguem encapsuladas em frames binários.
+        """
+        if protocol not in PROTOCOLS:
+            raise ValueError(f"Unknown protocol: {protocol}")
         self.host = host
         self.port = port
         self.client_id = client_id or "anonymous-client"
+        self.account = account
+        self.max_frame_size = max_frame_size
+        self.protocol = protocol
         self.logger = setup_logging()
         self.request_counter = 0
+        # Respostas recebidas fora de ordem, aguardando quem as pediu
+        self._unclaimed: Dict[str, dict] = {}
         
         self.logger.info(f"MiniCoin Client initialized (id={self.client_id})")
 
@@ -57,13 +81,119 @@ class MiniCoinClient:
             Tupla (reader, writer) para comunicação
         """
         try:
-            reader, writer = await asyncio.open_connection(self.host, self.port)
+            reader, writer = await asyncio.open_connection(
+                self.host, self.port, limit=self.max_frame_size
+            )
             self.logger.info(f"Connected to server at {self.host}:{self.port}")
+            if self.protocol == "binary":
+                await self._handshake(reader, writer)
             return reader, writer
         except Exception as e:
             self.logger.error(f"Failed to connect to server: {e}")
             raise
 
+    async def _handshake(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Negocia o protocolo binário (primeira requisição da conexão)."""
+        hello = {"action": "hello", "protocol": "binary", "version": PROTOCOL_VERSION}
+        writer.write((json.dumps(hello) + "\n").encode())
+        await writer.drain()
+        response = json.loads((await reader.readline()).decode() or "{}")
+        if response.get("status") != "ok" or response.get("protocol") != "binary":
+            writer.close()
+            raise ConnectionError(response.get("message", "Binary protocol not accepted"))
+        self.logger.info("Binary protocol v%d negotiated", PROTOCOL_VERSION)
+
+    def _encode(self, request: dict) -> bytes:
+        """Serializa uma requisição no protocolo da conexão."""
+        if self.protocol == "json":
+            return (json.dumps(request) + "\n").encode()
+
+        request_id = int(request["id"])
+        action = request["action"]
+        account = request.get("account")
+        opcode = OPCODES.get(action)
+        if action in ("deposit", "withdraw") and isinstance(request.get("amount"), (int, float)):
+            key = request.get("idempotency_key")
+            return encode_request(opcode, request_id, to_minor(request["amount"]), account,
+                                  payload=str(key).encode() if key is not None else b"")
+        if action in ("balance", "ping"):
+            return encode_request(opcode, request_id, account=account)
+        if action == "verify" and not request.get("parallel"):
+            flags = FLAG_FULL if request.get("full") else 0
+            return encode_request(opcode, request_id, account=account, flags=flags)
+        return encode_request(OP_JSON, request_id, account=account,
+                              payload=json.dumps(request).encode())
+
+    async def _read_frame(self, reader: asyncio.StreamReader) -> dict:
+        """Lê a próxima resposta (ou frame de streaming) do servidor."""
+        if self.protocol == "json":
+            line = await reader.readline()
+            if not line:
+                raise ConnectionError("Connection closed by server")
+            return json.loads(line.decode())
+
+        try:
+            frame = await read_response(reader)
+        except asyncio.IncompleteReadError:
+            raise ConnectionError("Connection closed by server") from None
+
+        request_id = f"{frame.request_id:04d}"
+        if frame.opcode == OP_JSON:
+            response = json.loads(frame.payload)
+            response["id"] = request_id
+            return response
+
+        if frame.status == STATUS_BUSY:
+            return {"status": "busy", "id": request_id, "message": frame.payload.decode(),
+                    "retry_after": frame.block_index / 1000}
+
+        ok = frame.status == STATUS_OK
+        response = {"status": "ok" if ok else "error", "id": request_id}
+        if frame.payload:
+            response["message"] = frame.payload.decode()
+        if frame.opcode == OP_PING:
+            return response
+        response["balance"] = from_minor(frame.balance)
+        response["balance_minor"] = frame.balance
+        if frame.opcode == OP_VERIFY:
+            response["valid"] = ok
+            response["verified_index"] = frame.block_index
+        elif frame.block_index != NO_BLOCK:
+            response["block_index"] = frame.block_index
+            response["block_hash"] = frame.block_hash.hex()
+            if frame.opcode == OP_BALANCE:
+                response["block_count"] = frame.block_index + 1
+        return response
+
+    def _build_request(self, action: str, **kwargs) -> dict:
+        """Monta uma requisição com um novo id."""
+        self.request_counter += 1
+        request = {
+            "action": action,
+            "id": f"{self.request_counter:04d}",
+            "client_id": self.client_id,
+        }
+        if self.account is not None:
+            request["account"] = self.account
+        request.update(kwargs)
+        return request
+
+    async def read_response(self, reader: asyncio.StreamReader, request_id: str) -> dict:
+        """
+        Lê respostas (uma por linha) até encontrar a de `request_id`.
+
+        Respostas de outras requisições em andamento são guardadas para
+        quem as aguarda.
+        """
+        if request_id in self._unclaimed:
+            return self._unclaimed.pop(request_id)
+
+        while True:
+            response = await self._read_frame(reader)
+            if response.get("id") == request_id:
+                return response
+            self._unclaimed[response.get("id")] = response
+
     async def send_request(self, reader: asyncio.StreamReader, 
                           writer: asyncio.StreamWriter, 
                           action: str, **kwargs) -> Optional[dict]:
@@ -79,27 +209,18 @@ class MiniCoinClient:
         Returns:
             Dicionário com a resposta do servidor
         """
-        self.request_counter += 1
-        request_id = f"{self.request_counter:04d}"
-        
-        request = {
-            "action": action,
-            "id": request_id,
-            "client_id": self.client_id,
-            **kwargs
-        }
+        request = self._build_request(action, **kwargs)
+        request_id = request["id"]
         
         try:
             # Envia a requisição
-            request_json = json.dumps(request) + "\n"
-            writer.write(request_json.encode())
+            writer.write(self._encode(request))
             await writer.drain()
             
             self.logger.info(f"[{request_id}] Sent: {action.upper()} {kwargs}")
             
             # Aguarda resposta
-            data = await reader.read(4096)
-            response = json.loads(data.decode().strip())
+            response = await self.read_response(reader, request_id)
             
             self.logger.info(f"[{request_id}] Response: {response.get('status', 'unknown')} - {response.get('message', '')}")
             
@@ -109,30 +230,399 @@ class MiniCoinClient:
             self.logger.error(f"[{request_id}] Error: {e}")
             return None
 
-    async def deposit(self, reader, writer, amount: float) -> dict:
-        """Realiza um depósito."""
-        return await self.send_request(reader, writer, "deposit", amount=amount)
+    async def pipeline(self, reader: asyncio.StreamReader,
+                       writer: asyncio.StreamWriter,
+                       operations: List[Dict]) -> List[Optional[dict]]:
+        """
+        Envia várias requisições de uma vez e aguarda todas as respostas.
 
-    async def withdraw(self, reader, writer, amount: float) -> dict:
-        """Realiza uma retirada."""
-        return await self.send_request(reader, writer, "withdraw", amount=amount)
+        Args:
+            reader: Stream de entrada
+            writer: Stream de saída
+            operations: Lista de dicionários com "action" e parâmetros
+
+        Returns:
+            Respostas na mesma ordem das operações
+        """
+        requests = [self._build_request(**operation) for operation in operations]
+        payload = b"".join(self._encode(request) for request in requests)
+
+        try:
+            writer.write(payload)
+            await writer.drain()
+            self.logger.info(f"Pipelined {len(requests)} requests")
+            return [await self.read_response(reader, request["id"]) for request in requests]
+        except Exception as e:
+            self.logger.error(f"Pipeline error: {e}")
+            return [None] * len(requests)
+
+    async def deposit(self, reader, writer, amount: float,
+                      idempotency_key: Optional[str] = None) -> dict:
+        """Realiza um depósito (repetível com a mesma idempotency_key)."""
+        params = {"idempotency_key": idempotency_key} if idempotency_key is not None else {}
+        return await self.send_request(reader, writer, "deposit", amount=amount, **params)
+
+    async def withdraw(self, reader, writer, amount: float,
+                       idempotency_key: Optional[str] = None) -> dict:
+        """Realiza uma retirada (repetível com a mesma idempotency_key)."""
+        params = {"idempotency_key": idempotency_key} if idempotency_key is not None else {}
+        return await self.send_request(reader, writer, "withdraw", amount=amount, **params)
 
     async def get_balance(self, reader, writer) -> dict:
         """Consulta o saldo."""
         return await self.send_request(reader, writer, "balance")
 
-    async def get_history(self, reader, writer) -> dict:
-        """Consulta o histórico."""
-        return await self.send_request(reader, writer, "history")
+    async def get_history(self, reader, writer, **params) -> dict:
+        """Consulta o histórico (aceita from_index, limit e cursor)."""
+        return await self.send_request(reader, writer, "history", **params)
 
-    async def verify_integrity(self, reader, writer) -> dict:
-        """Verifica a integridade da blockchain."""
-        return await self.send_request(reader, writer, "verify")
+    async def stream_history(self, reader, writer, chunk_size: int = 100,
+                             **params) -> AsyncIterator[List[dict]]:
+        """
+        Recebe o histórico em streaming, um trecho de blocos por vez.
+
+        Args:
+            reader: Stream de entrada
+            writer: Stream de saída
+            chunk_size: Blocos por frame
+            **params: from_index e/ou limit
+        """
+        request = self._build_request("history", stream=True, chunk_size=chunk_size, **params)
+        writer.write(self._encode(request))
+        await writer.drain()
+        self.logger.info(f"[{request['id']}] Sent: HISTORY stream {params}")
+
+        while True:
+            frame = await self._read_frame(reader)
+            if frame.get("id") != request["id"]:
+                self._unclaimed[frame.get("id")] = frame
+                continue
+            if frame.get("status") != "ok":
+                raise RuntimeError(frame.get("message", "history stream failed"))
+            if frame.get("done"):
+                break
+            yield frame["history"]
+
+    async def balance_at(self, reader, writer, index: Optional[int] = None,
+                         timestamp: Optional[str] = None) -> dict:
+        """Consulta o saldo em um bloco (index) ou instante (timestamp)."""
+        params = {"index": index} if index is not None else {"timestamp": timestamp}
+        return await self.send_request(reader, writer, "balance_at", **params)
+
+    async def range_summary(self, reader, writer, from_index: int = 0,
+                            to_index: Optional[int] = None) -> dict:
+        """Consulta os totais depositados/retirados entre dois blocos."""
+        params = {"from_index": from_index}
+        if to_index is not None:
+            params["to_index"] = to_index
+        return await self.send_request(reader, writer, "range_summary", **params)
+
+    async def get_block(self, reader, writer, index: Optional[int] = None,
+                        block_hash: Optional[str] = None) -> dict:
+        """Busca um bloco pelo índice ou pelo hash (recibo)."""
+        params = {"index": index} if index is not None else {"hash": block_hash}
+        return await self.send_request(reader, writer, "get_block", **params)
+
+    async def verify_integrity(self, reader, writer, full: bool = False,
+                               parallel: bool = False) -> dict:
+        """
+        Verifica a integridade da blockchain (full=True para auditoria
+        completa; parallel=True para recalcular os hashes em paralelo).
+        """
+        params = {}
+        if full:
+            params["full"] = True
+        if parallel:
+            params["parallel"] = True
+        return await self.send_request(reader, writer, "verify", **params)
+
+    async def create_account(self, reader, writer, account: str,
+                             owner: Optional[str] = None,
+                             initial_deposit: float = 0.0) -> dict:
+        """Cria uma nova conta no servidor."""
+        params = {"account": account, "initial_deposit": initial_deposit}
+        if owner is not None:
+            params["owner"] = owner
+        return await self.send_request(reader, writer, "create_account", **params)
+
+    async def batch(self, reader, writer, operations: List[Dict],
+                    atomic: bool = False) -> dict:
+        """
+        Envia vários depósitos/retiradas em uma única requisição.
+
+        Args:
+            operations: Lista de {"action": "deposit" | "withdraw", "amount": valor}
+            atomic: Se True, o servidor aplica tudo ou nada
+        """
+        return await self.send_request(reader, writer, "batch",
+                                       operations=operations, atomic=atomic)
 
     async def ping(self, reader, writer) -> dict:
         """Testa a conexão."""
         return await self.send_request(reader, writer, "ping")
 
+    async def get_metrics(self, reader, writer, prometheus: bool = False) -> dict:
+        """Consulta as métricas do servidor (prometheus=True inclui o texto)."""
+        params = {"format": "prometheus"} if prometheus else {}
+        return await self.send_request(reader, writer, "metrics", **params)
+
+
+class PooledConnection:
+    """
+    Conexão multiplexada: várias requisições em andamento, com as
+    respostas entregues pelo campo id.
+    """
+
+    def __init__(self, client: MiniCoinClient):
+        self.client = client
+        self.reader = None
+        self.writer = None
+        self._waiting: Dict[str, asyncio.Future] = {}
+        self._reader_task: Optional[asyncio.Task] = None
+
+    @property
+    def in_flight(self) -> int:
+        """Requisições aguardando resposta nesta conexão."""
+        return len(self._waiting)
+
+    @property
+    def closed(self) -> bool:
+        """True se a conexão nunca abriu ou já foi encerrada."""
+        return (self._reader_task is None or self._reader_task.done()
+                or self.writer.is_closing())
+
+    async def open(self):
+        """Conecta e inicia a tarefa que distribui as respostas."""
+        self.reader, self.writer = await self.client.connect()
+        self._reader_task = asyncio.create_task(self._dispatch())
+
+    async def _dispatch(self):
+        try:
+            while True:
+                try:
+                    response = await self.client._read_frame(self.reader)
+                except (ConnectionError, ValueError):
+                    break
+                future = self._waiting.pop(response.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        finally:
+            for future in self._waiting.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Connection closed by server"))
+            self._waiting.clear()
+
+    async def request(self, action: str, timeout: Optional[float] = None, **params) -> dict:
+        """
+        Envia uma requisição e aguarda a resposta correspondente.
+
+        Raises:
+            ConnectionError: Conexão encerrada antes da resposta
+            asyncio.TimeoutError: Sem resposta em `timeout` segundos
+        """
+        if self.closed:
+            raise ConnectionError("Connection is closed")
+        request = self.client._build_request(action, **params)
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[request["id"]] = future
+        try:
+            self.writer.write(self.client._encode(request))
+            await self.writer.drain()
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            # Uma resposta que chegue depois do timeout é descartada
+            self._waiting.pop(request["id"], None)
+
+    async def close(self):
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+class MiniCoinPool:
+    """
+    Cliente assíncrono com um pool de conexões persistentes.
+
+    Cada chamada usa a conexão com menos requisições em andamento, e
+    várias chamadas concorrentes seguem multiplexadas na mesma conexão
+    (correlacionadas pelo id). Conexões encerradas são reabertas na
+    próxima chamada.
+
+    Uso:
+        async with MiniCoinPool("127.0.0.1", 8888, size=4) as pool:
+            await asyncio.gather(*(pool.deposit(50) for _ in range(100)))
+
+    Ações somente leitura são repetidas uma vez em outra conexão se a
+    conexão cair; depósitos e retiradas só são reenviados quando levam
+    idempotency_key, porque sem ela o servidor pode tê-los aplicado
+    antes da queda e os aplicaria de novo. Respostas "busy" (o
+    servidor recusou a requisição sem executá-la) são repetidas para
+    qualquer ação, até busy_retries vezes, após o retry_after sugerido.
+    """
+
+    # Ações que podem ser reenviadas sem risco de aplicar duas vezes
+    READ_ONLY_ACTIONS = frozenset({"balance", "history", "verify", "ping", "balance_at",
+                                   "range_summary", "metrics", "get_block"})
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8888, size: int = 4,
+                 client_id: Optional[str] = None, account: Optional[str] = None,
+                 protocol: str = "json", timeout: Optional[float] = 10.0,
+                 connect_timeout: float = 5.0, busy_retries: int = 2):
+        """
+        Inicializa o pool (as conexões abrem em start() ou na primeira chamada).
+
+        Args:
+            host: Endereço do servidor
+            port: Porta do servidor
+            size: Número de conexões persistentes
+            client_id: Identificador do cliente nas requisições
+            account: Conta padrão das requisições (None = conta padrão do servidor)
+            protocol: json ou binary
+            timeout: Tempo máximo (s) de espera por resposta (None = sem limite)
+            connect_timeout: Tempo máximo (s) para abrir uma conexão
+            busy_retries: Reenvios de uma requisição recusada com "busy"
+        """
+        if size <= 0:
+            raise ValueError("size deve ser positivo")
+        if protocol not in PROTOCOLS:
+            raise ValueError(f"Unknown protocol: {protocol}")
+        self.host = host
+        self.port = port
+        self.size = size
+        self.client_id = client_id or "pool-client"
+        self.account = account
+        self.protocol = protocol
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.busy_retries = busy_retries
+        self.reconnects = 0
+        self._connections: List[Optional[PooledConnection]] = [None] * size
+        self._locks = [asyncio.Lock() for _ in range(size)]
+
+    async def __aenter__(self) -> "MiniCoinPool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def start(self):
+        """Abre todas as conexões do pool."""
+        await asyncio.gather(*(self._connection(slot) for slot in range(self.size)))
+
+    async def close(self):
+        """Encerra todas as conexões do pool."""
+        connections = [c for c in self._connections if c is not None]
+        self._connections = [None] * self.size
+        await asyncio.gather(*(connection.close() for connection in connections))
+
+    async def _connection(self, slot: int) -> PooledConnection:
+        """Retorna a conexão do slot, (re)abrindo-a se necessário."""
+        connection = self._connections[slot]
+        if connection is not None and not connection.closed:
+            return connection
+
+        async with self._locks[slot]:
+            connection = self._connections[slot]
+            if connection is not None and not connection.closed:
+                return connection
+            if connection is not None:
+                await connection.close()
+                self.reconnects += 1
+            client = MiniCoinClient(self.host, self.port, f"{self.client_id}-{slot}",
+                                    account=self.account, protocol=self.protocol)
+            connection = PooledConnection(client)
+            try:
+                await asyncio.wait_for(connection.open(), self.connect_timeout)
+            except asyncio.TimeoutError:
+                raise ConnectionError(f"Timed out connecting to {self.host}:{self.port}") from None
+            self._connections[slot] = connection
+            return connection
+
+    def _pick_slot(self) -> int:
+        """Slot com menos requisições em andamento (conexões fechadas contam como livres)."""
+        return min(range(self.size), key=lambda slot: (
+            self._connections[slot].in_flight if self._connections[slot] is not None else 0
+        ))
+
+    async def request(self, action: str, timeout: Optional[float] = None, **params) -> dict:
+        """
+        Envia uma requisição por uma das conexões do pool.
+
+        Args:
+            action: Ação da requisição
+            timeout: Tempo máximo de espera (padrão: o timeout do pool)
+            **params: Parâmetros da requisição
+
+        Returns:
+            Resposta do servidor
+
+        Raises:
+            ConnectionError: Falha de conexão
+            asyncio.TimeoutError: Sem resposta dentro do timeout
+        """
+        for busy_attempt in range(self.busy_retries + 1):
+            response = await self._send(action, timeout, params)
+            if response.get("status") != "busy" or busy_attempt == self.busy_retries:
+                return response
+            await asyncio.sleep(response.get("retry_after", 0.0))
+
+    async def _send(self, action: str, timeout: Optional[float], params: dict) -> dict:
+        """Envia uma requisição, trocando de conexão se uma leitura falhar."""
+        retryable = action in self.READ_ONLY_ACTIONS or params.get("idempotency_key") is not None
+        attempts = 2 if retryable else 1
+        for attempt in range(attempts):
+            connection = await self._connection(self._pick_slot())
+            try:
+                return await connection.request(
+                    action, timeout=self.timeout if timeout is None else timeout, **params
+                )
+            except ConnectionError:
+                if attempt + 1 == attempts:
+                    raise
+
+    async def deposit(self, amount: float, **params) -> dict:
+        """Realiza um depósito."""
+        return await self.request("deposit", amount=amount, **params)
+
+    async def withdraw(self, amount: float, **params) -> dict:
+        """Realiza uma retirada."""
+        return await self.request("withdraw", amount=amount, **params)
+
+    async def balance(self, **params) -> dict:
+        """Consulta o saldo."""
+        return await self.request("balance", **params)
+
+    async def history(self, **params) -> dict:
+        """Consulta uma página do histórico (from_index, limit, cursor)."""
+        return await self.request("history", **params)
+
+    async def batch(self, operations: List[Dict], atomic: bool = False, **params) -> dict:
+        """Envia vários depósitos/retiradas em uma única requisição."""
+        return await self.request("batch", operations=operations, atomic=atomic, **params)
+
+    async def get_block(self, index: Optional[int] = None,
+                        block_hash: Optional[str] = None, **params) -> dict:
+        """Busca um bloco pelo índice ou pelo hash (recibo)."""
+        if index is not None:
+            params["index"] = index
+        else:
+            params["hash"] = block_hash
+        return await self.request("get_block", **params)
+
+    async def verify(self, full: bool = False, **params) -> dict:
+        """Verifica a integridade da blockchain."""
+        return await self.request("verify", full=full, **params)
+
+    async def ping(self) -> dict:
+        """Testa a conexão."""
+        return await self.request("ping")
+
 
 class TransactionSimulator:
     """
@@ -151,6 +641,8 @@ class TransactionSimulator:
         self.port = port
         self.logger = setup_logging()
         self.results = []
+        # Uma conexão persistente, compartilhada por todos os cenários
+        self.pool = MiniCoinPool(host, port, size=1, client_id="simulator")
 
     async def run_scenario(self, scenario_name: str, transactions: List[Dict]):
         """
@@ -166,13 +658,9 @@ class TransactionSimulator:
         
         self.logger.info(f"Starting scenario: {scenario_name}")
         
-        client = MiniCoinClient(self.host, self.port)
-        
         try:
-            reader, writer = await client.connect()
-            
             # Testa conectividade
-            await client.ping(reader, writer)
+            await self.pool.ping()
             await asyncio.sleep(0.5)
             
             # Executa cada transação
@@ -183,16 +671,8 @@ class TransactionSimulator:
                 
                 print(f"\n[Transaction {i}/{len(transactions)}] {description}")
                 
-                if action == "deposit":
-                    response = await client.deposit(reader, writer, amount)
-                elif action == "withdraw":
-                    response = await client.withdraw(reader, writer, amount)
-                elif action == "balance":
-                    response = await client.get_balance(reader, writer)
-                elif action == "history":
-                    response = await client.get_history(reader, writer)
-                elif action == "verify":
-                    response = await client.verify_integrity(reader, writer)
+                params = {"amount": amount} if action in ("deposit", "withdraw") else {}
+                response = await self.pool.request(action, **params)
                 
                 if response:
                     status = response.get("status", "unknown")
@@ -222,22 +702,19 @@ class TransactionSimulator:
             
             # Consulta final
             print("\n--- Final Status ---")
-            balance_response = await client.get_balance(reader, writer)
+            balance_response = await self.pool.balance()
             if balance_response:
                 print(f"Final Balance: {balance_response.get('balance', 0):.2f} MiniCoins")
                 print(f"Total Blocks: {balance_response.get('block_count', 0)}")
             
             # Verifica integridade
-            verify_response = await client.verify_integrity(reader, writer)
+            verify_response = await self.pool.verify()
             if verify_response:
                 if verify_response.get("valid"):
                     print("✓ Blockchain integrity verified")
                 else:
                     print("✗ Blockchain integrity check FAILED")
             
-            writer.close()
-            await writer.wait_closed()
-            
         except Exception as e:
             self.logger.error(f"Scenario {scenario_name} failed: {e}", exc_info=True)
             print(f"\n✗ Scenario failed: {e}")
@@ -316,6 +793,7 @@ class TransactionSimulator:
                 })
         
         await self.run_scenario("random-transactions", random_transactions)
+        await self.pool.close()
         
         # Relatório final
         self.print_summary()
@@ -345,9 +823,39 @@ async def main():
     parser = argparse.ArgumentParser(description="MiniCoin Client Simulator")
     parser.add_argument("--host", default="127.0.0.1", help="Server host")
     parser.add_argument("--port", type=int, default=8888, help="Server port")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Run the load generator instead of the fixed scenarios")
+    parser.add_argument("--connections", type=int, default=8, help="Benchmark: concurrent connections")
+    parser.add_argument("--duration", type=float, default=10.0, help="Benchmark: duration in seconds")
+    parser.add_argument("--rate", type=float, default=None,
+                        help="Benchmark: open-loop arrival rate in req/s (default: closed loop)")
+    parser.add_argument("--mix", default=None,
+                        help="Benchmark: request mix, e.g. deposit=40,withdraw=20,balance=30,history=5,verify=5")
+    parser.add_argument("--account", default=None, help="Benchmark: target account")
+    parser.add_argument("--output", default=None, help="Benchmark: also write the JSON report to this file")
+    parser.add_argument("--protocol", choices=PROTOCOLS, default="json",
+                        help="Benchmark: wire protocol (default: json)")
     
     args = parser.parse_args()
     
+    if args.benchmark:
+        from clients.benchmark import LoadGenerator, parse_mix
+        
+        generator = LoadGenerator(
+            args.host, args.port,
+            connections=args.connections,
+            mix=parse_mix(args.mix) if args.mix else None,
+            duration=args.duration,
+            rate=args.rate,
+            account=args.account,
+            protocol=args.protocol
+        )
+        report = json.dumps(await generator.run(), indent=2)
+        print(report)
+        if args.output:
+            Path(args.output).write_text(report + "\n")
+        return
+    
     print("\n" + "="*60)
     print("MiniCoin Transaction Simulator")
     print("="*60)
@@ -0,0 +1,207 @@
+"""
+MiniCoin Accounts - Registro de contas do servidor
+Permite que um único servidor mantenha várias contas, cada uma com sua
+própria blockchain e seu próprio lock, de modo que operações em contas
+diferentes nunca esperam umas pelas outras.
+
+As contas são distribuídas em shards (pelo CRC32 do identificador);
+com persistência, cada conta grava seus blocos em
+<data_dir>/accounts/<shard>/<identificador em hexadecimal>/.
+A conta padrão continua gravando diretamente em <data_dir>.
+Com snapshots ativos, cada conta os guarda no subdiretório snapshots/
+do seu diretório de persistência.
+"""
+
+import asyncio
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from minicoin.block import Block
+from minicoin.ledger import MiniCoinLedger
+from minicoin.snapshot import SnapshotManager
+from minicoin.storage import BlockStore, FSYNC_ALWAYS
+
+
+DEFAULT_ACCOUNT = "default"
+MAX_ACCOUNT_ID_LENGTH = 64
+
+
+class UnknownAccountError(LookupError):
+    """Conta não encontrada no registro."""
+
+
+@dataclass
+class Account:
+    """
+    Uma conta do servidor.
+
+    Attributes:
+        account_id: Identificador da conta
+        ledger: Blockchain da conta
+        store: Armazenamento persistente (None = só memória)
+        lock: Serializa as escritas nesta conta
+    """
+    account_id: str
+    ledger: MiniCoinLedger
+    store: Optional[BlockStore] = None
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class AccountRegistry:
+    """
+    Registro das contas, particionado em shards independentes.
+    """
+
+    def __init__(self, data_dir: Optional[str] = None,
+                 fsync_policy: str = FSYNC_ALWAYS, shard_count: int = 16,
+                 snapshot_interval: int = 0, snapshot_retention: int = 2,
+                 background_snapshots: bool = False):
+        """
+        Inicializa o registro e carrega as contas persistidas.
+
+        Args:
+            data_dir: Diretório de persistência (None = só memória)
+            fsync_policy: Política de fsync dos armazenamentos
+            shard_count: Número de shards (padrão: 16)
+            snapshot_interval: Blocos entre snapshots de cada conta (0 = desativado)
+            snapshot_retention: Snapshots mantidos por conta
+            background_snapshots: Os snapshots periódicos ficam a cargo de
+                quem usa o registro, fora do caminho de escrita
+        """
+        if shard_count <= 0:
+            raise ValueError("shard_count deve ser positivo")
+
+        self.data_dir = Path(data_dir) if data_dir else None
+        self.fsync_policy = fsync_policy
+        self.snapshot_interval = snapshot_interval
+        self.snapshot_retention = snapshot_retention
+        self.background_snapshots = background_snapshots
+        self.shards: List[Dict[str, Account]] = [{} for _ in range(shard_count)]
+
+        if self.data_dir is not None:
+            self._load_accounts()
+
+    def shard_for(self, account_id: str) -> int:
+        """Retorna o shard responsável por `account_id`."""
+        return zlib.crc32(account_id.encode()) % len(self.shards)
+
+    def _account_dir(self, account_id: str) -> Path:
+        """Diretório de persistência de uma conta (não padrão)."""
+        return (self.data_dir / "accounts" / f"{self.shard_for(account_id):03d}"
+                / account_id.encode().hex())
+
+    def _open_store(self, directory: Path) -> BlockStore:
+        return BlockStore(str(directory), fsync_policy=self.fsync_policy)
+
+    def _open_snapshots(self, directory: Optional[Path]) -> Optional[SnapshotManager]:
+        """Gerenciador de snapshots de uma conta (None se desativado)."""
+        if directory is None or self.snapshot_interval <= 0:
+            return None
+        return SnapshotManager(str(directory / "snapshots"), self.snapshot_interval,
+                               self.snapshot_retention)
+
+    def _load_accounts(self):
+        """Reabre as contas persistidas em <data_dir>/accounts."""
+        for directory in sorted(self.data_dir.glob("accounts/*/*")):
+            try:
+                account_id = bytes.fromhex(directory.name).decode()
+            except ValueError:
+                continue
+            store = self._open_store(directory)
+            if len(store) == 0:
+                store.close()
+                continue
+            ledger = MiniCoinLedger(account_id, store=store,
+                                    snapshots=self._open_snapshots(directory),
+                                    auto_snapshot=not self.background_snapshots)
+            self._insert(Account(account_id, ledger, store))
+
+    def _insert(self, account: Account):
+        self.shards[self.shard_for(account.account_id)][account.account_id] = account
+
+    def open_default(self, owner: str, initial_deposit: float,
+                     genesis: Optional[Block] = None) -> Account:
+        """
+        Abre (ou cria) a conta padrão, persistida na raiz de data_dir.
+
+        Réplicas informam o `genesis` da conta padrão do primário.
+        """
+        store = self._open_store(self.data_dir) if self.data_dir is not None else None
+        ledger = MiniCoinLedger(owner, initial_deposit, store=store,
+                                snapshots=self._open_snapshots(self.data_dir),
+                                genesis=genesis, auto_snapshot=not self.background_snapshots)
+        account = Account(DEFAULT_ACCOUNT, ledger, store)
+        self._insert(account)
+        return account
+
+    def create(self, account_id: str, owner: Optional[str] = None,
+               initial_deposit: float = 0.0, genesis: Optional[Block] = None) -> Account:
+        """
+        Cria uma nova conta com seu próprio bloco genesis (ou com o
+        `genesis` informado, em réplicas).
+
+        Raises:
+            ValueError: Identificador inválido, conta já existente ou
+                depósito inicial inválido
+        """
+        if not isinstance(account_id, str) or not account_id:
+            raise ValueError("Account id must be a non-empty string")
+        if len(account_id) > MAX_ACCOUNT_ID_LENGTH:
+            raise ValueError(f"Account id longer than {MAX_ACCOUNT_ID_LENGTH} characters")
+        if account_id in self:
+            raise ValueError(f"Account already exists: {account_id}")
+
+        store = None
+        directory = None
+        if self.data_dir is not None:
+            directory = self._account_dir(account_id)
+            store = self._open_store(directory)
+        try:
+            ledger = MiniCoinLedger(owner or account_id, initial_deposit, store=store,
+                                    snapshots=self._open_snapshots(directory), genesis=genesis,
+                                    auto_snapshot=not self.background_snapshots)
+        except ValueError:
+            if store is not None:
+                store.close()
+            raise
+        account = Account(account_id, ledger, store)
+        self._insert(account)
+        return account
+
+    def get(self, account_id: Optional[str]) -> Account:
+        """
+        Retorna a conta `account_id` (a padrão se None).
+
+        Raises:
+            UnknownAccountError: Se a conta não existir
+        """
+        if account_id is None:
+            account_id = DEFAULT_ACCOUNT
+        account = self.shards[self.shard_for(str(account_id))].get(account_id)
+        if account is None:
+            raise UnknownAccountError(f"Unknown account: {account_id}")
+        return account
+
+    def __contains__(self, account_id: str) -> bool:
+        return account_id in self.shards[self.shard_for(account_id)]
+
+    def __iter__(self) -> Iterator[Account]:
+        for shard in self.shards:
+            yield from shard.values()
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self.shards)
+
+    def close(self):
+        """
+        Fecha os armazenamentos de todas as contas, gravando antes um
+        snapshot final das que cresceram desde o último.
+        """
+        for account in self:
+            snapshots = account.ledger.snapshots
+            if snapshots is not None and len(account.ledger.chain) > snapshots.last_count:
+                account.ledger.write_snapshot()
+            if account.store is not None:
+                account.store.close()
@@ -0,0 +1,201 @@
+"""
+MiniCoin Admission - Controle de admissão e prioridades do servidor
+Limita quantas requisições o servidor executa ao mesmo tempo e decide
+quem espera, quem passa na frente e quem é recusado:
+
+- Cada ação pertence a uma classe de prioridade: escritas primeiro,
+  depois consultas baratas (balance, ping, ...), auditorias e
+  exportações (verify, history), que também têm um limite próprio de
+  execuções simultâneas, e por último os streams de replicação, que não
+  terminam e por isso têm um limite separado (max_replication)
+- Respostas em streaming ocupam a vaga até o último frame
+- Quando não há vaga, a requisição espera na fila da sua ação; as filas
+  são limitadas, e a espera também (max_wait)
+- Com a fila cheia (ou a espera esgotada) a requisição é recusada na
+  hora com ServerBusy, que traz uma estimativa de quando tentar de novo
+
+Uma vaga liberada vai sempre para a requisição mais antiga da classe
+de maior prioridade com espera.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+PRIORITY_WRITE = 0
+PRIORITY_READ = 1
+PRIORITY_BULK = 2
+PRIORITY_REPLICATION = 3
+PRIORITIES = (PRIORITY_WRITE, PRIORITY_READ, PRIORITY_BULK, PRIORITY_REPLICATION)
+
+ACTION_PRIORITIES = {
+    "deposit": PRIORITY_WRITE,
+    "withdraw": PRIORITY_WRITE,
+    "batch": PRIORITY_WRITE,
+    "create_account": PRIORITY_WRITE,
+    "balance": PRIORITY_READ,
+    "ping": PRIORITY_READ,
+    "balance_at": PRIORITY_READ,
+    "range_summary": PRIORITY_READ,
+    "get_block": PRIORITY_READ,
+    "metrics": PRIORITY_READ,
+    "history": PRIORITY_BULK,
+    "verify": PRIORITY_BULK,
+    "replicate": PRIORITY_REPLICATION,
+}
+
+# Peso da última medição na média móvel do tempo de serviço
+SERVICE_TIME_WEIGHT = 0.2
+MIN_RETRY_AFTER = 0.01
+
+
+class ServerBusy(Exception):
+    """Requisição recusada pelo controle de admissão."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+# (prioridade, instante da admissão), devolvido por enter() e passado a leave()
+Ticket = Tuple[int, float]
+
+
+class AdmissionController:
+    """
+    Vagas de execução compartilhadas, com filas por ação e prioridades.
+
+    Só é usado pelo event loop, então dispensa locks.
+    """
+
+    def __init__(self, max_active: int = 128, max_bulk: int = 4,
+                 queue_limit: int = 256, max_wait: float = 2.0,
+                 queue_limits: Optional[Dict[str, int]] = None,
+                 max_replication: int = 16):
+        """
+        Inicializa o controle de admissão.
+
+        Args:
+            max_active: Máximo de requisições executando ao mesmo tempo
+            max_bulk: Máximo de auditorias/exportações executando ao mesmo tempo
+            queue_limit: Tamanho máximo da fila de espera de cada ação
+            max_wait: Tempo máximo (s) de espera na fila antes da recusa
+            queue_limits: Tamanhos de fila específicos por ação
+            max_replication: Máximo de streams de replicação abertos
+        """
+        if max_active <= 0 or max_bulk <= 0 or max_replication <= 0:
+            raise ValueError("max_active, max_bulk e max_replication devem ser positivos")
+
+        self.max_active = max_active
+        self.limits = {PRIORITY_WRITE: max_active, PRIORITY_READ: max_active,
+                       PRIORITY_BULK: min(max_bulk, max_active),
+                       PRIORITY_REPLICATION: min(max_replication, max_active)}
+        self.queue_limit = queue_limit
+        self.queue_limits = dict(queue_limits or {})
+        self.max_wait = max_wait
+        self.active = 0
+        self.active_by_priority = {priority: 0 for priority in PRIORITIES}
+        self.queued: Dict[str, int] = {}
+        self.rejected = 0
+        # Média móvel do tempo de serviço (s), por prioridade
+        self.service_time = {priority: 0.0 for priority in PRIORITIES}
+        self._waiting: Dict[int, Deque[Tuple[str, asyncio.Future]]] = {
+            priority: deque() for priority in PRIORITIES
+        }
+
+    @staticmethod
+    def priority_of(action: str) -> int:
+        """Prioridade de uma ação (ações desconhecidas contam como consultas)."""
+        return ACTION_PRIORITIES.get(action, PRIORITY_READ)
+
+    def _has_slot(self, priority: int) -> bool:
+        return (self.active < self.max_active
+                and self.active_by_priority[priority] < self.limits[priority])
+
+    def _start(self, priority: int) -> Ticket:
+        self.active += 1
+        self.active_by_priority[priority] += 1
+        return priority, time.monotonic()
+
+    def retry_after(self, priority: int) -> float:
+        """
+        Estimativa (s) de quando uma requisição da classe deve ter vaga:
+        a fila da classe à frente, dividida pelas vagas, vezes o tempo
+        médio de serviço.
+        """
+        ahead = len(self._waiting[priority]) + 1
+        estimate = self.service_time[priority] * ahead / self.limits[priority]
+        return round(min(max(estimate, MIN_RETRY_AFTER), self.max_wait), 3)
+
+    def _reject(self, priority: int, message: str):
+        self.rejected += 1
+        raise ServerBusy(message, self.retry_after(priority))
+
+    async def enter(self, action: str) -> Ticket:
+        """
+        Aguarda uma vaga para a ação.
+
+        Returns:
+            Ticket a devolver em leave() ao fim da requisição
+
+        Raises:
+            ServerBusy: Fila da ação cheia ou espera acima de max_wait
+        """
+        priority = self.priority_of(action)
+        # Sem ninguém da mesma prioridade ou maior esperando, entra direto
+        if self._has_slot(priority) and not any(self._waiting[p] for p in PRIORITIES
+                                                if p <= priority):
+            return self._start(priority)
+
+        queued = self.queued.get(action, 0)
+        if queued >= self.queue_limits.get(action, self.queue_limit):
+            self._reject(priority, f"Server busy: {action} queue is full")
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (action, future)
+        self._waiting[priority].append(entry)
+        self.queued[action] = queued + 1
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # A vaga chegou junto com o timeout/cancelamento: devolve
+                self.leave(future.result())
+            else:
+                future.cancel()
+                self._waiting[priority].remove(entry)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self._reject(priority, f"Server busy: {action} waited {self.max_wait:g}s")
+        finally:
+            self.queued[action] -= 1
+
+    def leave(self, ticket: Ticket):
+        """Devolve a vaga de uma requisição e a repassa a quem espera."""
+        priority, started = ticket
+        self.active -= 1
+        self.active_by_priority[priority] -= 1
+        elapsed = time.monotonic() - started
+        self.service_time[priority] += SERVICE_TIME_WEIGHT * (elapsed - self.service_time[priority])
+        self._dispatch()
+
+    def _dispatch(self):
+        """Entrega as vagas livres às requisições em espera, por prioridade."""
+        for priority in PRIORITIES:
+            waiting = self._waiting[priority]
+            while waiting and self._has_slot(priority):
+                _, future = waiting.popleft()
+                if not future.done():
+                    future.set_result(self._start(priority))
+            if self.active >= self.max_active:
+                return
+
+    def snapshot(self) -> dict:
+        """Estado atual (vagas ocupadas, filas e recusas)."""
+        return {
+            "active": self.active,
+            "max_active": self.max_active,
+            "queued": {action: count for action, count in sorted(self.queued.items()) if count},
+            "rejected": self.rejected,
+        }
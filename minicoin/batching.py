@@ -0,0 +1,113 @@
+"""
+MiniCoin Batching - Agrupamento de escritas (group commit)
+Junta depósitos e retiradas que chegam dentro de uma pequena janela de
+tempo (ou até um número máximo de operações) em um único lote, que é
+validado em ordem contra o saldo corrente e gravado de uma só vez,
+com uma única aplicação da política de fsync.
+
+Cada requisição continua recebendo o seu próprio resultado, inclusive
+as retiradas rejeitadas por saldo insuficiente.
+"""
+
+import asyncio
+from typing import List, Optional, Set, Tuple
+
+from minicoin.accounts import Account
+from minicoin.block import Block
+
+
+class WriteBatcher:
+    """
+    Acumula as escritas de uma conta e as aplica em lotes.
+    """
+
+    def __init__(self, account: Account, window: float = 0.002, max_batch: int = 64):
+        """
+        Inicializa o agrupador.
+
+        Args:
+            account: Conta cujas escritas serão agrupadas
+            window: Tempo máximo (s) que a primeira operação espera pelo lote
+            max_batch: Número de operações que dispara o lote imediatamente
+        """
+        self.account = account
+        self.window = window
+        self.max_batch = max(1, max_batch)
+        self.batches = 0
+        self.operations = 0
+        self._pending: List[Tuple[str, float, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # Lotes em aplicação; a referência impede que a tarefa seja coletada
+        self._flushes: Set[asyncio.Task] = set()
+
+    async def submit(self, operation: str, amount: float) -> Tuple[bool, str, Optional[Block]]:
+        """
+        Enfileira uma operação e aguarda o resultado do lote.
+
+        Args:
+            operation: DEPOSIT ou WITHDRAW
+            amount: Valor da operação
+
+        Returns:
+            Tupla (sucesso, mensagem, bloco_criado)
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((operation, amount, future))
+
+        if len(self._pending) >= self.max_batch:
+            self._schedule_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._schedule_flush)
+
+        return await future
+
+    def _schedule_flush(self):
+        """Fecha o lote atual e agenda sua aplicação."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._flush(batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def drain(self):
+        """Aplica o lote em aberto e aguarda os lotes em andamento."""
+        self._schedule_flush()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    async def _flush(self, batch: List[Tuple[str, float, asyncio.Future]]):
+        """Aplica um lote na conta e entrega os resultados individuais."""
+        async with self.account.lock:
+            try:
+                results = self.account.ledger.apply_batch(
+                    [(operation, amount) for operation, amount, _ in batch]
+                )
+            except Exception:
+                # Uma operação problemática não derruba as demais: cada
+                # uma é reaplicada sozinha e recebe o próprio resultado
+                self._apply_each(batch)
+                return
+
+        self.batches += 1
+        self.operations += len(batch)
+        for (_, _, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def _apply_each(self, batch: List[Tuple[str, float, asyncio.Future]]):
+        """Aplica as operações uma a uma, com o resultado ou erro de cada uma."""
+        for operation, amount, future in batch:
+            try:
+                result = self.account.ledger.apply_batch([(operation, amount)])[0]
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.operations += 1
+            if not future.done():
+                future.set_result(result)
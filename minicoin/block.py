@@ -0,0 +1,94 @@
+"""
+MiniCoin Block - Estrutura de um bloco da blockchain
+Define o registro imutável materializado a partir da cadeia compacta.
+
+Valores monetários:
+- Blocos da versão 1 (legado) guardam amount/balance como float, em
+  MiniCoins, e o hash usa str() desses floats
+- A partir da versão 2, amount/balance são inteiros em unidades mínimas
+  (centavos), com aritmética exata e hash sem formatação de float
+- A versão 3 troca a preimage em texto do hash por uma binária
+  (ver minicoin.hashing), com os mesmos valores em centavos
+
+Cadeias antigas continuam válidas: cada bloco é verificado segundo a
+sua versão e os blocos novos são gravados na versão atual.
+"""
+
+import json
+from dataclasses import dataclass, asdict
+from typing import Optional, Union
+
+
+# Unidades mínimas por MiniCoin (centavos)
+AMOUNT_SCALE = 100
+# Versão dos blocos criados por este código
+BLOCK_VERSION = 3
+LEGACY_VERSION = 1
+
+
+def to_minor(amount: float) -> int:
+    """Converte um valor em MiniCoins para unidades mínimas."""
+    return round(amount * AMOUNT_SCALE)
+
+
+def from_minor(minor: int) -> float:
+    """Converte unidades mínimas para MiniCoins."""
+    return minor / AMOUNT_SCALE
+
+
+class MinorAmount(int):
+    """
+    Valor já em unidades mínimas, como o do protocolo binário.
+
+    O ledger recebe valores em MiniCoins; um MinorAmount é aceito como
+    está, sem passar por float, o que preservaria só 53 bits.
+    """
+
+
+@dataclass(slots=True)
+class Block:
+    """
+    Representa um bloco individual na blockchain do MiniCoin.
+
+    Usa __slots__ para evitar um __dict__ por instância; a cadeia em si
+    é guardada de forma colunar (ver minicoin.chain) e os blocos só são
+    materializados quando alguém os pede.
+
+    Attributes:
+        index: Posição do bloco na cadeia (começando em 0)
+        timestamp: Data e hora da criação do bloco
+        operation: Tipo de operação (CREATE, DEPOSIT, WITHDRAW)
+        amount: Valor da transação (centavos a partir da versão 2)
+        balance: Saldo da conta após esta transação (idem)
+        owner: Nome do proprietário da conta
+        previous_hash: Hash do bloco anterior (None para o bloco genesis)
+        hash: Hash deste bloco
+        version: Formato do bloco e do seu hash (1 = legado, em float)
+    """
+    index: int
+    timestamp: str
+    operation: str
+    amount: Union[int, float]
+    balance: Union[int, float]
+    owner: str
+    previous_hash: Optional[str]
+    hash: str
+    version: int = LEGACY_VERSION
+
+    @property
+    def amount_minor(self) -> int:
+        """Valor da transação em unidades mínimas, qualquer que seja a versão."""
+        return self.amount if self.version >= 2 else to_minor(self.amount)
+
+    @property
+    def balance_minor(self) -> int:
+        """Saldo em unidades mínimas, qualquer que seja a versão."""
+        return self.balance if self.version >= 2 else to_minor(self.balance)
+
+    def to_dict(self) -> dict:
+        """Converte o bloco para dicionário."""
+        return asdict(self)
+
+    def to_json(self) -> str:
+        """Converte o bloco para JSON."""
+        return json.dumps(self.to_dict(), indent=2)
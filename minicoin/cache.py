@@ -0,0 +1,143 @@
+"""
+MiniCoin Cache - Cache de respostas das consultas
+Consultas repetidas (painéis fazendo polling de balance, history,
+verify, ping) devolvem a mesma resposta enquanto a cadeia da conta não
+muda. O cache guarda essas respostas já serializadas em JSON, sem os
+campos próprios de cada requisição (request_id, client_id, id,
+timestamp), que são acrescentados ao final dos bytes a cada uso.
+
+A chave inclui o estado da conta (último bloco, geração da cadeia e
+marca d'água da verificação): um bloco novo já muda a chave, e as
+entradas da conta são descartadas em invalidate() para liberar espaço.
+O tamanho é limitado, com descarte do item usado há mais tempo (LRU).
+"""
+
+import json
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Set, Tuple
+
+# Campos de cada requisição, fora dos bytes guardados
+REQUEST_FIELDS = ("request_id", "client_id", "id", "timestamp")
+
+# (conta, estado da conta, ação, parâmetros em JSON)
+CacheKey = Tuple[Optional[str], Hashable, str, str]
+
+
+class PreparedResponse:
+    """Resposta já serializada (JSON, sem o '\\n' final)."""
+
+    __slots__ = ("status", "payload")
+
+    def __init__(self, status: str, payload: bytes):
+        self.status = status
+        self.payload = payload
+
+
+class CachedResponse:
+    """Corpo serializado de uma resposta, sem o '}' final."""
+
+    __slots__ = ("status", "prefix")
+
+    def __init__(self, response: dict):
+        body = {key: value for key, value in response.items() if key not in REQUEST_FIELDS}
+        self.status = response.get("status", "error")
+        self.prefix = json.dumps(body).encode()[:-1]
+
+    def prepare(self, fields: dict) -> PreparedResponse:
+        """Completa o corpo com os campos da requisição."""
+        if not fields:
+            return PreparedResponse(self.status, self.prefix + b"}")
+        separator = b", " if len(self.prefix) > 1 else b""
+        return PreparedResponse(self.status,
+                                self.prefix + separator + json.dumps(fields).encode()[1:])
+
+
+class ResponseCache:
+    """
+    Cache LRU de respostas serializadas, com descarte por conta.
+
+    Só é usado pelo event loop, então dispensa locks.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        """
+        Inicializa o cache.
+
+        Args:
+            max_entries: Máximo de respostas guardadas (0 = desativado)
+        """
+        if max_entries < 0:
+            raise ValueError("max_entries não pode ser negativo")
+
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[CacheKey, CachedResponse]" = OrderedDict()
+        # Chaves guardadas de cada conta, para invalidate()
+        self._by_account: Dict[Optional[str], Set[CacheKey]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(account_id: Optional[str], state: Hashable, action: str, params: dict) -> CacheKey:
+        """Monta a chave de uma consulta (params sem os campos da requisição)."""
+        return account_id, state, action, json.dumps(params, sort_keys=True)
+
+    def get(self, key: CacheKey) -> Optional[CachedResponse]:
+        """Resposta guardada para a chave, ou None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: CacheKey, response: dict) -> CachedResponse:
+        """Serializa e guarda uma resposta, descartando a mais antiga se preciso."""
+        entry = CachedResponse(response)
+        if self.max_entries == 0:
+            return entry
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        self._by_account.setdefault(key[0], set()).add(key)
+        while len(self._entries) > self.max_entries:
+            old_key, _ = self._entries.popitem(last=False)
+            self._discard(old_key)
+        return entry
+
+    def invalidate(self, account_id: Optional[str]):
+        """Descarta as respostas de uma conta (chamado a cada append)."""
+        for key in self._by_account.pop(account_id, ()):
+            self._entries.pop(key, None)
+
+    def _discard(self, key: CacheKey):
+        keys = self._by_account.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_account[key[0]]
+
+    def snapshot(self) -> dict:
+        """Tamanho e acertos do cache."""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def render(self) -> str:
+        """Acertos e tamanho do cache no formato de texto do Prometheus."""
+        return "\n".join([
+            "# HELP minicoin_response_cache_hits_total Read requests answered from the response cache.",
+            "# TYPE minicoin_response_cache_hits_total counter",
+            f"minicoin_response_cache_hits_total {self.hits}",
+            "# HELP minicoin_response_cache_misses_total Cacheable read requests not found in the cache.",
+            "# TYPE minicoin_response_cache_misses_total counter",
+            f"minicoin_response_cache_misses_total {self.misses}",
+            "# HELP minicoin_response_cache_entries Responses held in the response cache.",
+            "# TYPE minicoin_response_cache_entries gauge",
+            f"minicoin_response_cache_entries {len(self._entries)}",
+        ]) + "\n"
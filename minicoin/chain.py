@@ -0,0 +1,613 @@
+"""
+MiniCoin Chain - Armazenamento colunar e compacto da blockchain
+Guarda os campos de cada bloco em arrays paralelos em vez de um objeto
+Block por posição, reduzindo o custo de memória de cadeias longas.
+
+Colunas mantidas:
+- amount / balance: array('q') em unidades mínimas (centavos)
+- version: array('B') com a versão do bloco
+- operation: array('B') com o código da operação
+- timestamp: array('q') com microssegundos desde a época
+- hash: bytearray com os digests SHA-256 crus (32 bytes por bloco)
+
+Índices auxiliares, mantidos a cada append:
+- Somas de prefixo dos valores depositados e retirados, para totais
+  de qualquer intervalo em O(1)
+- Máximo corrente dos timestamps (não-decrescente mesmo se o relógio
+  voltar), para localizar por busca binária o bloco vigente em um instante
+
+O índice é a própria posição na cadeia, o previous_hash é o hash da
+posição anterior e o proprietário é guardado (internado) uma única vez.
+Um trecho copiado com segment() guarda também o índice do seu primeiro
+bloco e o hash que o precede, e pode ser enviado a outro processo.
+Os campos do hash binário (ver minicoin.hashing) saem direto das
+colunas com hash_inputs(), sem materializar blocos.
+A busca de um bloco pelo hash (index_of) usa um índice compacto com os
+8 primeiros bytes de cada digest, criado na primeira consulta e mantido
+a cada append.
+As colunas (inclusive os índices auxiliares) podem ser exportadas em
+bytes com to_snapshot() e recarregadas com from_snapshot(), sem
+materializar nenhum bloco.
+Blocos que não cabem nesse formato (timestamp com fuso, hash fora do
+padrão, float legado que não é um número exato de centavos, etc.)
+guardam os campos divergentes em um dicionário esparso.
+"""
+
+import sys
+from array import array
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from minicoin.block import LEGACY_VERSION, Block, from_minor, to_minor
+
+
+OPERATIONS = ("CREATE", "DEPOSIT", "WITHDRAW")
+OPERATION_CODES = {name: code for code, name in enumerate(OPERATIONS)}
+UNKNOWN_OPERATION = 255
+
+DIGEST_SIZE = 32
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+# Colunas array, na ordem do payload dos snapshots
+ARRAY_COLUMNS = ("_amounts", "_balances", "_versions", "_operations", "_timestamps",
+                 "_deposited", "_withdrawn", "_time_keys")
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def encode_timestamp(timestamp: str) -> Optional[int]:
+    """
+    Converte um timestamp ISO (sem fuso) em microssegundos desde a época.
+
+    Returns:
+        Microssegundos, ou None se a conversão não for reversível
+    """
+    try:
+        moment = datetime.fromisoformat(timestamp)
+    except (TypeError, ValueError):
+        return None
+    if moment.tzinfo is not None or moment.isoformat() != timestamp:
+        return None
+    return (moment - EPOCH) // MICROSECOND
+
+
+def decode_timestamp(micros: int) -> str:
+    """Converte microssegundos desde a época de volta para ISO."""
+    return (EPOCH + timedelta(microseconds=micros)).isoformat()
+
+
+def timestamp_key(timestamp: str) -> int:
+    """
+    Chave de ordenação (microssegundos) de um timestamp ISO qualquer.
+
+    Timestamps com fuso são convertidos para UTC; valores inválidos
+    recebem 0.
+    """
+    try:
+        moment = datetime.fromisoformat(timestamp)
+    except (TypeError, ValueError):
+        return 0
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return (moment - EPOCH) // MICROSECOND
+
+
+def encode_minor(value, version: int) -> Tuple[int, bool]:
+    """
+    Converte o valor de um bloco para a coluna em unidades mínimas.
+
+    Returns:
+        Tupla (valor na coluna, True se a coluna reproduz o valor exato)
+    """
+    if version >= 2:
+        if type(value) is int and INT64_MIN <= value <= INT64_MAX:
+            return value, True
+    elif type(value) is float:
+        try:
+            minor = to_minor(value)
+        except (OverflowError, ValueError):
+            return 0, False
+        if INT64_MIN <= minor <= INT64_MAX:
+            # Só é exato se a volta para float reproduzir o str() do hash
+            return minor, from_minor(minor) == value
+        return 0, False
+    # Valores de tipo inesperado: melhor aproximação para os índices
+    try:
+        minor = value if version >= 2 else to_minor(value)
+        minor = int(minor)
+    except (TypeError, ValueError, OverflowError):
+        return 0, False
+    return (minor, False) if INT64_MIN <= minor <= INT64_MAX else (0, False)
+
+
+def encode_digest(block_hash: str) -> Optional[bytes]:
+    """
+    Converte um hash hexadecimal de 64 caracteres em 32 bytes crus.
+
+    Returns:
+        Digest cru, ou None se o hash não estiver no formato canônico
+    """
+    if not isinstance(block_hash, str) or len(block_hash) != 2 * DIGEST_SIZE:
+        return None
+    try:
+        digest = bytes.fromhex(block_hash)
+    except ValueError:
+        return None
+    return digest if digest.hex() == block_hash else None
+
+
+class ChainStore:
+    """
+    Sequência de blocos em formato colunar.
+
+    Implementa o protocolo de sequência (len, indexação, fatias e
+    iteração); os objetos Block são criados sob demanda a cada acesso.
+    Alterar um Block materializado não altera a cadeia: para substituir
+    um bloco, atribua-o à posição (chain[i] = block).
+    """
+
+    def __init__(self, owner: str):
+        """
+        Inicializa uma cadeia vazia.
+
+        Args:
+            owner: Proprietário da conta (guardado uma única vez)
+        """
+        self.owner = sys.intern(owner)
+        self._amounts = array("q")
+        self._balances = array("q")
+        self._versions = array("B")
+        self._operations = array("B")
+        self._timestamps = array("q")
+        self._digests = bytearray()
+        # Campos que não couberam nas colunas, por posição
+        self._irregular: Dict[int, dict] = {}
+        # Índices auxiliares
+        self._deposited = array("q")
+        self._withdrawn = array("q")
+        self._time_keys = array("q")
+        # Trechos (segment) começam em first_index, após base_previous_hash
+        self.first_index = 0
+        self.base_previous_hash: Optional[str] = None
+        # Prefixo de 8 bytes do digest -> posição (None até a primeira busca)
+        self._hash_index: Optional[Dict[int, int]] = None
+        # Digests completos cujo prefixo colidiu com o de outro bloco
+        self._hash_overflow: Dict[bytes, int] = {}
+        # Muda a cada substituição de bloco (chain[i] = block)
+        self.generation = 0
+
+    def __len__(self) -> int:
+        return len(self._operations)
+
+    def _position(self, index: int) -> int:
+        """Normaliza um índice (aceita negativos) e valida os limites."""
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("chain index out of range")
+        return index
+
+    def hash_at(self, index: int) -> str:
+        """Hash hexadecimal do bloco na posição `index`, sem materializá-lo."""
+        index = self._position(index)
+        extra = self._irregular.get(index)
+        if extra and "hash" in extra:
+            return extra["hash"]
+        start = index * DIGEST_SIZE
+        return self._digests[start:start + DIGEST_SIZE].hex()
+
+    def digest_at(self, index: int) -> bytes:
+        """
+        Digest cru (32 bytes) do bloco na posição `index`.
+
+        Hashes fora do padrão, guardados como campo irregular, não têm
+        digest: a coluna traz zeros nessa posição.
+        """
+        start = self._position(index) * DIGEST_SIZE
+        return bytes(self._digests[start:start + DIGEST_SIZE])
+
+    def balance_at(self, index: int) -> int:
+        """Saldo (em unidades mínimas) após o bloco na posição `index`."""
+        return self._balances[self._position(index)]
+
+    def amount_at(self, index: int) -> int:
+        """Valor (em unidades mínimas) do bloco na posição `index`."""
+        return self._amounts[self._position(index)]
+
+    def version_at(self, index: int) -> int:
+        """Versão do bloco na posição `index`, sem materializá-lo."""
+        index = self._position(index)
+        extra = self._irregular.get(index)
+        if extra and "version" in extra:
+            return extra["version"]
+        return self._versions[index]
+
+    def operation_at(self, index: int) -> Optional[str]:
+        """Operação do bloco na posição `index`, sem materializá-lo."""
+        index = self._position(index)
+        extra = self._irregular.get(index)
+        if extra and "operation" in extra:
+            return extra["operation"]
+        code = self._operations[index]
+        return OPERATIONS[code] if code < len(OPERATIONS) else None
+
+    def previous_hash_at(self, index: int) -> Optional[str]:
+        """previous_hash do bloco na posição `index`, sem materializá-lo."""
+        index = self._position(index)
+        extra = self._irregular.get(index)
+        if extra and "previous_hash" in extra:
+            return extra["previous_hash"]
+        return self.hash_at(index - 1) if index else self.base_previous_hash
+
+    def hash_inputs(self, start: int = 0) -> Iterator[Tuple[int, Optional[tuple]]]:
+        """
+        Percorre os campos de hash dos blocos a partir de `start`, lidos
+        direto das colunas.
+
+        Yields:
+            Tupla (posição, campos), com campos = (versão, índice, micros,
+            código, amount, balance, digest anterior, digest), ou None se
+            o bloco (ou o hash anterior) tiver campos irregulares e
+            precisar ser materializado
+        """
+        irregular = self._irregular
+        digests = self._digests
+        if self.base_previous_hash is None:
+            base = bytes(DIGEST_SIZE)
+        else:
+            base = encode_digest(self.base_previous_hash)
+        for position in range(start, len(self)):
+            if position in irregular or (position - 1) in irregular:
+                yield position, None
+                continue
+            begin = position * DIGEST_SIZE
+            previous = digests[begin - DIGEST_SIZE:begin] if position else base
+            if previous is None:
+                yield position, None
+                continue
+            yield position, (self._versions[position], self.first_index + position,
+                             self._timestamps[position], self._operations[position],
+                             self._amounts[position], self._balances[position],
+                             previous, digests[begin:begin + DIGEST_SIZE])
+
+    def link_intact(self, index: int) -> bool:
+        """
+        Confere se o previous_hash do bloco `index` é o hash do anterior.
+
+        Sem campos irregulares o encadeamento vem da própria posição, e
+        só os blocos com previous_hash divergente precisam ser comparados.
+        """
+        index = self._position(index)
+        extra = self._irregular.get(index)
+        if not extra or "previous_hash" not in extra:
+            return True
+        expected = self.hash_at(index - 1) if index else self.base_previous_hash
+        return extra["previous_hash"] == expected
+
+    def _encode(self, position: int, block: Block, previous_hash: Optional[str]):
+        """
+        Separa um bloco em valores de coluna e campos irregulares.
+
+        Returns:
+            Tupla (amount, balance, versão, código, timestamp, digest, irregulares)
+        """
+        extra = {}
+
+        version = block.version
+        if type(version) is not int or not 0 <= version < 256:
+            extra["version"] = version
+            version = LEGACY_VERSION
+
+        if block.index != self.first_index + position:
+            extra["index"] = block.index
+        if block.owner != self.owner:
+            extra["owner"] = block.owner
+        if block.previous_hash != previous_hash:
+            extra["previous_hash"] = block.previous_hash
+
+        code = OPERATION_CODES.get(block.operation, UNKNOWN_OPERATION)
+        if code == UNKNOWN_OPERATION:
+            extra["operation"] = block.operation
+
+        # Valores que a coluna não reproduz exatamente mudariam o hash
+        amount, exact = encode_minor(block.amount, version)
+        if not exact:
+            extra["amount"] = block.amount
+        balance, exact = encode_minor(block.balance, version)
+        if not exact:
+            extra["balance"] = block.balance
+
+        micros = encode_timestamp(block.timestamp)
+        if micros is None:
+            extra["timestamp"] = block.timestamp
+            micros = timestamp_key(block.timestamp)
+
+        digest = encode_digest(block.hash)
+        if digest is None:
+            extra["hash"] = block.hash
+            digest = bytes(DIGEST_SIZE)
+
+        return amount, balance, version, code, micros, digest, extra
+
+    def append(self, block: Block):
+        """Adiciona um bloco ao final da cadeia."""
+        position = len(self)
+        previous_hash = self.hash_at(position - 1) if position else self.base_previous_hash
+        amount, balance, version, code, micros, digest, extra = \
+            self._encode(position, block, previous_hash)
+
+        self._amounts.append(amount)
+        self._balances.append(balance)
+        self._versions.append(version)
+        self._timestamps.append(micros)
+        self._digests += digest
+        if extra:
+            self._irregular[position] = extra
+        self._index_block(position, block)
+        if self._hash_index is not None:
+            self._index_hash(position)
+        # Por último: len() vem desta coluna, e leitores em outras threads
+        # (históricos fora do event loop) só veem o bloco já completo
+        self._operations.append(code)
+
+    def _index_block(self, position: int, block: Block):
+        """Atualiza os índices auxiliares com o bloco em `position`."""
+        deposited = self._deposited[position - 1] if position else 0
+        withdrawn = self._withdrawn[position - 1] if position else 0
+        if block.operation == "DEPOSIT":
+            deposited += self._amounts[position]
+        elif block.operation == "WITHDRAW":
+            withdrawn += self._amounts[position]
+
+        time_key = self._timestamps[position]
+        if position and self._time_keys[position - 1] > time_key:
+            time_key = self._time_keys[position - 1]
+
+        if position == len(self._deposited):
+            self._deposited.append(deposited)
+            self._withdrawn.append(withdrawn)
+            self._time_keys.append(time_key)
+        else:
+            self._deposited[position] = deposited
+            self._withdrawn[position] = withdrawn
+            self._time_keys[position] = time_key
+
+    def extend(self, blocks):
+        """Adiciona vários blocos ao final da cadeia."""
+        for block in blocks:
+            self.append(block)
+
+    def __setitem__(self, index: int, block: Block):
+        """
+        Substitui o bloco na posição `index`.
+
+        O previous_hash do bloco seguinte continua sendo o hash antigo,
+        como aconteceria com uma lista de objetos.
+        """
+        index = self._position(index)
+        # O índice de hashes é refeito na próxima busca
+        self._hash_index = None
+        self.generation += 1
+        following = index + 1
+        if following < len(self):
+            old_hash = self.hash_at(index)
+            self._irregular.setdefault(following, {}).setdefault("previous_hash", old_hash)
+
+        previous_hash = self.hash_at(index - 1) if index else self.base_previous_hash
+        amount, balance, version, code, micros, digest, extra = \
+            self._encode(index, block, previous_hash)
+
+        self._amounts[index] = amount
+        self._balances[index] = balance
+        self._versions[index] = version
+        self._operations[index] = code
+        self._timestamps[index] = micros
+        self._digests[index * DIGEST_SIZE:(index + 1) * DIGEST_SIZE] = digest
+        if extra:
+            self._irregular[index] = extra
+        else:
+            self._irregular.pop(index, None)
+
+        # O bloco seguinte pode ter voltado a apontar para o hash atual
+        pinned = self._irregular.get(following)
+        if pinned and pinned.get("previous_hash") == block.hash:
+            del pinned["previous_hash"]
+            if not pinned:
+                del self._irregular[following]
+
+        # Os índices acumulados mudam a partir desta posição
+        for position in range(index, len(self)):
+            self._index_block(position, block if position == index else self._materialize(position))
+
+    def totals_through(self, index: int) -> Tuple[int, int]:
+        """
+        Totais depositado e retirado do genesis até `index` (inclusive),
+        em unidades mínimas.
+
+        Returns:
+            Tupla (depositado, retirado); (0, 0) para index -1
+        """
+        if index < 0:
+            return 0, 0
+        index = self._position(index)
+        return self._deposited[index], self._withdrawn[index]
+
+    def index_at_time(self, micros: int) -> int:
+        """
+        Último bloco criado até o instante `micros` (busca binária).
+
+        Returns:
+            Índice do bloco, ou -1 se o instante for anterior ao genesis
+        """
+        return bisect_right(self._time_keys, micros) - 1
+
+    def _index_hash(self, position: int):
+        """Adiciona o digest da posição `position` ao índice de hashes."""
+        start = position * DIGEST_SIZE
+        digest = bytes(self._digests[start:start + DIGEST_SIZE])
+        prefix = int.from_bytes(digest[:8], "big")
+        if self._hash_index.setdefault(prefix, position) != position:
+            self._hash_overflow.setdefault(digest, position)
+
+    def index_of(self, block_hash: str) -> int:
+        """
+        Localiza um bloco pelo hash em O(1).
+
+        Returns:
+            Índice do bloco, ou -1 se nenhum bloco tiver esse hash
+        """
+        digest = encode_digest(block_hash)
+        if digest is None:
+            # Hashes fora do padrão só existem como campos irregulares
+            for position, extra in sorted(self._irregular.items()):
+                if extra.get("hash") == block_hash:
+                    return self.first_index + position
+            return -1
+
+        if self._hash_index is None:
+            self._hash_index = {}
+            self._hash_overflow = {}
+            for position in range(len(self)):
+                self._index_hash(position)
+
+        position = self._hash_index.get(int.from_bytes(digest[:8], "big"))
+        if position is None:
+            return -1
+        if self.hash_at(position) != block_hash:
+            position = self._hash_overflow.get(digest)
+            if position is None or self.hash_at(position) != block_hash:
+                return -1
+        return self.first_index + position
+
+    def _materialize(self, index: int) -> Block:
+        """Cria o objeto Block da posição `index` (já normalizada)."""
+        start = index * DIGEST_SIZE
+        code = self._operations[index]
+        version = self._versions[index]
+        amount = self._amounts[index]
+        balance = self._balances[index]
+        fields = {
+            "index": self.first_index + index,
+            "timestamp": decode_timestamp(self._timestamps[index]),
+            "operation": OPERATIONS[code] if code < len(OPERATIONS) else None,
+            "amount": amount if version >= 2 else from_minor(amount),
+            "balance": balance if version >= 2 else from_minor(balance),
+            "owner": self.owner,
+            "previous_hash": self.hash_at(index - 1) if index else self.base_previous_hash,
+            "hash": self._digests[start:start + DIGEST_SIZE].hex(),
+            "version": version,
+        }
+        extra = self._irregular.get(index)
+        if extra:
+            fields.update(extra)
+        return Block(**fields)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Block, List[Block]]:
+        if isinstance(index, slice):
+            return [self._materialize(i) for i in range(*index.indices(len(self)))]
+        return self._materialize(self._position(index))
+
+    def __iter__(self) -> Iterator[Block]:
+        for index in range(len(self)):
+            yield self._materialize(index)
+
+    def segment(self, start: int, stop: int) -> "ChainStore":
+        """
+        Copia as posições [start, stop) para uma nova cadeia independente.
+
+        Os blocos materializados do trecho são idênticos aos da cadeia
+        original (mesmo índice e previous_hash); o trecho é serializável
+        com pickle e pode ser verificado em outro processo.
+        """
+        start, stop, _ = slice(start, stop).indices(len(self))
+        stop = max(start, stop)
+        part = ChainStore(self.owner)
+        part.first_index = self.first_index + start
+        part.base_previous_hash = self.previous_hash_at(start) if start < len(self) else None
+        for name in ARRAY_COLUMNS:
+            setattr(part, name, getattr(self, name)[start:stop])
+        part._digests = self._digests[start * DIGEST_SIZE:stop * DIGEST_SIZE]
+        part._irregular = {position - start: dict(extra)
+                           for position, extra in self._irregular.items()
+                           if start <= position < stop}
+        # O previous_hash irregular do primeiro bloco já virou a base
+        first = part._irregular.get(0)
+        if first and "previous_hash" in first:
+            del first["previous_hash"]
+            if not first:
+                del part._irregular[0]
+        return part
+
+    def to_snapshot(self) -> Tuple[dict, bytes]:
+        """
+        Exporta as colunas da cadeia.
+
+        Returns:
+            Tupla (metadados serializáveis em JSON, payload binário)
+        """
+        columns = []
+        parts = []
+        for name in ARRAY_COLUMNS:
+            column = getattr(self, name)
+            data = column.tobytes()
+            columns.append([name, column.typecode, len(data)])
+            parts.append(data)
+        columns.append(["_digests", "B", len(self._digests)])
+        parts.append(bytes(self._digests))
+
+        metadata = {
+            "owner": self.owner,
+            "first_index": self.first_index,
+            "base_previous_hash": self.base_previous_hash,
+            "byteorder": sys.byteorder,
+            "columns": columns,
+            "irregular": [[position, extra] for position, extra in sorted(self._irregular.items())],
+        }
+        return metadata, b"".join(parts)
+
+    @classmethod
+    def from_snapshot(cls, metadata: dict, payload: bytes) -> "ChainStore":
+        """
+        Reconstrói uma cadeia exportada com to_snapshot().
+
+        Raises:
+            ValueError: Metadados incompatíveis com o payload
+        """
+        chain = cls(metadata["owner"])
+        chain.first_index = metadata["first_index"]
+        chain.base_previous_hash = metadata["base_previous_hash"]
+
+        offset = 0
+        for name, typecode, size in metadata["columns"]:
+            data = payload[offset:offset + size]
+            if len(data) != size:
+                raise ValueError(f"Snapshot truncado na coluna {name}")
+            offset += size
+            if name == "_digests":
+                chain._digests = bytearray(data)
+                continue
+            if name not in ARRAY_COLUMNS or getattr(chain, name).typecode != typecode:
+                raise ValueError(f"Coluna inesperada no snapshot: {name}")
+            column = array(typecode)
+            column.frombytes(data)
+            if metadata["byteorder"] != sys.byteorder:
+                column.byteswap()
+            setattr(chain, name, column)
+
+        if offset != len(payload):
+            raise ValueError("Dados excedentes no fim do snapshot")
+        length = len(chain._operations)
+        if any(len(getattr(chain, name)) != length for name in ARRAY_COLUMNS) \
+                or len(chain._digests) != length * DIGEST_SIZE:
+            raise ValueError("Colunas do snapshot com tamanhos diferentes")
+
+        chain._irregular = {position: extra for position, extra in metadata["irregular"]}
+        return chain
+
+    def memory_usage(self) -> int:
+        """Estimativa, em bytes, da memória ocupada pelas colunas."""
+        return (sum(column.itemsize * len(column) for column in (
+            self._amounts, self._balances, self._versions, self._operations, self._timestamps,
+            self._deposited, self._withdrawn, self._time_keys
+        )) + len(self._digests))
@@ -0,0 +1,147 @@
+"""
+MiniCoin Hashing - Hash versionado dos blocos
+Cada bloco é verificado segundo o formato da sua versão:
+
+- Versão 1 (legado): campos concatenados sem separador, valores em float
+- Versão 2: campos em texto separados por "|", valores em centavos
+- Versão 3 (atual): preimage binária, sem strings intermediárias
+
+Preimage da versão 3 (inteiros em big-endian):
+- Prefixo: versão (uint8), tamanho do proprietário (uint32) e o
+  proprietário em UTF-8; o estado SHA-256 do prefixo é calculado uma
+  vez por proprietário e copiado para cada bloco
+- Campos: índice (uint64), timestamp em microssegundos desde a época
+  (int64), código da operação (uint8), amount e balance em centavos (int64)
+- Digest cru de 32 bytes do bloco anterior (zeros no genesis)
+
+São exatamente os valores das colunas do ChainStore, então a
+verificação recalcula os hashes direto das colunas, sem materializar
+blocos. Os digests circulam como bytes; o hexadecimal fica para a API.
+"""
+
+import hashlib
+import struct
+from functools import lru_cache
+from typing import Optional
+
+from minicoin.block import BLOCK_VERSION, LEGACY_VERSION
+from minicoin.chain import DIGEST_SIZE, OPERATION_CODES, ChainStore, encode_timestamp
+
+
+# Primeira versão com a preimage binária
+BINARY_VERSION = 3
+GENESIS_DIGEST = bytes(DIGEST_SIZE)
+
+PREFIX_HEADER = struct.Struct(">BI")
+BLOCK_FIELDS = struct.Struct(">QqBqq")
+
+
+@lru_cache(maxsize=1024)
+def owner_prefix(owner: str, version: int = BLOCK_VERSION) -> "hashlib._Hash":
+    """
+    Estado SHA-256 já alimentado com a versão e o proprietário.
+
+    O objeto é compartilhado: use-o apenas através de copy().
+    """
+    owner_bytes = owner.encode()
+    prefix = hashlib.sha256(PREFIX_HEADER.pack(version, len(owner_bytes)))
+    prefix.update(owner_bytes)
+    return prefix
+
+
+def block_digest(prefix: "hashlib._Hash", index: int, micros: int, code: int,
+                 amount: int, balance: int, previous_digest: bytes) -> bytes:
+    """
+    Calcula o digest cru de um bloco no formato binário.
+
+    Args:
+        prefix: Estado de owner_prefix() do proprietário e da versão
+        index: Índice do bloco
+        micros: Timestamp em microssegundos desde a época
+        code: Código da operação
+        amount: Valor em centavos
+        balance: Saldo em centavos
+        previous_digest: Digest cru do bloco anterior (GENESIS_DIGEST no genesis)
+
+    Returns:
+        Digest SHA-256 de 32 bytes
+    """
+    hasher = prefix.copy()
+    hasher.update(BLOCK_FIELDS.pack(index, micros, code, amount, balance))
+    hasher.update(previous_digest)
+    return hasher.digest()
+
+
+def calculate_hash(index: int, timestamp: str, operation: str,
+                   amount: int, balance: int, owner: str,
+                   previous_hash: Optional[str], version: int = BLOCK_VERSION) -> str:
+    """
+    Calcula o hash SHA-256 de um bloco, no formato da sua versão.
+
+    Raises:
+        ValueError: Campos que não cabem na preimage binária (timestamp
+            com fuso, operação desconhecida, hash anterior fora do padrão)
+        TypeError: Valores de tipo inesperado na preimage binária
+
+    Returns:
+        Hash SHA-256 em formato hexadecimal
+    """
+    if version == LEGACY_VERSION:
+        block_data = f"{index}{timestamp}{operation}{amount}{balance}{owner}{previous_hash or ''}"
+        return hashlib.sha256(block_data.encode()).hexdigest()
+    if version < BINARY_VERSION:
+        block_data = f"{version}|{index}|{timestamp}|{operation}|{amount}|{balance}|{owner}|{previous_hash or ''}"
+        return hashlib.sha256(block_data.encode()).hexdigest()
+
+    micros = encode_timestamp(timestamp)
+    if micros is None:
+        raise ValueError(f"Timestamp fora do formato binário: {timestamp!r}")
+    if operation not in OPERATION_CODES:
+        raise ValueError(f"Operação desconhecida: {operation!r}")
+    if previous_hash is None:
+        previous_digest = GENESIS_DIGEST
+    else:
+        previous_digest = bytes.fromhex(previous_hash)
+        if len(previous_digest) != DIGEST_SIZE:
+            raise ValueError("Hash anterior deve ter 32 bytes")
+    try:
+        digest = block_digest(owner_prefix(owner, version), index, micros,
+                              OPERATION_CODES[operation], amount, balance, previous_digest)
+    except struct.error as e:
+        raise TypeError(str(e)) from e
+    return digest.hex()
+
+
+def first_invalid_hash(segment: ChainStore, start: int = 0) -> int:
+    """
+    Recalcula o hash de cada bloco de um trecho da cadeia.
+
+    Blocos no formato binário são conferidos direto das colunas; os
+    demais (versões antigas ou com campos irregulares) são materializados.
+    Cada hash depende apenas dos campos do próprio bloco (inclusive o
+    previous_hash gravado), então trechos diferentes podem ser
+    verificados em paralelo; o encadeamento fica para a passada final.
+
+    Args:
+        segment: Cadeia ou trecho a verificar
+        start: Primeira posição do trecho a recalcular
+
+    Returns:
+        Índice do primeiro bloco com hash inválido, ou -1
+    """
+    for position, fields in segment.hash_inputs(start):
+        if fields is not None and fields[0] >= BINARY_VERSION:
+            version, index, micros, code, amount, balance, previous_digest, digest = fields
+            valid = block_digest(owner_prefix(segment.owner, version), index, micros, code,
+                                 amount, balance, previous_digest) == digest
+        else:
+            block = segment[position]
+            try:
+                valid = block.hash == calculate_hash(
+                    block.index, block.timestamp, block.operation, block.amount,
+                    block.balance, block.owner, block.previous_hash, block.version)
+            except (TypeError, ValueError, OverflowError):
+                valid = False
+        if not valid:
+            return segment.first_index + position
+    return -1
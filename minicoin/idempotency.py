@@ -0,0 +1,142 @@
+"""
+MiniCoin Idempotency - Deduplicação de escritas repetidas
+Um cliente que não recebeu a resposta de um depósito (timeout, conexão
+caída) não sabe se ele foi aplicado. Enviando a mesma chave de
+idempotência na nova tentativa, o servidor devolve o resultado da
+primeira execução, com o bloco original, em vez de gravar outro bloco.
+
+A tabela fica em memória e é limitada por tempo (ttl) e por tamanho:
+as chaves mais antigas são descartadas primeiro. É otimista: cobre as
+repetições feitas logo em seguida, ao mesmo servidor; uma chave
+descartada ou um servidor reiniciado aplicam a operação de novo.
+
+Repetições que chegam enquanto a primeira execução ainda está em
+andamento aguardam o resultado dela. Se a primeira execução falhar com
+uma exceção, ou com um resultado que não deve ser lembrado (uma
+retirada recusada por saldo insuficiente, por exemplo), a chave é
+liberada e a próxima tentativa executa de novo. Chaves em andamento
+nunca são descartadas pelo limite de tamanho.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Hashable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class IdempotencyKeyReused(Exception):
+    """Chave de idempotência repetida com outra operação ou valor."""
+
+
+@dataclass
+class _Entry:
+    fingerprint: Hashable
+    future: asyncio.Future
+    expires_at: float
+
+
+class IdempotencyTable:
+    """
+    Resultados recentes de escritas, por (conta, chave).
+
+    Só é usado pelo event loop, então dispensa locks.
+    """
+
+    def __init__(self, ttl: float = 300.0, max_entries: int = 100_000):
+        """
+        Inicializa a tabela.
+
+        Args:
+            ttl: Tempo (s) durante o qual uma chave é lembrada
+            max_entries: Máximo de chaves lembradas
+        """
+        if ttl <= 0 or max_entries <= 0:
+            raise ValueError("ttl e max_entries devem ser positivos")
+
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.replays = 0
+        self.conflicts = 0
+        # Em ordem de inserção, que é também a ordem de expiração
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _expire(self, now: float):
+        excess = len(self._entries) - self.max_entries
+        stale = []
+        for scope, entry in self._entries.items():
+            if entry.expires_at > now and excess <= 0:
+                break
+            # Uma chave em andamento fica: descartá-la executaria a repetição
+            if entry.future.done():
+                stale.append(scope)
+                excess -= 1
+        for scope in stale:
+            del self._entries[scope]
+
+    async def run(self, scope: Hashable, fingerprint: Hashable,
+                  operation: Callable[[], Awaitable[T]],
+                  keep: Optional[Callable[[T], bool]] = None) -> T:
+        """
+        Executa a operação uma única vez por `scope` dentro do ttl.
+
+        Args:
+            scope: Identificação da chave, como (conta, chave de idempotência)
+            fingerprint: Operação e valor, comparados nas repetições
+            operation: Executa a escrita
+            keep: Decide se o resultado é lembrado (padrão: sempre); um
+                resultado descartado ainda é entregue às repetições que
+                já aguardavam, mas a chave é liberada
+
+        Returns:
+            O resultado da primeira execução com esta chave
+
+        Raises:
+            IdempotencyKeyReused: A chave já foi usada com outro fingerprint
+        """
+        while True:
+            now = time.monotonic()
+            self._expire(now)
+            entry = self._entries.get(scope)
+            if entry is None:
+                break
+            if entry.fingerprint != fingerprint:
+                self.conflicts += 1
+                raise IdempotencyKeyReused(
+                    "Idempotency key was already used with a different operation or amount")
+            # Aguarda sem propagar um cancelamento da primeira execução
+            await asyncio.wait([entry.future])
+            if not entry.future.cancelled():
+                self.replays += 1
+                return entry.future.result()
+
+        future = asyncio.get_running_loop().create_future()
+        entry = _Entry(fingerprint, future, now + self.ttl)
+        self._entries[scope] = entry
+        self._expire(now)
+        try:
+            result = await operation()
+        except BaseException:
+            # Não se sabe o que foi gravado: quem repetir executa de novo
+            if self._entries.get(scope) is entry:
+                del self._entries[scope]
+            future.cancel()
+            raise
+        if keep is not None and not keep(result) and self._entries.get(scope) is entry:
+            del self._entries[scope]
+        future.set_result(result)
+        return result
+
+    def snapshot(self) -> dict:
+        """Chaves lembradas, repetições atendidas e conflitos."""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "replays": self.replays,
+            "conflicts": self.conflicts,
+        }
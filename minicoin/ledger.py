@@ -10,46 +10,45 @@ Cada bloco contém:
 - Saldo após a transação
 - Hash do bloco anterior
 - Hash do bloco atual (calculado sobre todos os campos acima)
+
+Internamente valores e saldos são inteiros em unidades mínimas
+(centavos); a API pública continua recebendo e devolvendo MiniCoins.
+Blocos legados (versão 1, em float) seguem válidos e verificáveis.
 """
 
+import copy
 import hashlib
-import json
-from dataclasses import dataclass, asdict
+import hmac
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Optional, Tuple
+from typing import TYPE_CHECKING, Iterator, List, Optional, Tuple
+
+from minicoin.block import BLOCK_VERSION, LEGACY_VERSION, Block, MinorAmount, from_minor, to_minor
+from minicoin.chain import EPOCH, INT64_MAX, MICROSECOND, OPERATION_CODES, ChainStore, timestamp_key
+# calculate_hash é reexportado para quem o importava daqui
+from minicoin.hashing import (GENESIS_DIGEST, block_digest, calculate_hash,  # noqa: F401
+                              first_invalid_hash, owner_prefix)
+
+if TYPE_CHECKING:
+    from minicoin.snapshot import SnapshotManager
+    from minicoin.storage import BlockStore
 
 
-@dataclass
-class Block:
+@dataclass(frozen=True)
+class Checkpoint:
     """
-    Representa um bloco individual na blockchain do MiniCoin.
-    
+    Checkpoint assinado de um trecho já verificado da cadeia.
+
     Attributes:
-        index: Posição do bloco na cadeia (começando em 0)
-        timestamp: Data e hora da criação do bloco
-        operation: Tipo de operação (CREATE, DEPOSIT, WITHDRAW)
-        amount: Valor da transação
-        balance: Saldo da conta após esta transação
-        owner: Nome do proprietário da conta
-        previous_hash: Hash do bloco anterior (None para o bloco genesis)
-        hash: Hash deste bloco
+        index: Índice do bloco ancorado pelo checkpoint
+        block_hash: Hash do bloco no momento da verificação
+        signature: HMAC-SHA256 de (index, block_hash) com a chave do ledger
     """
     index: int
-    timestamp: str
-    operation: str
-    amount: float
-    balance: float
-    owner: str
-    previous_hash: Optional[str]
-    hash: str
-
-    def to_dict(self) -> dict:
-        """Converte o bloco para dicionário."""
-        return asdict(self)
-
-    def to_json(self) -> str:
-        """Converte o bloco para JSON."""
-        return json.dumps(self.to_dict(), indent=2)
+    block_hash: str
+    signature: str
 
 
 class MiniCoinLedger:
@@ -58,28 +57,139 @@ class MiniCoinLedger:
     
     Mantém uma lista encadeada de blocos onde cada bloco contém
     o hash do bloco anterior, garantindo integridade da cadeia.
+
+    Para evitar recalcular o hash de toda a cadeia a cada verificação,
+    o ledger mantém uma marca d'água ("verificado até o índice N") e
+    checkpoints assinados periódicos; a verificação incremental só
+    recalcula os blocos adicionados depois da última verificação.
     """
 
-    def __init__(self, owner: str, initial_deposit: float = 0.0):
+    def __init__(self, owner: str, initial_deposit: float = 0.0,
+                 checkpoint_interval: int = 100,
+                 checkpoint_key: Optional[bytes] = None,
+                 store: Optional["BlockStore"] = None,
+                 snapshots: Optional["SnapshotManager"] = None,
+                 genesis: Optional[Block] = None, auto_snapshot: bool = True):
         """
         Inicializa o ledger com um bloco genesis.
+
+        Se um armazenamento com blocos gravados for informado, a cadeia
+        é reconstruída a partir dele (e auditada) em vez de criar um
+        novo genesis; nesse caso `owner` e `initial_deposit` vêm do
+        bloco genesis gravado. Com um gerenciador de snapshots, a
+        reconstrução parte do snapshot mais recente e só os blocos
+        gravados depois dele são lidos e verificados. Réplicas informam
+        o `genesis` da cadeia primária, que é conferido e adotado no
+        lugar de um genesis novo.
         
         Args:
             owner: Nome do proprietário da conta
             initial_deposit: Depósito inicial (padrão: 0.0)
+            checkpoint_interval: Blocos entre checkpoints assinados (padrão: 100)
+            checkpoint_key: Chave HMAC dos checkpoints (padrão: aleatória)
+            store: Armazenamento persistente dos blocos (opcional)
+            snapshots: Gerenciador de snapshots da cadeia (opcional)
+            genesis: Bloco genesis de outra cadeia, para réplicas (opcional)
+            auto_snapshot: Grava os snapshots periódicos no próprio append;
+                False quando quem usa o ledger os grava fora do caminho de
+                escrita (o servidor, ver MiniCoinServer.schedule_snapshot)
+
+        Raises:
+            ValueError: checkpoint_interval, genesis ou depósito inicial inválido
         """
+        if checkpoint_interval <= 0:
+            raise ValueError("checkpoint_interval deve ser positivo")
+        if genesis is not None:
+            owner = genesis.owner
+
         self.owner = owner
-        self.chain: List[Block] = []
-        self._create_genesis_block(initial_deposit)
+        self.chain = ChainStore(owner)
+        self.checkpoint_interval = checkpoint_interval
+        self.checkpoints: List[Checkpoint] = []
+        self._checkpoint_key = checkpoint_key or os.urandom(32)
+        self._verified_index = -1
+        self._verified_hash: Optional[str] = None
+        self.store = store
+        self.snapshots = snapshots
+        self.auto_snapshot = auto_snapshot
+
+        if store is not None and len(store) > 0:
+            self._load_from_store()
+        elif genesis is not None:
+            valid, message = self.append_replicated([genesis])
+            if not valid:
+                raise ValueError(message)
+        else:
+            self._create_genesis_block(initial_deposit)
+
+    def _load_from_store(self):
+        """
+        Reconstrói a cadeia a partir do armazenamento persistente.
+
+        Raises:
+            StorageError: Se a cadeia gravada não passar na auditoria
+        """
+        from minicoin.storage import StorageError
+
+        snapshot = None
+        if self.snapshots is not None:
+            snapshot = self.snapshots.load_latest(
+                len(self.store), lambda index: self.store.read_block(index).hash)
+        if snapshot is not None and snapshot.first_index == 0 and len(snapshot) > 0:
+            # O snapshot só é gravado após uma verificação bem-sucedida e
+            # termina no mesmo bloco gravado (load_latest confere o hash)
+            self.owner = snapshot.owner
+            self.chain = snapshot
+            self._advance_watermark(len(snapshot) - 1)
+            self.chain.extend(self.store.iter_blocks(len(snapshot)))
+            valid, message = self.verify_integrity(full=False)
+        else:
+            blocks = self.store.iter_blocks()
+            genesis = next(blocks)
+            self.owner = genesis.owner
+            self.chain = ChainStore(genesis.owner)
+            self.chain.append(genesis)
+            self.chain.extend(blocks)
+            valid, message = self.verify_integrity(full=True)
+
+        if not valid:
+            raise StorageError(f"Cadeia persistida inválida: {message}")
+
+    def _append_blocks(self, blocks: List[Block]):
+        """Adiciona blocos à cadeia, gravando-os antes no armazenamento."""
+        if self.store is not None:
+            self.store.append_many(blocks)
+        self.chain.extend(blocks)
+        if self.auto_snapshot and self.snapshot_due():
+            self.write_snapshot()
+
+    def snapshot_due(self) -> bool:
+        """Retorna True se já passaram `interval` blocos desde o último snapshot."""
+        return self.snapshots is not None and self.snapshots.due(len(self.chain))
+
+    def write_snapshot(self):
+        """
+        Verifica os blocos novos e grava um snapshot da cadeia.
+
+        Returns:
+            Caminho do snapshot, ou None se não houver gerenciador de
+            snapshots ou se a cadeia não passar na verificação
+        """
+        if self.snapshots is None:
+            return None
+        valid, _ = self.verify_integrity(full=False)
+        if not valid:
+            return None
+        if self.store is not None:
+            # O snapshot nunca fica à frente dos blocos em disco
+            self.store.sync()
+        return self.snapshots.write(self.chain)
 
     def _calculate_hash(self, index: int, timestamp: str, operation: str,
-                       amount: float, balance: float, owner: str,
-                       previous_hash: Optional[str]) -> str:
+                       amount: int, balance: int, owner: str,
+                       previous_hash: Optional[str], version: int = BLOCK_VERSION) -> str:
         """
-        Calcula o hash SHA-256 do bloco.
-        
-        O hash é calculado sobre todos os campos do bloco concatenados
-        com o hash do bloco anterior.
+        Calcula o hash SHA-256 do bloco (ver calculate_hash).
         
         Args:
             index: Índice do bloco
@@ -89,15 +199,13 @@ class MiniCoinLedger:
             balance: Saldo resultante
             owner: Proprietário da conta
             previous_hash: Hash do bloco anterior
+            version: Versão do formato do bloco
             
         Returns:
             Hash SHA-256 em formato hexadecimal
         """
-        # Concatena todos os dados do bloco
-        block_data = f"{index}{timestamp}{operation}{amount}{balance}{owner}{previous_hash or ''}"
-        
-        # Calcula o hash SHA-256
-        return hashlib.sha256(block_data.encode()).hexdigest()
+        return calculate_hash(index, timestamp, operation, amount, balance,
+                              owner, previous_hash, version)
 
     def _create_genesis_block(self, initial_deposit: float):
         """
@@ -105,43 +213,120 @@ class MiniCoinLedger:
         
         Args:
             initial_deposit: Valor do depósito inicial
+
+        Raises:
+            ValueError: Depósito inicial negativo, não numérico ou acima
+                do limite da conta
         """
-        timestamp = datetime.now().isoformat()
-        operation = "CREATE"
+        initial = self.minor_amount(initial_deposit)
+        if initial is None or not 0 <= initial <= INT64_MAX:
+            raise ValueError(f"Depósito inicial inválido: {initial_deposit!r}")
+        genesis_block, _ = self._new_block(0, "CREATE", initial, initial, None)
+        self._append_blocks([genesis_block])
+
+    def get_balance(self) -> float:
+        """
+        Retorna o saldo atual da conta.
         
-        block_hash = self._calculate_hash(
-            index=0,
-            timestamp=timestamp,
-            operation=operation,
-            amount=initial_deposit,
-            balance=initial_deposit,
-            owner=self.owner,
-            previous_hash=None
+        Returns:
+            Saldo atual (balance do último bloco), em MiniCoins
+        """
+        return from_minor(self.get_balance_minor())
+
+    def get_balance_minor(self) -> int:
+        """Retorna o saldo atual em unidades mínimas (centavos)."""
+        if not self.chain:
+            return 0
+        return self.chain.balance_at(-1)
+
+    def _new_block(self, index: int, operation: str, amount: int,
+                   balance: int, previous_digest: Optional[bytes]) -> Tuple[Block, bytes]:
+        """
+        Cria (sem adicionar à cadeia) um bloco na versão atual.
+
+        O hash é calculado sobre a preimage binária, com os valores em
+        centavos e o digest cru do bloco anterior (None para o genesis);
+        só o bloco devolvido carrega os hashes em hexadecimal.
+
+        Returns:
+            Tupla (bloco, digest cru do bloco)
+        """
+        moment = datetime.now()
+
+        digest = block_digest(
+            owner_prefix(self.owner),
+            index,
+            (moment - EPOCH) // MICROSECOND,
+            OPERATION_CODES[operation],
+            amount,
+            balance,
+            GENESIS_DIGEST if previous_digest is None else previous_digest
         )
 
-        genesis_block = Block(
-            index=0,
-            timestamp=timestamp,
+        block = Block(
+            index=index,
+            timestamp=moment.isoformat(),
             operation=operation,
-            amount=initial_deposit,
-            balance=initial_deposit,
+            amount=amount,
+            balance=balance,
             owner=self.owner,
-            previous_hash=None,
-            hash=block_hash
+            previous_hash=None if previous_digest is None else previous_digest.hex(),
+            hash=digest.hex(),
+            version=BLOCK_VERSION
         )
+        return block, digest
 
-        self.chain.append(genesis_block)
+    @staticmethod
+    def minor_amount(amount) -> Optional[int]:
+        """
+        Converte um valor da API para centavos (None se não for numérico).
 
-    def get_balance(self) -> float:
+        Valores em MiniCoins são arredondados para o centavo; um
+        MinorAmount já está em centavos e é devolvido sem conversão.
         """
-        Retorna o saldo atual da conta.
-        
+        if isinstance(amount, MinorAmount):
+            return int(amount)
+        if isinstance(amount, bool) or not isinstance(amount, (int, float)):
+            return None
+        try:
+            return to_minor(amount)
+        except (OverflowError, ValueError):
+            return None
+
+    def _apply(self, operation: str, amount,
+               current_balance: int) -> Tuple[bool, str, int, int]:
+        """
+        Valida uma operação contra o saldo corrente.
+
+        Args:
+            operation: DEPOSIT ou WITHDRAW
+            amount: Valor em MiniCoins (ou MinorAmount)
+            current_balance: Saldo corrente em centavos
+
         Returns:
-            Saldo atual (balance do último bloco)
+            Tupla (sucesso, mensagem, valor_em_centavos, novo_saldo_em_centavos)
         """
-        if not self.chain:
-            return 0.0
-        return self.chain[-1].balance
+        minor = self.minor_amount(amount)
+
+        if operation == "DEPOSIT":
+            if minor is None or minor <= 0:
+                return False, "Valor de deposito deve ser positivo", 0, current_balance
+            # Valores e saldos são gravados como inteiros de 64 bits
+            if minor > INT64_MAX - current_balance:
+                return False, "Valor de deposito excede o limite da conta", 0, current_balance
+            return (True, f"Deposito de {from_minor(minor):.2f} realizado com sucesso",
+                    minor, current_balance + minor)
+
+        if operation == "WITHDRAW":
+            if minor is None or minor <= 0:
+                return False, "Valor de retirada deve ser positivo", 0, current_balance
+            if minor > current_balance:
+                return (False, f"Saldo insuficiente. Saldo atual: {from_minor(current_balance):.2f}, "
+                               f"tentativa de retirada: {from_minor(minor):.2f}", 0, current_balance)
+            return (True, f"Retirada de {from_minor(minor):.2f} realizada com sucesso",
+                    minor, current_balance - minor)
+
+        return False, f"Operação desconhecida: {operation}", 0, current_balance
 
     def deposit(self, amount: float) -> Tuple[bool, str, Optional[Block]]:
         """
@@ -153,39 +338,7 @@ class MiniCoinLedger:
         Returns:
             Tupla (sucesso, mensagem, bloco_criado)
         """
-        if amount <= 0:
-            return False, "Valor de deposito deve ser positivo", None
-
-        current_balance = self.get_balance()
-        new_balance = current_balance + amount
-        
-        timestamp = datetime.now().isoformat()
-        previous_block = self.chain[-1]
-        new_index = len(self.chain)
-
-        block_hash = self._calculate_hash(
-            index=new_index,
-            timestamp=timestamp,
-            operation="DEPOSIT",
-            amount=amount,
-            balance=new_balance,
-            owner=self.owner,
-            previous_hash=previous_block.hash
-        )
-
-        new_block = Block(
-            index=new_index,
-            timestamp=timestamp,
-            operation="DEPOSIT",
-            amount=amount,
-            balance=new_balance,
-            owner=self.owner,
-            previous_hash=previous_block.hash,
-            hash=block_hash
-        )
-
-        self.chain.append(new_block)
-        return True, f"Deposito de {amount:.2f} realizado com sucesso", new_block
+        return self.apply_batch([("DEPOSIT", amount)])[0]
 
     def withdraw(self, amount: float) -> Tuple[bool, str, Optional[Block]]:
         """
@@ -199,52 +352,298 @@ class MiniCoinLedger:
         Returns:
             Tupla (sucesso, mensagem, bloco_criado)
         """
-        if amount <= 0:
-            return False, "Valor de retirada deve ser positivo", None
+        return self.apply_batch([("WITHDRAW", amount)])[0]
 
-        current_balance = self.get_balance()
-        
-        if amount > current_balance:
-            return False, f"Saldo insuficiente. Saldo atual: {current_balance:.2f}, tentativa de retirada: {amount:.2f}", None
+    def apply_batch(self, operations: List[Tuple[str, float]],
+                    atomic: bool = False) -> List[Tuple[bool, str, Optional[Block]]]:
+        """
+        Aplica uma sequência de operações em uma única passada.
 
-        new_balance = current_balance - amount
-        
-        timestamp = datetime.now().isoformat()
-        previous_block = self.chain[-1]
-        new_index = len(self.chain)
-
-        block_hash = self._calculate_hash(
-            index=new_index,
-            timestamp=timestamp,
-            operation="WITHDRAW",
-            amount=amount,
-            balance=new_balance,
-            owner=self.owner,
-            previous_hash=previous_block.hash
-        )
+        Cada operação é validada, em ordem, contra o saldo corrente
+        (incluindo as operações anteriores do mesmo lote); as rejeitadas
+        não geram bloco. Os blocos aceitos são gravados no armazenamento
+        de uma só vez, com uma única aplicação da política de fsync.
 
-        new_block = Block(
-            index=new_index,
-            timestamp=timestamp,
-            operation="WITHDRAW",
-            amount=amount,
-            balance=new_balance,
-            owner=self.owner,
-            previous_hash=previous_block.hash,
-            hash=block_hash
-        )
+        No modo atômico, uma única operação rejeitada rejeita o lote
+        inteiro: nenhum bloco é gravado e as operações válidas recebem
+        a indicação da primeira falha.
+
+        Args:
+            operations: Lista de (operação, valor em MiniCoins), com
+                operação DEPOSIT ou WITHDRAW
+            atomic: Tudo ou nada
+
+        Returns:
+            Lista de tuplas (sucesso, mensagem, bloco_criado), uma por operação
+        """
+        results = []
+        blocks = []
+        balance = self.get_balance_minor()
+        previous_digest = self.chain.digest_at(-1)
+        index = len(self.chain)
+
+        for operation, amount in operations:
+            success, message, minor, new_balance = self._apply(operation, amount, balance)
+            if not success:
+                results.append((False, message, None))
+                continue
+
+            block, previous_digest = self._new_block(index, operation, minor, new_balance,
+                                                     previous_digest)
+            blocks.append(block)
+            results.append((True, message, block))
+            balance = new_balance
+            index += 1
+
+        if atomic and len(blocks) < len(results):
+            failed = next(i for i, (success, _, _) in enumerate(results) if not success)
+            message = f"Lote rejeitado: operação {failed} falhou"
+            return [result if not result[0] else (False, message, None) for result in results]
+
+        if blocks:
+            self._append_blocks(blocks)
+        return results
+
+    def append_replicated(self, blocks: List[Block]) -> Tuple[bool, str]:
+        """
+        Adiciona blocos recebidos de outro servidor (réplicas).
+
+        Cada bloco é conferido antes: índice, proprietário, encadeamento
+        com o bloco anterior, hash recalculado e saldo. A operação é
+        tudo ou nada: se um bloco falhar, nenhum é adicionado. Os blocos
+        aceitos já estão verificados, então a marca d'água avança junto.
+
+        Args:
+            blocks: Blocos consecutivos, começando no fim da cadeia local
+
+        Returns:
+            Tupla (sucesso, mensagem)
+        """
+        chain = self.chain
+        expected_index = len(chain)
+        previous_hash = chain.hash_at(-1) if chain else None
+        previous_balance = chain.balance_at(-1) if chain else 0
+
+        for block in blocks:
+            if block.index != expected_index:
+                return False, f"Bloco {block.index} fora de ordem (esperado {expected_index})"
+            if block.owner != self.owner:
+                return False, f"Proprietário divergente no bloco {block.index}"
+            if block.previous_hash != previous_hash:
+                return False, f"Encadeamento quebrado no bloco {block.index}"
+            try:
+                valid = block.hash == calculate_hash(
+                    block.index, block.timestamp, block.operation, block.amount,
+                    block.balance, block.owner, block.previous_hash, block.version)
+            except (TypeError, ValueError, OverflowError):
+                valid = False
+            if not valid:
+                return False, f"Hash inválido no bloco {block.index}"
+            if (block.operation == "CREATE") != (block.index == 0) or not self._balance_matches(
+                    block.operation, block.amount_minor, previous_balance, block.balance_minor,
+                    legacy=block.version == LEGACY_VERSION):
+                return False, f"Saldo inconsistente no bloco {block.index}"
+            expected_index += 1
+            previous_hash = block.hash
+            previous_balance = block.balance_minor
+
+        if not blocks:
+            return True, "Nenhum bloco novo"
+        # A marca d'água só acompanha se já cobria toda a cadeia local
+        verified = self._verified_index == len(chain) - 1
+        self._append_blocks(blocks)
+        if verified:
+            self._advance_watermark(len(chain) - 1)
+        return True, f"{len(blocks)} blocos replicados"
+
+    def _sign_checkpoint(self, index: int, block_hash: str) -> str:
+        """Assina (index, block_hash) com a chave de checkpoint do ledger."""
+        message = f"{index}:{block_hash}".encode()
+        return hmac.new(self._checkpoint_key, message, hashlib.sha256).hexdigest()
+
+    def _check_checkpoint(self, checkpoint: Checkpoint) -> Optional[str]:
+        """
+        Valida a assinatura de um checkpoint e o bloco que ele ancora.
 
-        self.chain.append(new_block)
-        return True, f"Retirada de {amount:.2f} realizada com sucesso", new_block
+        Returns:
+            Mensagem de erro, ou None se o checkpoint for válido
+        """
+        expected = self._sign_checkpoint(checkpoint.index, checkpoint.block_hash)
+        if not hmac.compare_digest(expected, checkpoint.signature):
+            return f"Assinatura inválida no checkpoint do bloco {checkpoint.index}"
+        if checkpoint.index >= len(self.chain) or \
+                self.chain.hash_at(checkpoint.index) != checkpoint.block_hash:
+            return f"Checkpoint divergente no bloco {checkpoint.index}"
+        return None
+
+    @staticmethod
+    def _balance_matches(operation: str, amount: int, previous_balance: int,
+                         balance: int, legacy: bool = False) -> bool:
+        """
+        Confere o saldo (em centavos) de um bloco contra o do bloco anterior.
+
+        A conta é exata; blocos legados, gravados em float, aceitam a
+        diferença de um centavo causada pelo arredondamento.
+        """
+        if operation == "DEPOSIT":
+            expected_balance = previous_balance + amount
+        elif operation == "WITHDRAW":
+            expected_balance = previous_balance - amount
+        else:
+            expected_balance = balance
 
-    def verify_integrity(self) -> Tuple[bool, str]:
+        return abs(balance - expected_balance) <= (1 if legacy else 0)
+
+    def _check_links(self, start: int) -> Tuple[int, Optional[str]]:
+        """
+        Confere encadeamento e saldos a partir de `start`, sem recalcular hashes.
+
+        Returns:
+            Tupla (índice, mensagem) do primeiro erro, ou (-1, None)
+        """
+        chain = self.chain
+        for i in range(max(start, 1), len(chain)):
+            if not chain.link_intact(i):
+                return i, f"Encadeamento quebrado no bloco {i}"
+            if not self._balance_matches(chain.operation_at(i), chain.amount_at(i),
+                                         chain.balance_at(i - 1), chain.balance_at(i),
+                                         legacy=chain.version_at(i) == LEGACY_VERSION):
+                return i, f"Saldo inconsistente no bloco {i}"
+        return -1, None
+
+    def _verify_parallel(self, start: int, workers: int,
+                         executor: Optional[Executor]) -> Tuple[int, Optional[str]]:
+        """
+        Verifica os blocos a partir de `start` distribuindo o recálculo
+        dos hashes entre `workers` processos (ou o executor informado).
+
+        Returns:
+            Tupla (índice, mensagem) do primeiro erro, ou (-1, None)
+        """
+        count = len(self.chain) - start
+        # Mais trechos que workers, para equilibrar a carga
+        step = max(1, -(-count // (workers * 4)))
+        segments = [self.chain.segment(first, min(first + step, len(self.chain)))
+                    for first in range(start, len(self.chain), step)]
+
+        pool = executor or ProcessPoolExecutor(max_workers=workers)
+        try:
+            # A passada de encadeamento roda enquanto os hashes são recalculados
+            futures = [pool.submit(first_invalid_hash, segment) for segment in segments]
+            link_index, link_error = self._check_links(start)
+            hash_failures = [index for index in (f.result() for f in futures) if index >= 0]
+        finally:
+            if executor is None:
+                pool.shutdown()
+
+        return self._first_error(min(hash_failures, default=-1), link_index, link_error)
+
+    @staticmethod
+    def _first_error(hash_index: int, link_index: int,
+                     link_error: Optional[str]) -> Tuple[int, Optional[str]]:
         """
-        Verifica a integridade de toda a blockchain.
+        Combina as passadas de hash e de encadeamento no primeiro erro
+        da cadeia; no mesmo bloco, o hash inválido tem precedência.
+        """
+        if hash_index >= 0 and (link_index < 0 or hash_index <= link_index):
+            return hash_index, f"Hash inválido no bloco {hash_index}"
+        return link_index, link_error
+
+    def _advance_watermark(self, index: int):
+        """
+        Move a marca d'água de verificação até `index`, emitindo os
+        checkpoints assinados que ficaram para trás.
+        """
+        interval = self.checkpoint_interval
+        # Primeiro múltiplo do intervalo depois da marca d'água atual
+        first = max(interval, (self._verified_index // interval + 1) * interval)
+        for cp_index in range(first, index + 1, interval):
+            block_hash = self.chain.hash_at(cp_index)
+            self.checkpoints.append(Checkpoint(
+                index=cp_index,
+                block_hash=block_hash,
+                signature=self._sign_checkpoint(cp_index, block_hash)
+            ))
+        self._verified_index = index
+        self._verified_hash = self.chain.hash_at(index)
+
+    def _reset_watermark(self, index: int):
+        """Recua a marca d'água para antes do bloco `index` (inválido)."""
+        self.checkpoints = [cp for cp in self.checkpoints if cp.index < index]
+        if self._verified_index >= index:
+            self._verified_index = index - 1
+            self._verified_hash = self.chain.hash_at(index - 1) if index > 0 else None
+
+    def detached_copy(self, with_snapshots: bool = False) -> "MiniCoinLedger":
+        """
+        Cópia da cadeia atual para verificar fora do event loop.
+
+        As colunas são copiadas (uma cópia de memória por coluna), então
+        a cópia não muda enquanto o ledger original recebe blocos; ela
+        não tem armazenamento e não deve receber operações. Depois da
+        verificação, merge_verification() traz o resultado de volta.
+
+        Args:
+            with_snapshots: Mantém o gerenciador de snapshots, para gravar
+                o snapshot da cópia (write_snapshot) fora do event loop;
+                os blocos da cópia já devem estar sincronizados em disco
+        """
+        detached = copy.copy(self)
+        detached.chain = self.chain.segment(0, len(self.chain))
+        detached.checkpoints = list(self.checkpoints)
+        detached.store = None
+        detached.snapshots = self.snapshots if with_snapshots else None
+        return detached
+
+    def merge_verification(self, detached: "MiniCoinLedger"):
+        """
+        Adota a marca d'água e os checkpoints de uma verificação feita
+        numa cópia de detached_copy().
+
+        A cadeia só cresce, então o resultado vale aqui se o bloco da
+        marca d'água da cópia ainda tiver o mesmo hash; se ele foi
+        substituído durante a verificação, nada é adotado.
+        """
+        index = detached._verified_index
+        if index >= 0 and (index >= len(self.chain)
+                           or self.chain.hash_at(index) != detached._verified_hash):
+            return
+        self.checkpoints = detached.checkpoints
+        self._verified_index = index
+        self._verified_hash = detached._verified_hash
+
+    @property
+    def verified_index(self) -> int:
+        """Índice do último bloco verificado (-1 se nenhum)."""
+        return self._verified_index
+
+    def verify_integrity(self, full: bool = True, workers: Optional[int] = None,
+                         executor: Optional[Executor] = None) -> Tuple[bool, str]:
+        """
+        Verifica a integridade da blockchain.
         
         Checa se:
         1. Cada bloco tem o hash correto
         2. Cada bloco aponta para o hash correto do bloco anterior
         3. Os saldos estão consistentes
+
+        No modo incremental (full=False) apenas os blocos posteriores à
+        marca d'água são recalculados; o último checkpoint assinado e o
+        bloco da marca d'água são conferidos como âncoras em O(1).
+        No modo completo (full=True) toda a cadeia e todos os
+        checkpoints são auditados.
+
+        Com `workers` (ou `executor`), a cadeia é dividida em trechos
+        cujos hashes são recalculados em paralelo, por padrão em um
+        ProcessPoolExecutor; o encadeamento entre blocos e a
+        continuidade dos saldos são conferidos numa passada final.
+        Um ThreadPoolExecutor também é aceito, mas o hashlib só libera
+        o GIL para entradas grandes, e os blocos são pequenos.
+
+        Args:
+            full: Se True, audita a cadeia inteira desde o genesis
+            workers: Número de processos da verificação paralela
+            executor: Executor já existente para a verificação paralela
         
         Returns:
             Tupla (válido, mensagem)
@@ -257,50 +656,180 @@ class MiniCoinLedger:
         if genesis.previous_hash is not None:
             return False, "Bloco genesis deve ter previous_hash None"
 
-        # Verifica cada bloco
-        for i, block in enumerate(self.chain):
-            # Recalcula o hash do bloco
-            calculated_hash = self._calculate_hash(
-                index=block.index,
-                timestamp=block.timestamp,
-                operation=block.operation,
-                amount=block.amount,
-                balance=block.balance,
-                owner=block.owner,
-                previous_hash=block.previous_hash
-            )
-
-            # Verifica se o hash está correto
-            if block.hash != calculated_hash:
-                return False, f"Hash inválido no bloco {i}"
-
-            # Verifica o encadeamento (exceto para o genesis)
-            if i > 0:
-                if block.previous_hash != self.chain[i - 1].hash:
-                    return False, f"Encadeamento quebrado no bloco {i}"
-
-                # Verifica consistência de saldo
-                previous_balance = self.chain[i - 1].balance
-                if block.operation == "DEPOSIT":
-                    expected_balance = previous_balance + block.amount
-                elif block.operation == "WITHDRAW":
-                    expected_balance = previous_balance - block.amount
-                else:
-                    expected_balance = block.balance
-
-                if abs(block.balance - expected_balance) > 0.001:  # Tolerância para float
-                    return False, f"Saldo inconsistente no bloco {i}"
-
+        if full:
+            checkpoints = self.checkpoints
+            start = 0
+        else:
+            checkpoints = self.checkpoints[-1:]
+            start = self._verified_index + 1
+            if start > 0 and self.chain.hash_at(start - 1) != self._verified_hash:
+                return False, f"Bloco {start - 1} alterado após a verificação"
+
+        for checkpoint in checkpoints:
+            error = self._check_checkpoint(checkpoint)
+            if error:
+                return False, error
+
+        if workers is not None or executor is not None:
+            i, error = self._verify_parallel(start, workers or os.cpu_count() or 1, executor)
+        else:
+            # Hashes recalculados direto das colunas, sem materializar blocos
+            link_index, link_error = self._check_links(start)
+            i, error = self._first_error(first_invalid_hash(self.chain, start),
+                                         link_index, link_error)
+        if error:
+            if full:
+                self._reset_watermark(i)
+            return False, error
+
+        self._advance_watermark(len(self.chain) - 1)
         return True, "Blockchain integra"
 
-    def get_history(self) -> List[dict]:
+    def get_history(self, from_index: int = 0, limit: Optional[int] = None,
+                    stop: Optional[int] = None) -> List[dict]:
         """
-        Retorna o histórico completo de transações.
+        Retorna o histórico de transações (completo ou uma página).
+
+        Args:
+            from_index: Índice do primeiro bloco (padrão: 0)
+            limit: Número máximo de blocos (padrão: até o fim da cadeia)
+            stop: Índice final exclusivo, limitado ao tamanho da cadeia
+                (padrão: tamanho atual). Chamadas fora do event loop
+                recebem o stop lido no event loop, enquanto a cadeia
+                continua crescendo
         
+        Com armazenamento persistente, os blocos são decodificados direto
+        do mmap dos segmentos, sem materializá-los a partir da cadeia.
+
         Returns:
             Lista de dicionários representando cada bloco
         """
-        return [block.to_dict() for block in self.chain]
+        stop = len(self.chain) if stop is None else min(stop, len(self.chain))
+        if limit is not None:
+            stop = min(stop, from_index + limit)
+        if self.store is not None and 0 <= from_index and stop <= len(self.store):
+            return list(self.store.iter_records(from_index, stop))
+        return [block.to_dict() for block in self.chain[from_index:stop]]
+
+    def iter_history(self, from_index: int = 0, chunk_size: int = 100,
+                     stop: Optional[int] = None) -> Iterator[List[dict]]:
+        """
+        Gera o histórico em blocos de até `chunk_size` entradas.
+
+        Cada trecho só é materializado quando pedido, mantendo a
+        memória limitada independentemente do tamanho da cadeia.
+
+        Args:
+            from_index: Índice do primeiro bloco (padrão: 0)
+            chunk_size: Entradas por trecho (padrão: 100)
+            stop: Índice final exclusivo (padrão: tamanho atual da cadeia)
+        """
+        if stop is None:
+            stop = len(self.chain)
+        for start in range(from_index, stop, chunk_size):
+            yield self.get_history(start, min(chunk_size, stop - start))
+
+    def balance_at(self, index: Optional[int] = None,
+                   timestamp: Optional[str] = None) -> dict:
+        """
+        Consulta o saldo em um bloco ou em um instante, sem percorrer a cadeia.
+
+        Por índice a consulta é O(1); por instante, uma busca binária no
+        índice de timestamps devolve o último bloco criado até `timestamp`.
+
+        Args:
+            index: Índice do bloco (aceita negativos)
+            timestamp: Instante ISO 8601 (alternativa ao índice)
+
+        Returns:
+            Dicionário com index, timestamp e balance (MiniCoins e
+            centavos) do bloco encontrado
+
+        Raises:
+            ValueError: Parâmetros ausentes/inválidos ou instante anterior ao genesis
+            IndexError: Índice fora da cadeia
+        """
+        if (index is None) == (timestamp is None):
+            raise ValueError("Informe exatamente um entre index e timestamp")
+
+        if timestamp is not None:
+            index = self.chain.index_at_time(timestamp_key(timestamp))
+            if index < 0:
+                raise ValueError(f"Nenhum bloco até {timestamp}")
+
+        block = self.chain[index]
+        balance = self.chain.balance_at(index)
+        return {"index": block.index, "timestamp": block.timestamp,
+                "balance": from_minor(balance), "balance_minor": balance}
+
+    def get_block(self, index: Optional[int] = None,
+                  block_hash: Optional[str] = None) -> dict:
+        """
+        Busca um bloco pelo índice ou pelo hash (recibo de uma operação).
+
+        A busca pelo hash usa o índice de digests da cadeia, em O(1).
+
+        Args:
+            index: Índice do bloco (aceita negativos)
+            block_hash: Hash hexadecimal do bloco (alternativa ao índice)
+
+        Returns:
+            Dicionário do bloco, como em get_history()
+
+        Raises:
+            ValueError: Parâmetros ausentes ou ambos informados
+            IndexError: Índice fora da cadeia ou hash desconhecido
+        """
+        if (index is None) == (block_hash is None):
+            raise ValueError("Informe exatamente um entre index e hash")
+
+        if block_hash is not None:
+            index = self.chain.index_of(block_hash)
+            if index < 0:
+                raise IndexError(f"Nenhum bloco com hash {block_hash}")
+        elif index < 0:
+            index += len(self.chain)
+        if not 0 <= index < len(self.chain):
+            raise IndexError(f"Bloco {index} fora da cadeia")
+        return self.get_history(index, 1)[0]
+
+    def range_summary(self, from_index: int, to_index: Optional[int] = None) -> dict:
+        """
+        Totais depositados e retirados entre dois blocos (inclusive), em O(1).
+
+        Usa as somas de prefixo mantidas pela cadeia a cada append.
+
+        Args:
+            from_index: Primeiro bloco do intervalo
+            to_index: Último bloco do intervalo (padrão: o mais recente)
+
+        Returns:
+            Dicionário com os totais e os saldos de abertura e fechamento,
+            em MiniCoins e (chaves *_minor) em centavos
+
+        Raises:
+            IndexError: Intervalo fora da cadeia ou invertido
+        """
+        if to_index is None:
+            to_index = len(self.chain) - 1
+        if not 0 <= from_index <= to_index < len(self.chain):
+            raise IndexError(f"Intervalo inválido: {from_index}..{to_index}")
+
+        deposited_before, withdrawn_before = self.chain.totals_through(from_index - 1)
+        deposited, withdrawn = self.chain.totals_through(to_index)
+        totals = {
+            "deposited": deposited - deposited_before,
+            "withdrawn": withdrawn - withdrawn_before,
+            "opening_balance": self.chain.balance_at(from_index - 1) if from_index else 0,
+            "closing_balance": self.chain.balance_at(to_index),
+        }
+        totals["net"] = totals["deposited"] - totals["withdrawn"]
+
+        summary = {"from_index": from_index, "to_index": to_index}
+        for name, minor in totals.items():
+            summary[name] = from_minor(minor)
+            summary[f"{name}_minor"] = minor
+        return summary
 
     def get_block_count(self) -> int:
         """Retorna o número de blocos na cadeia."""
@@ -0,0 +1,154 @@
+"""
+MiniCoin Logging - Pipeline de logging que não bloqueia o event loop
+Oferece:
+- Modo "queue": o event loop só enfileira os registros; a formatação e a
+  escrita em arquivo/terminal acontecem em uma thread de fundo
+- Formato "json": uma linha JSON por registro (JSON lines)
+- Amostragem e limite de taxa para os logs de payload por requisição
+
+As mensagens do servidor usam o estilo %-args do módulo logging, de
+modo que nenhuma string é formatada quando o nível está desativado.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+
+LOG_MODES = ("sync", "queue")
+LOG_FORMATS = ("text", "json")
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Formata cada registro como um objeto JSON em uma única linha."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler que não formata o registro na thread que o emite.
+
+    O QueueHandler padrão chama format() em prepare(); aqui o registro
+    segue intacto para a fila e é formatado pelos handlers da thread
+    do QueueListener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class PayloadSampler:
+    """
+    Decide quais logs de payload (requisição/resposta completas) emitir.
+
+    Combina uma amostragem determinística (1 a cada round(1/rate)
+    eventos) com um limite opcional de registros por segundo.
+    """
+
+    def __init__(self, rate: float = 1.0, max_per_second: Optional[float] = None):
+        """
+        Args:
+            rate: Fração dos eventos registrada (0 desativa, 1 registra todos)
+            max_per_second: Limite de registros por segundo (None = sem limite)
+        """
+        self.every = round(1 / rate) if rate > 0 else 0
+        self.max_per_second = max_per_second
+        self._seen = 0
+        self._tokens = max_per_second or 0.0
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def should_log(self) -> bool:
+        """Retorna True se o próximo evento deve ser registrado."""
+        if not self.every:
+            return False
+        with self._lock:
+            self._seen += 1
+            if (self._seen - 1) % self.every:
+                return False
+            if self.max_per_second is None:
+                return True
+            now = time.monotonic()
+            self._tokens = min(self.max_per_second,
+                               self._tokens + (now - self._last) * self.max_per_second)
+            self._last = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+def configure_logging(log_file: str, name: str, mode: str = "sync",
+                      fmt: str = "text", level: int = logging.INFO) -> logging.Logger:
+    """
+    Configura o logging raiz (arquivo + terminal) e retorna o logger `name`.
+
+    Como logging.basicConfig, não faz nada se o logger raiz já tiver
+    handlers.
+
+    Args:
+        log_file: Caminho do arquivo de log
+        name: Nome do logger retornado
+        mode: sync (handlers diretos) ou queue (thread de fundo)
+        fmt: text ou json
+        level: Nível mínimo dos registros
+    """
+    global _listener
+
+    if mode not in LOG_MODES:
+        raise ValueError(f"Unknown log mode: {mode}")
+    if fmt not in LOG_FORMATS:
+        raise ValueError(f"Unknown log format: {fmt}")
+
+    root = logging.getLogger()
+    if root.handlers:
+        return logging.getLogger(name)
+
+    log_path = Path(log_file)
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+
+    formatter = JsonLinesFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT)
+    handlers = [logging.FileHandler(log_file), logging.StreamHandler()]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    root.setLevel(level)
+    if mode == "queue":
+        records = queue.SimpleQueue()
+        root.addHandler(DeferredQueueHandler(records))
+        _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(stop_logging)
+    else:
+        for handler in handlers:
+            root.addHandler(handler)
+
+    return logging.getLogger(name)
+
+
+def stop_logging():
+    """Esvazia a fila e encerra a thread de logging (modo queue)."""
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
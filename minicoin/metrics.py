@@ -0,0 +1,238 @@
+"""
+MiniCoin Metrics - Métricas do servidor no formato do Prometheus
+Coleta, no próprio event loop e sem dependências externas:
+- Requisições por ação e status, com histograma de latência por ação
+- Retiradas rejeitadas
+- Duração das verificações de integridade (incremental/completa)
+- Conexões abertas, total de conexões aceitas e conexões recusadas
+- Atraso do event loop (lag), medido por uma tarefa de fundo
+- Tamanho da cadeia de cada conta (lido na hora da coleta)
+
+As métricas saem pela ação "metrics" do servidor (JSON ou texto) e,
+opcionalmente, por um listener HTTP mínimo em GET /metrics, no formato
+de exposição em texto do Prometheus (versão 0.0.4).
+"""
+
+import asyncio
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Mapping, Tuple
+
+
+# Limites superiores (s) dos buckets de latência
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _label(value: str) -> str:
+    """Escapa o valor de um label do formato de texto do Prometheus."""
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    """Formata um bound de bucket ("0.005", "1", ...)."""
+    return f"{value:g}"
+
+
+class Histogram:
+    """Histograma com buckets fixos (contagens não cumulativas por bucket)."""
+
+    __slots__ = ("bounds", "counts", "count", "total")
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.bounds = bounds
+        # Um contador por bucket, mais o +Inf
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float):
+        """Registra uma observação (em segundos)."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Contagens cumulativas por limite superior, terminando em +Inf."""
+        buckets = []
+        running = 0
+        for bound, count in zip(self.bounds, self.counts):
+            running += count
+            buckets.append((_number(bound), running))
+        buckets.append(("+Inf", self.count))
+        return buckets
+
+    def to_dict(self) -> dict:
+        return {"count": self.count, "sum": self.total, "buckets": dict(self.cumulative())}
+
+
+class ServerMetrics:
+    """
+    Métricas do MiniCoinServer.
+
+    Só é atualizada pelo event loop, então dispensa locks.
+    """
+
+    def __init__(self):
+        self.started = time.monotonic()
+        # (ação, status) -> requisições
+        self.requests: Dict[Tuple[str, str], int] = {}
+        self.latency: Dict[str, Histogram] = {}
+        self.rejected_withdrawals = 0
+        self.verify_duration: Dict[str, Histogram] = {}
+        self.open_connections = 0
+        self.connections_total = 0
+        self.rejected_connections = 0
+        self.loop_lag = 0.0
+        self.loop_lag_max = 0.0
+
+    def observe_request(self, action: str, status: str, seconds: float):
+        """Conta uma requisição e registra a sua latência."""
+        key = (action, status)
+        self.requests[key] = self.requests.get(key, 0) + 1
+        histogram = self.latency.get(action)
+        if histogram is None:
+            histogram = self.latency[action] = Histogram()
+        histogram.observe(seconds)
+
+    def observe_verify(self, mode: str, seconds: float):
+        """Registra a duração de uma verificação de integridade."""
+        histogram = self.verify_duration.get(mode)
+        if histogram is None:
+            histogram = self.verify_duration[mode] = Histogram()
+        histogram.observe(seconds)
+
+    def connection_opened(self):
+        self.open_connections += 1
+        self.connections_total += 1
+
+    def connection_closed(self):
+        self.open_connections -= 1
+
+    async def monitor_loop_lag(self, interval: float = 0.5):
+        """
+        Mede continuamente o atraso do event loop.
+
+        Dorme `interval` segundos e registra quanto o despertar atrasou:
+        um lag crescente indica handlers segurando o loop.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + interval
+            await asyncio.sleep(interval)
+            self.loop_lag = max(0.0, loop.time() - expected)
+            self.loop_lag_max = max(self.loop_lag_max, self.loop_lag)
+
+    def snapshot(self, chain_lengths: Mapping[str, int]) -> dict:
+        """
+        Retorna as métricas como dicionário (resposta JSON da ação "metrics").
+
+        Args:
+            chain_lengths: Número de blocos por conta
+        """
+        requests: Dict[str, Dict[str, int]] = {}
+        for (action, status), count in sorted(self.requests.items()):
+            requests.setdefault(action, {})[status] = count
+        return {
+            "uptime_seconds": time.monotonic() - self.started,
+            "requests": requests,
+            "latency_seconds": {action: histogram.to_dict()
+                                for action, histogram in sorted(self.latency.items())},
+            "rejected_withdrawals": self.rejected_withdrawals,
+            "verify_duration_seconds": {mode: histogram.to_dict()
+                                        for mode, histogram in sorted(self.verify_duration.items())},
+            "open_connections": self.open_connections,
+            "connections_total": self.connections_total,
+            "rejected_connections": self.rejected_connections,
+            "event_loop_lag_seconds": self.loop_lag,
+            "event_loop_lag_max_seconds": self.loop_lag_max,
+            "chain_length": dict(chain_lengths),
+        }
+
+    def render(self, chain_lengths: Mapping[str, int]) -> str:
+        """
+        Retorna as métricas no formato de exposição em texto do Prometheus.
+
+        Args:
+            chain_lengths: Número de blocos por conta
+        """
+        lines = []
+
+        def header(name: str, kind: str, description: str):
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def histogram(name: str, label: str, histograms: Dict[str, Histogram]):
+            for value, data in sorted(histograms.items()):
+                labels = f'{label}="{_label(value)}"'
+                for bound, count in data.cumulative():
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f"{name}_sum{{{labels}}} {data.total}")
+                lines.append(f"{name}_count{{{labels}}} {data.count}")
+
+        header("minicoin_requests_total", "counter", "Requests processed, by action and status.")
+        for (action, status), count in sorted(self.requests.items()):
+            lines.append(f'minicoin_requests_total{{action="{_label(action)}",'
+                         f'status="{_label(status)}"}} {count}')
+
+        header("minicoin_request_duration_seconds", "histogram", "Request handling latency.")
+        histogram("minicoin_request_duration_seconds", "action", self.latency)
+
+        header("minicoin_rejected_withdrawals_total", "counter", "Withdrawals rejected by the ledger.")
+        lines.append(f"minicoin_rejected_withdrawals_total {self.rejected_withdrawals}")
+
+        header("minicoin_verify_duration_seconds", "histogram", "Integrity verification duration.")
+        histogram("minicoin_verify_duration_seconds", "mode", self.verify_duration)
+
+        header("minicoin_open_connections", "gauge", "Client connections currently open.")
+        lines.append(f"minicoin_open_connections {self.open_connections}")
+        header("minicoin_connections_total", "counter", "Client connections accepted.")
+        lines.append(f"minicoin_connections_total {self.connections_total}")
+        header("minicoin_rejected_connections_total", "counter", "Client connections refused over the limit.")
+        lines.append(f"minicoin_rejected_connections_total {self.rejected_connections}")
+
+        header("minicoin_event_loop_lag_seconds", "gauge", "Last measured event loop lag.")
+        lines.append(f"minicoin_event_loop_lag_seconds {self.loop_lag}")
+        header("minicoin_event_loop_lag_max_seconds", "gauge", "Largest event loop lag measured.")
+        lines.append(f"minicoin_event_loop_lag_max_seconds {self.loop_lag_max}")
+
+        header("minicoin_chain_length", "gauge", "Blocks in each account chain.")
+        for account_id, length in sorted(chain_lengths.items()):
+            lines.append(f'minicoin_chain_length{{account="{_label(account_id)}"}} {length}')
+
+        header("minicoin_uptime_seconds", "gauge", "Seconds since the server started.")
+        lines.append(f"minicoin_uptime_seconds {time.monotonic() - self.started}")
+        return "\n".join(lines) + "\n"
+
+
+async def serve_http(reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                     render: Callable[[], str]):
+    """
+    Atende uma conexão HTTP do listener de métricas.
+
+    Responde GET /metrics com render() e 404 para qualquer outro
+    caminho; a conexão é sempre fechada após a resposta.
+    """
+    try:
+        request_line = await reader.readline()
+        # Descarta os cabeçalhos
+        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass
+
+        parts = request_line.decode("latin-1").split()
+        if len(parts) >= 2 and parts[0] in ("GET", "HEAD") and parts[1].split("?")[0] == "/metrics":
+            status, content_type, body = "200 OK", CONTENT_TYPE, render().encode()
+        else:
+            status, content_type, body = "404 Not Found", "text/plain", b"Not Found\n"
+        payload = b"" if parts and parts[0] == "HEAD" else body
+
+        writer.write((f"HTTP/1.1 {status}\r\n"
+                      f"Content-Type: {content_type}\r\n"
+                      f"Content-Length: {len(body)}\r\n"
+                      "Connection: close\r\n\r\n").encode() + payload)
+        await writer.drain()
+    except (ConnectionError, ValueError):
+        pass
+    finally:
+        writer.close()
@@ -0,0 +1,74 @@
+"""
+MiniCoin Offload - Execução de trabalho pesado fora do event loop
+Verificações completas e páginas de histórico são trabalho síncrono
+(recalcular hashes, decodificar e materializar blocos). Executadas no
+event loop, elas seguram todas as outras conexões; aqui elas rodam em
+um pool de threads, com um limite de execuções simultâneas, enquanto o
+event loop continua atendendo balance, ping e escritas.
+
+O chamador é responsável por entregar uma visão consistente da cadeia
+(uma cópia, como MiniCoinLedger.detached_copy(), ou um intervalo de
+blocos já gravados, que não mudam mais).
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+
+class OffloadScheduler:
+    """
+    Executa funções síncronas em threads de fundo, no máximo
+    `max_concurrent` por vez; as demais aguardam a vez sem ocupar threads.
+    """
+
+    def __init__(self, max_concurrent: int = 2):
+        """
+        Inicializa o agendador.
+
+        Args:
+            max_concurrent: Máximo de tarefas executando ao mesmo tempo
+        """
+        if max_concurrent <= 0:
+            raise ValueError("max_concurrent deve ser positivo")
+
+        self.max_concurrent = max_concurrent
+        self.running = 0
+        self.waiting = 0
+        self.completed = 0
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        # Criado na primeira tarefa
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Executa func(*args, **kwargs) em uma thread de fundo.
+
+        Returns:
+            O valor retornado por func (exceções são propagadas)
+        """
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.running += 1
+        try:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent,
+                                                    thread_name_prefix="minicoin-offload")
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor,
+                                              functools.partial(func, *args, **kwargs))
+        finally:
+            self.running -= 1
+            self.completed += 1
+            self._semaphore.release()
+
+    def shutdown(self):
+        """Encerra o pool de threads (as tarefas em execução terminam)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
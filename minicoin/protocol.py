@@ -0,0 +1,148 @@
+"""
+MiniCoin Protocol - Protocolo binário compacto
+Alternativa ao protocolo de linhas JSON para clientes de alta taxa,
+servida na mesma porta. O cliente negocia o protocolo enviando, como
+primeira linha da conexão:
+
+    {"action": "hello", "protocol": "binary", "version": 1}
+
+Depois da resposta (ainda em JSON), todos os frames da conexão são
+binários, com inteiros em big-endian:
+
+Requisição (cabeçalho fixo + conta + payload):
+- opcode (uint8), flags (uint8), id da requisição (uint32)
+- valor em unidades mínimas (int64, centavos)
+- tamanho da conta (uint8), tamanho do payload (uint32)
+
+Resposta (cabeçalho fixo + payload):
+- opcode (uint8), status (uint8), id da requisição (uint32)
+- saldo em unidades mínimas (int64), índice do bloco (int64, -1 = nenhum)
+- hash do bloco (32 bytes crus), tamanho do payload (uint32)
+
+O payload das requisições de depósito e retirada, se presente, é a
+chave de idempotência da operação (UTF-8).
+
+O payload das respostas de sucesso das operações binárias é vazio; nas
+de erro, contém a mensagem. Respostas STATUS_BUSY (recusadas pelo
+controle de admissão) trazem no campo do índice o tempo sugerido para
+tentar de novo, em milissegundos. O opcode JSON encapsula uma requisição JSON
+qualquer (history, create_account, ...) e devolve a resposta JSON no
+payload, de modo que uma conexão binária alcança todas as ações.
+"""
+
+import asyncio
+import struct
+from dataclasses import dataclass
+from typing import Optional
+
+# Conversões de valores, reexportadas para servidor e clientes
+from minicoin.block import AMOUNT_SCALE, from_minor, to_minor  # noqa: F401
+
+
+PROTOCOL_VERSION = 1
+PROTOCOLS = ("json", "binary")
+
+OP_DEPOSIT = 1
+OP_WITHDRAW = 2
+OP_BALANCE = 3
+OP_VERIFY = 4
+OP_PING = 5
+OP_JSON = 0x7F
+OPCODES = {
+    "deposit": OP_DEPOSIT,
+    "withdraw": OP_WITHDRAW,
+    "balance": OP_BALANCE,
+    "verify": OP_VERIFY,
+    "ping": OP_PING,
+}
+
+# Flags da requisição
+FLAG_FULL = 0x01
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+STATUS_BUSY = 2
+
+NO_BLOCK = -1
+EMPTY_DIGEST = bytes(32)
+
+REQUEST_HEADER = struct.Struct(">BBIqBI")
+RESPONSE_HEADER = struct.Struct(">BBIqq32sI")
+
+
+class ProtocolError(ValueError):
+    """Frame binário malformado ou acima do tamanho máximo."""
+
+
+@dataclass(slots=True)
+class BinaryRequest:
+    """Requisição binária decodificada."""
+    opcode: int
+    flags: int
+    request_id: int
+    amount: int
+    account: Optional[str]
+    payload: bytes = b""
+
+
+@dataclass(slots=True)
+class BinaryResponse:
+    """Resposta binária decodificada."""
+    opcode: int
+    status: int
+    request_id: int
+    balance: int
+    block_index: int
+    block_hash: bytes
+    payload: bytes = b""
+
+
+def encode_request(opcode: int, request_id: int, amount: int = 0,
+                   account: Optional[str] = None, payload: bytes = b"",
+                   flags: int = 0) -> bytes:
+    """Serializa uma requisição binária."""
+    account_bytes = account.encode() if account else b""
+    if len(account_bytes) > 255:
+        raise ProtocolError("Account id too long for the binary protocol")
+    return (REQUEST_HEADER.pack(opcode, flags, request_id & 0xFFFFFFFF, amount,
+                                len(account_bytes), len(payload))
+            + account_bytes + payload)
+
+
+async def read_request(reader: asyncio.StreamReader, max_payload: int) -> BinaryRequest:
+    """
+    Lê uma requisição binária completa.
+
+    Raises:
+        asyncio.IncompleteReadError: Conexão encerrada
+        ProtocolError: Payload acima de `max_payload` bytes
+    """
+    header = await reader.readexactly(REQUEST_HEADER.size)
+    opcode, flags, request_id, amount, account_size, payload_size = REQUEST_HEADER.unpack(header)
+    if payload_size > max_payload:
+        raise ProtocolError(f"Frame exceeds maximum size of {max_payload} bytes")
+    account = (await reader.readexactly(account_size)).decode() if account_size else None
+    payload = await reader.readexactly(payload_size) if payload_size else b""
+    return BinaryRequest(opcode, flags, request_id, amount, account, payload)
+
+
+def encode_response(opcode: int, status: int, request_id: int, balance: int = 0,
+                    block_index: int = NO_BLOCK, block_hash: bytes = EMPTY_DIGEST,
+                    payload: bytes = b"") -> bytes:
+    """Serializa uma resposta binária."""
+    return RESPONSE_HEADER.pack(opcode, status, request_id, balance, block_index,
+                                block_hash, len(payload)) + payload
+
+
+async def read_response(reader: asyncio.StreamReader) -> BinaryResponse:
+    """
+    Lê uma resposta binária completa.
+
+    Raises:
+        asyncio.IncompleteReadError: Conexão encerrada
+    """
+    header = await reader.readexactly(RESPONSE_HEADER.size)
+    opcode, status, request_id, balance, block_index, block_hash, payload_size = \
+        RESPONSE_HEADER.unpack(header)
+    payload = await reader.readexactly(payload_size) if payload_size else b""
+    return BinaryResponse(opcode, status, request_id, balance, block_index, block_hash, payload)
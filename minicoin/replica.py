@@ -0,0 +1,227 @@
+"""
+MiniCoin Replica - Réplica somente leitura de um servidor primário
+A réplica abre, para cada conta seguida, uma conexão com o primário e
+pede a ação "replicate" a partir do fim da sua cadeia local. O primário
+envia os blocos que faltam e, depois, cada bloco novo assim que é
+gravado, mais um frame de heartbeat periódico quando não há blocos.
+
+Cada bloco recebido é conferido (encadeamento, hash e saldo, ver
+MiniCoinLedger.append_replicated) antes de entrar na cadeia local; um
+bloco inválido derruba a conexão, que é refeita após reconnect_delay.
+As cadeias da réplica ficam em memória e são refeitas a partir do
+primário a cada início.
+
+Atraso da replicação, por conta:
+- lag_blocks: blocos do primário (último head informado) ainda não aplicados
+- lag_seconds: tempo desde a última vez em que a réplica estava em dia
+  com o primário (0 quando em dia)
+"""
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from minicoin.accounts import DEFAULT_ACCOUNT, Account, AccountRegistry
+from minicoin.block import Block
+from minicoin.metrics import _label
+
+
+# Limite de uma linha de replicação (um trecho de blocos)
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+
+
+class ReplicationError(Exception):
+    """Resposta de erro do primário ou bloco recusado pela réplica."""
+
+
+@dataclass
+class ReplicaState:
+    """Estado da replicação de uma conta."""
+    account_id: str
+    connected: bool = False
+    primary_head: int = -1
+    local_head: int = -1
+    in_sync_at: Optional[float] = None
+    last_frame_at: Optional[float] = None
+    reconnects: int = 0
+    last_error: Optional[str] = None
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def lag_blocks(self) -> int:
+        return max(0, self.primary_head - self.local_head)
+
+    @property
+    def lag_seconds(self) -> float:
+        if self.lag_blocks == 0 and self.in_sync_at is not None:
+            return 0.0
+        since = self.in_sync_at if self.in_sync_at is not None else self.started_at
+        return time.monotonic() - since
+
+    def to_dict(self) -> dict:
+        return {
+            "connected": self.connected,
+            "primary_head": self.primary_head,
+            "local_head": self.local_head,
+            "lag_blocks": self.lag_blocks,
+            "lag_seconds": self.lag_seconds,
+            "reconnects": self.reconnects,
+            "last_error": self.last_error,
+        }
+
+
+class ReplicaFollower:
+    """
+    Segue as cadeias de um primário, mantendo-as no registro de contas local.
+    """
+
+    def __init__(self, accounts: AccountRegistry, primary_host: str, primary_port: int,
+                 account_ids: Optional[List[str]] = None, heartbeat: float = 1.0,
+                 reconnect_delay: float = 1.0,
+                 on_append: Optional[Callable[[Account], None]] = None):
+        """
+        Inicializa o seguidor.
+
+        Args:
+            accounts: Registro de contas local (as contas seguidas são criadas nele)
+            primary_host: Endereço do primário
+            primary_port: Porta do primário
+            account_ids: Contas seguidas (a conta padrão é sempre incluída)
+            heartbeat: Intervalo (s) dos heartbeats pedidos ao primário
+            reconnect_delay: Espera (s) antes de reconectar após uma falha
+            on_append: Chamado após cada trecho de blocos aplicado
+        """
+        self.accounts = accounts
+        self.primary_host = primary_host
+        self.primary_port = primary_port
+        self.account_ids = [DEFAULT_ACCOUNT] + [a for a in (account_ids or []) if a != DEFAULT_ACCOUNT]
+        self.heartbeat = heartbeat
+        self.reconnect_delay = reconnect_delay
+        self.on_append = on_append
+        self.logger = logging.getLogger("MiniCoinReplica")
+        self.states = {account_id: ReplicaState(account_id) for account_id in self.account_ids}
+        self._ready = {account_id: asyncio.Event() for account_id in self.account_ids}
+
+    @property
+    def primary(self) -> str:
+        return f"{self.primary_host}:{self.primary_port}"
+
+    async def run(self):
+        """Segue todas as contas até ser cancelado."""
+        await asyncio.gather(*(self.follow(account_id) for account_id in self.account_ids))
+
+    async def wait_ready(self):
+        """
+        Aguarda o genesis da conta padrão (as demais contas seguidas
+        surgem quando o primário as tiver).
+        """
+        await self._ready[DEFAULT_ACCOUNT].wait()
+
+    async def follow(self, account_id: str):
+        """Replica uma conta, reconectando após falhas."""
+        state = self.states[account_id]
+        while True:
+            try:
+                await self._replicate(account_id, state)
+            except asyncio.CancelledError:
+                raise
+            except (ConnectionError, OSError, ValueError, TypeError, ReplicationError) as e:
+                state.last_error = str(e)
+                self.logger.warning("Replication of %s from %s failed: %s",
+                                    account_id, self.primary, e)
+            state.connected = False
+            state.reconnects += 1
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def _replicate(self, account_id: str, state: ReplicaState):
+        """Abre o stream "replicate" de uma conta e aplica os frames recebidos."""
+        account = self._local(account_id)
+        from_index = len(account.ledger.chain) if account else 0
+        request = {"action": "replicate", "id": f"replica-{account_id}",
+                   "account": account_id, "from_index": from_index,
+                   "heartbeat": self.heartbeat}
+        if account is not None:
+            request["previous_hash"] = account.ledger.chain.hash_at(-1)
+            self._ready[account_id].set()
+
+        reader, writer = await asyncio.open_connection(self.primary_host, self.primary_port,
+                                                       limit=MAX_FRAME_SIZE)
+        try:
+            writer.write((json.dumps(request) + "\n").encode())
+            await writer.drain()
+            state.connected = True
+            self.logger.info("Replicating %s from %s at block %d", account_id, self.primary, from_index)
+
+            while True:
+                line = await reader.readline()
+                if not line:
+                    raise ConnectionError("Connection closed by primary")
+                frame = json.loads(line)
+                if frame.get("status") != "ok":
+                    raise ReplicationError(frame.get("message", "replication failed"))
+                account = self._apply(account_id, account, frame, state)
+        finally:
+            writer.close()
+
+    def _local(self, account_id: str) -> Optional[Account]:
+        return self.accounts.get(account_id) if account_id in self.accounts else None
+
+    def _apply(self, account_id: str, account: Optional[Account], frame: dict,
+               state: ReplicaState) -> Optional[Account]:
+        """Aplica um frame de replicação à cadeia local."""
+        blocks = [Block(**record) for record in frame.get("blocks", [])]
+        if account is None and blocks:
+            # O primeiro bloco recebido é o genesis da conta
+            genesis = blocks.pop(0)
+            if account_id == DEFAULT_ACCOUNT:
+                account = self.accounts.open_default(genesis.owner, 0.0, genesis=genesis)
+            else:
+                account = self.accounts.create(account_id, genesis=genesis)
+            self._ready[account_id].set()
+
+        if account is not None and blocks:
+            success, message = account.ledger.append_replicated(blocks)
+            if not success:
+                raise ReplicationError(message)
+            if self.on_append is not None:
+                self.on_append(account)
+
+        now = time.monotonic()
+        state.last_frame_at = now
+        state.primary_head = max(state.primary_head, frame.get("head_index", -1))
+        state.local_head = len(account.ledger.chain) - 1 if account is not None else -1
+        if state.lag_blocks == 0:
+            state.in_sync_at = now
+        return account
+
+    def status(self) -> Dict[str, dict]:
+        """Estado da replicação de cada conta."""
+        return {account_id: state.to_dict() for account_id, state in self.states.items()}
+
+    def render(self) -> str:
+        """Atraso da replicação no formato de texto do Prometheus."""
+        lines = [
+            "# HELP minicoin_replication_lag_blocks Primary blocks not yet applied by this replica.",
+            "# TYPE minicoin_replication_lag_blocks gauge",
+        ]
+        for account_id, state in sorted(self.states.items()):
+            lines.append(f'minicoin_replication_lag_blocks{{account="{_label(account_id)}"}} '
+                         f"{state.lag_blocks}")
+        lines += [
+            "# HELP minicoin_replication_lag_seconds Seconds since this replica was last in sync.",
+            "# TYPE minicoin_replication_lag_seconds gauge",
+        ]
+        for account_id, state in sorted(self.states.items()):
+            lines.append(f'minicoin_replication_lag_seconds{{account="{_label(account_id)}"}} '
+                         f"{state.lag_seconds}")
+        lines += [
+            "# HELP minicoin_replication_connected Whether the replication stream is open.",
+            "# TYPE minicoin_replication_connected gauge",
+        ]
+        for account_id, state in sorted(self.states.items()):
+            lines.append(f'minicoin_replication_connected{{account="{_label(account_id)}"}} '
+                         f"{int(state.connected)}")
+        return "\n".join(lines) + "\n"
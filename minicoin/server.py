@@ -7,36 +7,117 @@ Operações suportadas:
 - deposit: Adiciona fundos à conta
 - withdraw: Remove fundos da conta (valida saldo)
 - balance: Consulta o saldo atual
-- history: Retorna o histórico completo de transações
-- verify: Verifica a integridade da blockchain
+- history: Retorna o histórico de transações (paginado ou em streaming)
+- verify: Verifica a integridade da blockchain (incremental; full=true
+  para auditoria completa; parallel=true para recalcular os hashes em
+  vários processos)
 - ping: Testa conectividade
+- create_account: Cria uma nova conta
+- balance_at: Saldo em um bloco (index) ou instante (timestamp)
+- range_summary: Totais depositados/retirados entre dois blocos
+- get_block: Um bloco pelo índice (index) ou pelo hash (hash), como o
+  block_hash devolvido por deposit/withdraw
+- batch: Vários depósitos/retiradas em uma requisição, aplicados em
+  ordem com uma única gravação (atomic=true para tudo ou nada)
+- metrics: Métricas do servidor (format="prometheus" inclui o texto
+  de exposição; ver minicoin.metrics)
+- replicate: Stream dos blocos a partir de from_index, seguido de cada
+  bloco novo e de heartbeats; usado pelas réplicas (ver minicoin.replica)
+
+Depósitos e retiradas aceitam "idempotency_key": repetir a requisição
+com a mesma chave devolve o bloco gravado na primeira vez, sem gravar
+outro (ver minicoin.idempotency).
+
+Com replica_of, o servidor é uma réplica somente leitura: segue as
+cadeias do primário, atende as consultas localmente e recusa escritas.
+
+Valores são recebidos em MiniCoins; as respostas trazem o saldo em
+MiniCoins ("balance") e em centavos ("balance_minor"). No histórico,
+amount/balance dos blocos estão em centavos a partir da versão 2 do
+bloco (campo "version"); blocos legados (versão 1) usam float.
+
+Todas as ações aceitam o campo opcional "account" (padrão: a conta
+criada na inicialização do servidor).
+
+Uma conexão pode negociar o protocolo binário compacto (ver
+minicoin.protocol) enviando "hello" como primeira requisição.
+
+Cada requisição passa pelo controle de admissão (ver minicoin.admission):
+escritas e consultas baratas têm prioridade sobre auditorias e
+exportações, as filas de espera são limitadas e, com elas cheias, a
+resposta é imediata, com status "busy" e "retry_after" (s). Respostas
+em streaming ocupam a vaga até o último frame; os streams "replicate",
+que não terminam, têm um limite próprio (max_replication_streams).
+Conexões acima de max_connections recebem a mesma resposta e são
+encerradas.
+
+Verificações e páginas de histórico de muitos blocos (a partir de
+offload_min_blocks) rodam em threads de fundo (ver minicoin.offload),
+sobre uma cópia da cadeia ou sobre blocos já gravados, para não atrasar
+as demais conexões; as menores rodam direto no event loop.
+
+As respostas JSON de balance, history (paginado), verify e ping ficam
+em um cache já serializadas (ver minicoin.cache) enquanto a cadeia da
+conta não muda; uma consulta repetida é atendida direto do cache, sem
+passar pelo controle de admissão.
 """
 
 import asyncio
+import functools
 import json
 import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import aclosing
 from datetime import datetime
-from pathlib import Path
-from typing import Optional
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
 
+from minicoin.accounts import Account, AccountRegistry, UnknownAccountError
+from minicoin.admission import PRIORITY_READ, AdmissionController, ServerBusy, Ticket
+from minicoin.batching import WriteBatcher
+from minicoin.block import MinorAmount
+from minicoin.cache import REQUEST_FIELDS, CacheKey, PreparedResponse, ResponseCache
+from minicoin.idempotency import IdempotencyKeyReused, IdempotencyTable
 from minicoin.ledger import MiniCoinLedger
+from minicoin.logutil import LOG_FORMATS, LOG_MODES, PayloadSampler, configure_logging
+from minicoin.metrics import ServerMetrics, serve_http
+from minicoin.offload import OffloadScheduler
+from minicoin.replica import ReplicaFollower
+from minicoin.protocol import (
+    AMOUNT_SCALE, FLAG_FULL, OP_BALANCE, OP_DEPOSIT, OP_JSON, OP_PING,
+    OP_VERIFY, OP_WITHDRAW, OPCODES, PROTOCOL_VERSION, STATUS_BUSY, STATUS_ERROR, STATUS_OK,
+    BinaryRequest, ProtocolError, encode_response, read_request
+)
+from minicoin.storage import FSYNC_ALWAYS, FSYNC_POLICIES
+
+
+# Ações recusadas por réplicas somente leitura
+WRITE_ACTIONS = frozenset({"deposit", "withdraw", "batch", "create_account"})
+# Consultas cujas respostas vão para o cache de respostas
+CACHEABLE_ACTIONS = frozenset({"balance", "history", "verify", "ping"})
+# Campos da requisição que não fazem parte da chave do cache
+UNKEYED_FIELDS = frozenset({"action", "id", "client_id", "account"})
+# Tamanho máximo de uma chave de idempotência
+MAX_IDEMPOTENCY_KEY = 128
 
+# Nome da ação de cada opcode binário, para as métricas
+OPCODE_ACTIONS = {code: action for action, code in OPCODES.items()}
+# Label de métricas de cada status binário
+BINARY_STATUSES = {STATUS_OK: "ok", STATUS_ERROR: "error", STATUS_BUSY: "busy"}
 
 # Configuração de logging
-def setup_logging(log_file: str = "logs/server.log"):
-    """Configura o sistema de logging do servidor."""
-    log_path = Path(log_file)
-    log_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file),
-            logging.StreamHandler()
-        ]
-    )
-    return logging.getLogger("MiniCoinServer")
+def setup_logging(log_file: str = "logs/server.log", mode: str = "sync",
+                  fmt: str = "text", level: int = logging.INFO):
+    """
+    Configura o sistema de logging do servidor.
+
+    Args:
+        log_file: Caminho do arquivo de log
+        mode: sync (escrita no event loop) ou queue (thread de fundo)
+        fmt: text ou json (JSON lines)
+        level: Nível mínimo dos registros
+    """
+    return configure_logging(log_file, "MiniCoinServer", mode=mode, fmt=fmt, level=level)
 
 
 class MiniCoinServer:
@@ -47,7 +128,25 @@ class MiniCoinServer:
     """
 
     def __init__(self, host: str = "127.0.0.1", port: int = 8888, 
-                 owner: str = "MiniCoin Account", initial_deposit: float = 100.0):
+                 owner: str = "MiniCoin Account", initial_deposit: float = 100.0,
+                 data_dir: Optional[str] = None, fsync_policy: str = FSYNC_ALWAYS,
+                 max_frame_size: int = 64 * 1024, max_inflight: int = 64,
+                 history_page_size: int = 500, shard_count: int = 16,
+                 batch_window: float = 0.0, batch_max: int = 64,
+                 log_mode: str = "sync", log_format: str = "text",
+                 payload_log_rate: float = 1.0,
+                 payload_log_max_per_sec: Optional[float] = None,
+                 verify_workers: int = 0, snapshot_interval: int = 0,
+                 snapshot_retention: int = 2, metrics_port: Optional[int] = None,
+                 loop_lag_interval: float = 0.5, max_batch_operations: int = 1000,
+                 max_offloaded: int = 1, offload_min_blocks: int = 256,
+                 max_connections: int = 1024, max_active: int = 128, max_bulk: int = 4,
+                 queue_limit: int = 256, max_queue_wait: float = 2.0,
+                 max_replication_streams: int = 16,
+                 replica_of: Optional[str] = None,
+                 replica_accounts: Optional[List[str]] = None,
+                 response_cache_size: int = 1024, idempotency_ttl: float = 300.0,
+                 idempotency_max_keys: int = 100_000):
         """
         Inicializa o servidor MiniCoin.
         
@@ -56,61 +155,423 @@ class MiniCoinServer:
             port: Porta TCP para escutar
             owner: Nome do proprietário da conta
             initial_deposit: Depósito inicial da conta
+            data_dir: Diretório para persistir a blockchain (None = só memória)
+            fsync_policy: Política de fsync do armazenamento (always, group, interval)
+            max_frame_size: Tamanho máximo de uma requisição (uma linha JSON)
+            max_inflight: Requisições simultâneas em andamento por conexão
+            history_page_size: Máximo de blocos por página/trecho de histórico
+            shard_count: Número de shards do registro de contas
+            batch_window: Janela (s) do group commit de escritas (0 = desativado)
+            batch_max: Máximo de operações por lote do group commit
+            log_mode: sync ou queue (logging em thread de fundo)
+            log_format: text ou json (JSON lines)
+            payload_log_rate: Fração dos payloads recebidos/enviados registrada
+            payload_log_max_per_sec: Limite de logs de payload por segundo
+            verify_workers: Processos da verificação paralela (0 = desativada)
+            snapshot_interval: Blocos entre snapshots de cada conta (0 = desativado)
+            snapshot_retention: Snapshots mantidos por conta
+            metrics_port: Porta do listener HTTP de métricas (None = desativado)
+            loop_lag_interval: Intervalo (s) da medição do lag do event loop
+            max_batch_operations: Máximo de operações em uma requisição batch
+            max_offloaded: Máximo de verificações/históricos simultâneos fora do event loop
+            offload_min_blocks: Verificações e leituras de histórico com menos blocos
+                rodam no event loop
+            max_connections: Máximo de conexões de clientes abertas
+            max_active: Máximo de requisições executando ao mesmo tempo
+            max_bulk: Máximo de verify/history executando ao mesmo tempo
+            queue_limit: Tamanho máximo da fila de espera de cada ação
+            max_queue_wait: Tempo máximo (s) na fila antes da recusa
+            max_replication_streams: Máximo de streams "replicate" abertos
+            replica_of: host:porta do primário (None = servidor primário)
+            replica_accounts: Contas seguidas pela réplica, além da padrão
+            response_cache_size: Máximo de respostas no cache de consultas (0 = desativado)
+            idempotency_ttl: Tempo (s) durante o qual uma chave de idempotência é lembrada
+            idempotency_max_keys: Máximo de chaves de idempotência lembradas
+
+        Raises:
+            ValueError: replica_of mal formado ou combinado com data_dir
         """
         self.host = host
         self.port = port
-        self.ledger = MiniCoinLedger(owner, initial_deposit)
-        self.logger = setup_logging()
+        self.max_frame_size = max_frame_size
+        self.max_inflight = max_inflight
+        self.history_page_size = history_page_size
+        self.batch_window = batch_window
+        self.batch_max = batch_max
+        self.max_batch_operations = max_batch_operations
+        self.batchers: Dict[str, WriteBatcher] = {}
+        self.verify_workers = verify_workers
+        # Criado na primeira verificação paralela
+        self.verify_executor: Optional[ProcessPoolExecutor] = None
+        self.max_connections = max_connections
+        self.admission = AdmissionController(max_active, max_bulk, queue_limit, max_queue_wait,
+                                             max_replication=max_replication_streams)
+        self.offload = OffloadScheduler(max_offloaded)
+        self.offload_min_blocks = offload_min_blocks
+        self.metrics_port = metrics_port
+        self.loop_lag_interval = loop_lag_interval
+        self.metrics = ServerMetrics()
+        self.response_cache = ResponseCache(response_cache_size)
+        self.idempotency = IdempotencyTable(idempotency_ttl, idempotency_max_keys)
+        self.logger = setup_logging(mode=log_mode, fmt=log_format)
+        self.payload_sampler = PayloadSampler(payload_log_rate, payload_log_max_per_sec)
+        self.accounts = AccountRegistry(data_dir, fsync_policy=fsync_policy, shard_count=shard_count,
+                                        snapshot_interval=snapshot_interval,
+                                        snapshot_retention=snapshot_retention,
+                                        background_snapshots=True)
+        # Snapshot periódico em andamento, por conta
+        self.snapshot_tasks: Dict[str, asyncio.Task] = {}
+        # Clientes de "replicate" esperando blocos novos, por conta
+        self.append_events: Dict[str, asyncio.Event] = {}
         self.request_count = 0
+
+        self.replica: Optional[ReplicaFollower] = None
+        if replica_of is not None:
+            if data_dir:
+                raise ValueError("Replicas keep their chains in memory; data_dir is not supported")
+            primary_host, _, primary_port = replica_of.rpartition(":")
+            if not primary_host or not primary_port.isdigit():
+                raise ValueError(f"replica_of must be host:port, got {replica_of!r}")
+            self.replica = ReplicaFollower(self.accounts, primary_host, int(primary_port),
+                                           replica_accounts, on_append=self.notify_append)
+            # A conta padrão surge com o genesis do primário, em start()
+            self.ledger = None
+            self.store = None
+            self.logger.info("MiniCoin replica initialized, following %s", replica_of)
+            return
+
+        default_account = self.accounts.open_default(owner, initial_deposit)
+        # Conta padrão, usada pelas requisições sem o campo "account"
+        self.ledger = default_account.ledger
+        self.store = default_account.store
         
         self.logger.info(f"MiniCoin Server initialized")
-        self.logger.info(f"Owner: {owner}")
-        self.logger.info(f"Initial deposit: {initial_deposit:.2f}")
+        if data_dir:
+            self.logger.info(f"Loaded {len(self.accounts)} accounts from {data_dir}")
+        self.logger.info(f"Owner: {self.ledger.owner}")
+        self.logger.info(f"Initial deposit: {self.ledger.chain[0].amount:.2f}")
         self.logger.info(f"Genesis block hash: {self.ledger.chain[0].hash}")
 
     async def handle_client(self, reader: asyncio.StreamReader, 
                            writer: asyncio.StreamWriter):
         """
         Gerencia a conexão com um cliente.
+
+        Cada requisição é uma linha JSON terminada em '\\n'. As linhas são
+        processadas em tarefas independentes, permitindo várias
+        requisições em andamento (pipelining) na mesma conexão; as
+        respostas carregam o campo `id` da requisição para correlação.
+        Se a primeira linha for um "hello" pedindo o protocolo binário,
+        o restante da conexão usa frames binários.
         
         Args:
             reader: Stream de entrada do cliente
             writer: Stream de saída do cliente
         """
         addr = writer.get_extra_info('peername')
-        self.logger.info(f"New connection from {addr}")
+        if self.metrics.open_connections >= self.max_connections:
+            await self.reject_connection(writer, addr)
+            return
+        self.logger.info("New connection from %s", addr)
+        self.metrics.connection_opened()
+
+        write_lock = asyncio.Lock()
+        inflight = asyncio.Semaphore(self.max_inflight)
+        pending = set()
+        first_frame = True
 
         try:
             while True:
-                # Lê dados do cliente (até 1KB)
-                data = await reader.read(1024)
+                # Lê uma requisição completa (até max_frame_size bytes)
+                try:
+                    data = await reader.readline()
+                except ValueError:
+                    self.logger.warning("Frame from %s exceeds %d bytes", addr, self.max_frame_size)
+                    await self.send_response(writer, write_lock, {
+                        "status": "error",
+                        "message": f"Frame exceeds maximum size of {self.max_frame_size} bytes",
+                        "timestamp": datetime.now().isoformat()
+                    })
+                    break
                 
                 if not data:
-                    self.logger.info(f"Client {addr} disconnected")
+                    self.logger.info("Client %s disconnected", addr)
                     break
 
                 # Decodifica a mensagem
                 message = data.decode().strip()
-                self.logger.info(f"Received from {addr}: {message}")
+                if not message:
+                    continue
+                if self.payload_sampler.should_log():
+                    self.logger.info("Received from %s: %s", addr, message)
 
-                # Processa a requisição
-                response = await self.process_request(message)
-                
-                # Envia a resposta
-                response_json = json.dumps(response) + "\n"
-                writer.write(response_json.encode())
-                await writer.drain()
-                
-                self.logger.info(f"Sent to {addr}: {response_json.strip()}")
+                if first_frame:
+                    first_frame = False
+                    hello = self.parse_hello(message)
+                    if hello is not None:
+                        response, binary = self.negotiate(hello)
+                        await self.send_response(writer, write_lock, response)
+                        if binary:
+                            await self.serve_binary(reader, writer, write_lock,
+                                                    inflight, pending, addr)
+                            break
+                        continue
+
+                # Processa a requisição sem bloquear a leitura das próximas
+                await self.spawn(self.serve_request(message, writer, write_lock, addr),
+                                 inflight, pending)
 
         except Exception as e:
-            self.logger.error(f"Error handling client {addr}: {e}", exc_info=True)
+            self.logger.error("Error handling client %s: %s", addr, e, exc_info=True)
         finally:
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
             writer.close()
             await writer.wait_closed()
-            self.logger.info(f"Connection closed with {addr}")
+            self.metrics.connection_closed()
+            self.logger.info("Connection closed with %s", addr)
+
+    async def reject_connection(self, writer: asyncio.StreamWriter, addr):
+        """Recusa uma conexão acima de max_connections com uma resposta "busy"."""
+        self.metrics.rejected_connections += 1
+        self.logger.warning("Connection from %s rejected: %d connections open",
+                            addr, self.metrics.open_connections)
+        try:
+            writer.write((json.dumps({
+                "status": "busy",
+                "message": "Server busy: too many connections",
+                "retry_after": self.admission.retry_after(PRIORITY_READ),
+                "timestamp": datetime.now().isoformat()
+            }) + "\n").encode())
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
 
-    async def process_request(self, message: str) -> dict:
+    async def spawn(self, coroutine, inflight: asyncio.Semaphore, pending: set):
+        """Executa uma requisição em uma tarefa própria, limitada por `inflight`."""
+        await inflight.acquire()
+        task = asyncio.create_task(coroutine)
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+        task.add_done_callback(lambda _: inflight.release())
+
+    def parse_hello(self, message: str) -> Optional[dict]:
+        """Retorna a requisição se `message` for um hello, senão None."""
+        if '"hello"' not in message:
+            return None
+        try:
+            request = json.loads(message)
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(request, dict) or request.get("action") != "hello":
+            return None
+        return request
+
+    def negotiate(self, hello: dict):
+        """
+        Negocia o protocolo da conexão.
+
+        Returns:
+            Tupla (resposta JSON, True se a conexão passa a ser binária)
+        """
+        protocol = hello.get("protocol", "json")
+        version = hello.get("version", PROTOCOL_VERSION)
+        response = {"id": hello.get("id"), "timestamp": datetime.now().isoformat()}
+
+        if protocol == "binary" and version == PROTOCOL_VERSION:
+            self.logger.info("Connection switched to binary protocol v%d", version)
+            response.update(status="ok", protocol="binary", version=version,
+                            amount_scale=AMOUNT_SCALE)
+            return response, True
+        if protocol == "json":
+            response.update(status="ok", protocol="json")
+            return response, False
+
+        response.update(status="error", protocol="json",
+                        message=f"Unsupported protocol: {protocol} v{version}")
+        return response, False
+
+    async def serve_binary(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                           write_lock: asyncio.Lock, inflight: asyncio.Semaphore,
+                           pending: set, addr):
+        """Lê frames binários até o fim da conexão."""
+        while True:
+            try:
+                frame = await read_request(reader, self.max_frame_size)
+            except asyncio.IncompleteReadError:
+                self.logger.info("Client %s disconnected", addr)
+                return
+            except (ProtocolError, UnicodeDecodeError) as e:
+                self.logger.warning("Invalid binary frame from %s: %s", addr, e)
+                return
+
+            await self.spawn(self.serve_binary_request(frame, writer, write_lock, addr),
+                             inflight, pending)
+
+    async def serve_binary_request(self, frame: BinaryRequest, writer: asyncio.StreamWriter,
+                                   write_lock: asyncio.Lock, addr) -> None:
+        """Processa um frame binário e envia a(s) resposta(s)."""
+        try:
+            started = time.perf_counter()
+            response = await self.process_binary(frame)
+            # Requisições JSON encapsuladas já foram medidas em process_request
+            if frame.opcode != OP_JSON:
+                self.metrics.observe_request(
+                    OPCODE_ACTIONS.get(frame.opcode, "unknown"),
+                    BINARY_STATUSES.get(response[1], "error"),
+                    time.perf_counter() - started
+                )
+            if isinstance(response, bytes):
+                async with write_lock:
+                    writer.write(response)
+                    await writer.drain()
+                return
+
+            async with aclosing(response):
+                async for chunk in response:
+                    async with write_lock:
+                        writer.write(chunk)
+                        await writer.drain()
+        except (ConnectionError, RuntimeError) as e:
+            self.logger.warning("Could not send response to %s: %s", addr, e)
+
+    async def process_binary(self, frame: BinaryRequest) -> Union[bytes, AsyncIterator[bytes]]:
+        """
+        Processa uma requisição binária.
+
+        Returns:
+            Resposta serializada, ou um iterador assíncrono de respostas
+            (requisições JSON encapsuladas com streaming)
+        """
+        if frame.opcode == OP_JSON:
+            response = await self.process_request(frame.payload.decode())
+            if isinstance(response, (dict, PreparedResponse)):
+                return self.encode_json_frame(frame, response)
+            return self.encode_json_stream(frame, response)
+
+        self.request_count += 1
+        request_id = self.request_count
+        self.logger.debug("[Request #%d] Binary opcode %d", request_id, frame.opcode)
+
+        ticket = None
+        try:
+            ticket = await self.admission.enter(OPCODE_ACTIONS.get(frame.opcode, "unknown"))
+            account = self.accounts.get(frame.account)
+            ledger = account.ledger
+
+            if frame.opcode in (OP_DEPOSIT, OP_WITHDRAW) and self.replica is not None:
+                return encode_response(frame.opcode, STATUS_ERROR, frame.request_id,
+                                       payload=self.read_only_response(request_id)["message"].encode())
+
+            if frame.opcode in (OP_DEPOSIT, OP_WITHDRAW):
+                operation = "DEPOSIT" if frame.opcode == OP_DEPOSIT else "WITHDRAW"
+                success, message, block = await self.execute_write(
+                    account, operation, MinorAmount(frame.amount),
+                    self.idempotency_key(frame.payload.decode(errors="replace") or None)
+                )
+                balance = ledger.get_balance_minor()
+                if not success:
+                    self.logger.warning("[Request #%d] %s rejected: %s", request_id, operation, message)
+                    return encode_response(frame.opcode, STATUS_ERROR, frame.request_id, balance,
+                                           payload=message.encode())
+                return encode_response(frame.opcode, STATUS_OK, frame.request_id, balance,
+                                       block.index, ledger.chain.digest_at(block.index))
+
+            if frame.opcode == OP_BALANCE:
+                head = len(ledger.chain) - 1
+                return encode_response(OP_BALANCE, STATUS_OK, frame.request_id,
+                                       ledger.get_balance_minor(), head,
+                                       ledger.chain.digest_at(head))
+
+            if frame.opcode == OP_VERIFY:
+                valid, message = await self.verify_ledger(ledger, bool(frame.flags & FLAG_FULL))
+                return encode_response(OP_VERIFY, STATUS_OK if valid else STATUS_ERROR,
+                                       frame.request_id, ledger.get_balance_minor(),
+                                       ledger.verified_index,
+                                       payload=b"" if valid else message.encode())
+
+            if frame.opcode == OP_PING:
+                return encode_response(OP_PING, STATUS_OK, frame.request_id)
+
+            return encode_response(frame.opcode, STATUS_ERROR, frame.request_id,
+                                   payload=f"Unknown opcode: {frame.opcode}".encode())
+
+        except ServerBusy as e:
+            self.logger.warning("[Request #%d] %s", request_id, e)
+            # Em respostas busy, o campo do índice traz o retry_after em ms
+            return encode_response(frame.opcode, STATUS_BUSY, frame.request_id,
+                                   block_index=int(e.retry_after * 1000),
+                                   payload=str(e).encode())
+        except UnknownAccountError as e:
+            self.logger.warning("[Request #%d] %s", request_id, e)
+            return encode_response(frame.opcode, STATUS_ERROR, frame.request_id,
+                                   payload=str(e).encode())
+        except Exception as e:
+            self.logger.error("[Request #%d] Error: %s", request_id, e, exc_info=True)
+            return encode_response(frame.opcode, STATUS_ERROR, frame.request_id,
+                                   payload=str(e).encode())
+        finally:
+            if ticket is not None:
+                self.admission.leave(ticket)
+
+    async def encode_json_stream(self, frame: BinaryRequest,
+                                 stream: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+        """Encapsula os frames de uma resposta em streaming em frames binários."""
+        async with aclosing(stream):
+            async for item in stream:
+                yield self.encode_json_frame(frame, item)
+
+    def encode_json_frame(self, frame: BinaryRequest,
+                          response: Union[dict, PreparedResponse]) -> bytes:
+        """Encapsula uma resposta JSON em um frame binário."""
+        if isinstance(response, PreparedResponse):
+            status, payload = response.status, response.payload
+        else:
+            status, payload = response.get("status"), json.dumps(response).encode()
+        return encode_response(OP_JSON, {"ok": STATUS_OK, "busy": STATUS_BUSY}.get(status, STATUS_ERROR),
+                               frame.request_id, payload=payload)
+
+    async def serve_request(self, message: str, writer: asyncio.StreamWriter,
+                            write_lock: asyncio.Lock, addr) -> None:
+        """Processa uma requisição e envia a resposta ao cliente."""
+        try:
+            response = await self.process_request(message)
+            if isinstance(response, PreparedResponse):
+                async with write_lock:
+                    writer.write(response.payload + b"\n")
+                    await writer.drain()
+                if self.payload_sampler.should_log():
+                    self.logger.info("Sent to %s: %s", addr, response.payload.decode())
+                return
+            if isinstance(response, dict):
+                response_json = await self.send_response(writer, write_lock, response)
+                if self.payload_sampler.should_log():
+                    self.logger.info("Sent to %s: %s", addr, response_json.rstrip())
+                return
+
+            # Resposta em streaming: cada frame aguarda o drain do anterior
+            frames = 0
+            async with aclosing(response):
+                async for frame in response:
+                    await self.send_response(writer, write_lock, frame)
+                    frames += 1
+            self.logger.info("Streamed %d frames to %s", frames, addr)
+        except (ConnectionError, RuntimeError) as e:
+            self.logger.warning("Could not send response to %s: %s", addr, e)
+
+    async def send_response(self, writer: asyncio.StreamWriter,
+                            write_lock: asyncio.Lock, response: dict) -> str:
+        """Serializa e envia uma resposta como uma linha JSON."""
+        response_json = json.dumps(response) + "\n"
+        async with write_lock:
+            writer.write(response_json.encode())
+            await writer.drain()
+        return response_json
+
+    async def process_request(self, message: str) -> Union[dict, PreparedResponse,
+                                                           AsyncIterator[dict]]:
         """
         Processa uma requisição do cliente.
         
@@ -118,75 +579,352 @@ class MiniCoinServer:
             message: Mensagem JSON do cliente
             
         Returns:
-            Dicionário com a resposta
+            Dicionário com a resposta, a resposta já serializada (consultas
+            que passam pelo cache) ou um iterador assíncrono de frames para
+            respostas em streaming
         """
         self.request_count += 1
         request_id = self.request_count
+        started = time.perf_counter()
+        action = "invalid"
+        ticket = None
+        request = {}
 
         try:
             # Parse da mensagem JSON
             request = json.loads(message)
             action = request.get("action", "").lower()
             
-            self.logger.info(f"[Request #{request_id}] Action: {action}")
+            self.logger.info("[Request #%d] Action: %s", request_id, action)
+            cache_key = self.cache_key(action, request)
+            cached = self.response_cache.get(cache_key) if cache_key is not None else None
+            if cached is None:
+                ticket = await self.admission.enter(action)
 
             # Processa cada tipo de ação
-            if action == "deposit":
-                return await self.handle_deposit(request, request_id)
+            if cached is not None:
+                self.logger.debug("[Request #%d] Served from response cache", request_id)
+                response = cached.prepare({
+                    "request_id": request_id,
+                    "client_id": request.get("client_id", request.get("id", "unknown")),
+                    "id": request.get("id"),
+                    "timestamp": datetime.now().isoformat()
+                })
+
+            elif self.replica is not None and action in WRITE_ACTIONS:
+                response = self.read_only_response(request_id)
+            
+            elif action == "deposit":
+                response = await self.handle_deposit(request, request_id)
             
             elif action == "withdraw":
-                return await self.handle_withdraw(request, request_id)
+                response = await self.handle_withdraw(request, request_id)
             
             elif action == "balance":
-                return await self.handle_balance(request, request_id)
+                response = await self.handle_balance(request, request_id)
             
             elif action == "history":
-                return await self.handle_history(request, request_id)
+                response = await self.handle_history(request, request_id)
             
             elif action == "verify":
-                return await self.handle_verify(request, request_id)
+                response = await self.handle_verify(request, request_id)
             
             elif action == "ping":
-                return await self.handle_ping(request, request_id)
+                response = await self.handle_ping(request, request_id)
+            
+            elif action == "create_account":
+                response = await self.handle_create_account(request, request_id)
+            
+            elif action == "balance_at":
+                response = await self.handle_balance_at(request, request_id)
+            
+            elif action == "range_summary":
+                response = await self.handle_range_summary(request, request_id)
+            
+            elif action == "get_block":
+                response = await self.handle_get_block(request, request_id)
+            
+            elif action == "batch":
+                response = await self.handle_batch(request, request_id)
+            
+            elif action == "metrics":
+                response = await self.handle_metrics(request, request_id)
+            
+            elif action == "replicate":
+                response = await self.handle_replicate(request, request_id)
             
             else:
-                return {
+                response = {
                     "status": "error",
                     "message": f"Unknown action: {action}",
                     "request_id": request_id,
                     "timestamp": datetime.now().isoformat()
                 }
+                # Agrupa ações desconhecidas sob um único label nas métricas
+                action = "unknown"
+
+            # Ecoa o id do cliente para correlacionar respostas em pipeline
+            if isinstance(response, dict):
+                response["id"] = request.get("id")
+                # Só guarda se a conta não mudou durante a requisição
+                if cache_key is not None and self.cache_key(action, request) == cache_key:
+                    response = self.response_cache.put(cache_key, response).prepare(
+                        {field: response[field] for field in REQUEST_FIELDS if field in response}
+                    )
+            elif not isinstance(response, PreparedResponse) and ticket is not None:
+                # Streams ocupam a vaga até o último frame
+                response = self.release_after(response, ticket)
+                ticket = None
 
+        except ServerBusy as e:
+            self.logger.warning("[Request #%d] %s", request_id, e)
+            response = {
+                "status": "busy",
+                "message": str(e),
+                "retry_after": e.retry_after,
+                "request_id": request_id,
+                "id": request.get("id"),
+                "timestamp": datetime.now().isoformat()
+            }
+        except UnknownAccountError as e:
+            self.logger.warning("[Request #%d] %s", request_id, e)
+            response = {
+                "status": "error",
+                "message": str(e),
+                "request_id": request_id,
+                "id": request.get("id"),
+                "timestamp": datetime.now().isoformat()
+            }
         except json.JSONDecodeError as e:
-            self.logger.error(f"[Request #{request_id}] Invalid JSON: {e}")
-            return {
+            self.logger.error("[Request #%d] Invalid JSON: %s", request_id, e)
+            response = {
                 "status": "error",
                 "message": "Invalid JSON format",
                 "request_id": request_id,
                 "timestamp": datetime.now().isoformat()
             }
         except Exception as e:
-            self.logger.error(f"[Request #{request_id}] Error: {e}", exc_info=True)
-            return {
+            self.logger.error("[Request #%d] Error: %s", request_id, e, exc_info=True)
+            response = {
                 "status": "error",
                 "message": str(e),
                 "request_id": request_id,
+                "id": request.get("id") if isinstance(request, dict) else None,
                 "timestamp": datetime.now().isoformat()
             }
+        finally:
+            if ticket is not None:
+                self.admission.leave(ticket)
+
+        if isinstance(response, dict):
+            status = response.get("status", "error")
+        elif isinstance(response, PreparedResponse):
+            status = response.status
+        else:
+            status = "stream"
+        self.metrics.observe_request(action, status, time.perf_counter() - started)
+        return response
+
+    async def release_after(self, stream: AsyncIterator, ticket: Ticket) -> AsyncIterator:
+        """Repassa os frames de um stream e só então devolve a vaga de admissão."""
+        try:
+            async with aclosing(stream):
+                async for frame in stream:
+                    yield frame
+        finally:
+            self.admission.leave(ticket)
+
+    def cache_key(self, action: str, request: dict) -> Optional[CacheKey]:
+        """
+        Chave da consulta no cache de respostas, ou None se a ação não
+        for cacheável. O estado da conta na chave (blocos, geração da
+        cadeia e marca d'água) muda a cada append, substituição de bloco
+        ou verificação que avança.
+
+        Raises:
+            UnknownAccountError: Conta inexistente
+        """
+        if action not in CACHEABLE_ACTIONS or request.get("stream"):
+            return None
+        params = {key: value for key, value in request.items() if key not in UNKEYED_FIELDS}
+        if action == "ping":
+            return ResponseCache.key(None, None, action, params)
+        account = self.accounts.get(request.get("account"))
+        chain = account.ledger.chain
+        state = (len(chain), chain.generation, account.ledger.verified_index)
+        return ResponseCache.key(account.account_id, state, action, params)
+
+    async def execute_write(self, account: Account, operation: str, amount: float,
+                            idempotency_key: Optional[str] = None):
+        """
+        Executa um depósito ou retirada na conta.
+
+        Com group commit ativo (batch_window > 0) a operação entra no
+        lote da conta; caso contrário é aplicada imediatamente.
+
+        Com idempotency_key, uma repetição da mesma operação na mesma
+        conta, dentro do ttl da tabela, devolve o resultado original
+        (com o bloco já gravado) sem gravar outro bloco; a mesma chave
+        com outra operação ou valor é recusada. Só escritas aceitas são
+        lembradas: depois de uma recusa (saldo insuficiente, por
+        exemplo) a mesma chave executa de novo.
+
+        Returns:
+            Tupla (sucesso, mensagem, bloco_criado)
+        """
+        if idempotency_key is None:
+            return await self.apply_write(account, operation, amount)
+        # Compara em centavos: a mesma chave pode vir pelos dois protocolos
+        minor = MiniCoinLedger.minor_amount(amount)
+        try:
+            return await self.idempotency.run(
+                (account.account_id, idempotency_key),
+                (operation, amount if minor is None else minor),
+                functools.partial(self.apply_write, account, operation, amount),
+                keep=lambda result: result[0]
+            )
+        except IdempotencyKeyReused as e:
+            return False, str(e), None
+
+    async def apply_write(self, account: Account, operation: str, amount: float):
+        """Aplica um depósito ou retirada (ver execute_write)."""
+        if self.batch_window > 0:
+            batcher = self.batchers.get(account.account_id)
+            if batcher is None:
+                batcher = WriteBatcher(account, self.batch_window, self.batch_max)
+                self.batchers[account.account_id] = batcher
+            result = await batcher.submit(operation, amount)
+        else:
+            async with account.lock:
+                result = account.ledger.apply_batch([(operation, amount)])[0]
+
+        if result[0]:
+            self.notify_append(account)
+        elif operation == "WITHDRAW":
+            self.metrics.rejected_withdrawals += 1
+        return result
+
+    @staticmethod
+    def idempotency_key(key) -> Optional[str]:
+        """Normaliza a chave de idempotência de uma escrita (None = sem chave)."""
+        if key is None or key == "":
+            return None
+        key = str(key)
+        if len(key) > MAX_IDEMPOTENCY_KEY:
+            raise ValueError(f"idempotency_key exceeds {MAX_IDEMPOTENCY_KEY} characters")
+        return key
+
+    def notify_append(self, account: Account):
+        """
+        Descarta as respostas da conta no cache e acorda os streams
+        "replicate" que esperam blocos novos dela.
+        """
+        self.response_cache.invalidate(account.account_id)
+        event = self.append_events.pop(account.account_id, None)
+        if event is not None:
+            event.set()
+        if account.ledger.snapshot_due():
+            self.schedule_snapshot(account)
+
+    def schedule_snapshot(self, account: Account):
+        """Agenda o snapshot periódico da conta, se nenhum estiver em andamento."""
+        if account.account_id in self.snapshot_tasks:
+            return
+        task = asyncio.create_task(self.write_snapshot(account))
+        self.snapshot_tasks[account.account_id] = task
+        task.add_done_callback(lambda _: self.snapshot_tasks.pop(account.account_id, None))
+
+    async def write_snapshot(self, account: Account):
+        """
+        Grava um snapshot da conta sem segurar o event loop.
+
+        As colunas são copiadas (detached_copy) aqui; o fsync dos blocos,
+        a verificação dos blocos novos e a gravação do arquivo rodam numa
+        thread de fundo, e a marca d'água da verificação é adotada ao
+        terminar, como em verify_ledger.
+        """
+        ledger = account.ledger
+        store = ledger.store
+        detached = ledger.detached_copy(with_snapshots=True)
+
+        def write():
+            if store is not None:
+                # O snapshot nunca fica à frente dos blocos em disco
+                store.sync()
+            return detached.write_snapshot()
+
+        try:
+            path = await self.offload.run(write)
+        except OSError as e:
+            self.logger.error("Snapshot of %s failed: %s", account.account_id, e)
+            return
+        ledger.merge_verification(detached)
+        if path is None:
+            self.logger.warning("Snapshot of %s skipped: chain failed verification",
+                                account.account_id)
+
+    def read_only_response(self, request_id: int) -> dict:
+        """Resposta de uma escrita enviada a uma réplica."""
+        return {
+            "status": "error",
+            "message": f"Read-only replica: send writes to the primary at {self.replica.primary}",
+            "request_id": request_id,
+            "timestamp": datetime.now().isoformat()
+        }
+
+    async def verify_ledger(self, ledger, full: bool, parallel: bool = False) -> Tuple[bool, str]:
+        """
+        Verifica a integridade de uma cadeia, registrando a duração nas métricas.
+
+        Com pelo menos offload_min_blocks blocos a recalcular, a
+        verificação roda numa thread de fundo sobre uma cópia da cadeia
+        (detached_copy), e o resultado é adotado ao terminar; as escritas
+        feitas enquanto isso ficam para a próxima verificação incremental.
+
+        Args:
+            ledger: Ledger da conta
+            full: Auditoria completa (True) ou incremental
+            parallel: Recalcula os hashes no pool de processos do servidor
+
+        Returns:
+            Tupla (válido, mensagem)
+        """
+        started = time.perf_counter()
+        options = {}
+        if parallel:
+            if self.verify_executor is None:
+                self.verify_executor = ProcessPoolExecutor(max_workers=self.verify_workers)
+            options = {"workers": self.verify_workers, "executor": self.verify_executor}
+
+        pending = len(ledger.chain) if full else len(ledger.chain) - ledger.verified_index - 1
+        if pending < self.offload_min_blocks:
+            result = ledger.verify_integrity(full=full, **options)
+        else:
+            detached = ledger.detached_copy()
+            result = await self.offload.run(detached.verify_integrity, full=full, **options)
+            ledger.merge_verification(detached)
+        self.metrics.observe_verify("full" if full else "incremental",
+                                    time.perf_counter() - started)
+        return result
 
     async def handle_deposit(self, request: dict, request_id: int) -> dict:
         """Processa uma requisição de depósito."""
         amount = request.get("amount", 0)
         client_id = request.get("client_id", request.get("id", "unknown"))
+        account = self.accounts.get(request.get("account"))
         
-        success, message, block = self.ledger.deposit(amount)
+        success, message, block = await self.execute_write(
+            account, "DEPOSIT", amount, self.idempotency_key(request.get("idempotency_key"))
+        )
         
         if success:
-            self.logger.info(f"[Request #{request_id}] Deposit successful: {amount:.2f}")
+            self.logger.info("[Request #%d] Deposit successful: %.2f", request_id, amount)
             return {
                 "status": "ok",
                 "message": message,
-                "balance": self.ledger.get_balance(),
+                "account": account.account_id,
+                "balance": account.ledger.get_balance(),
+                "balance_minor": account.ledger.get_balance_minor(),
                 "block_index": block.index,
                 "block_hash": block.hash,
                 "request_id": request_id,
@@ -194,11 +932,13 @@ class MiniCoinServer:
                 "timestamp": datetime.now().isoformat()
             }
         else:
-            self.logger.warning(f"[Request #{request_id}] Deposit failed: {message}")
+            self.logger.warning("[Request #%d] Deposit failed: %s", request_id, message)
             return {
                 "status": "error",
                 "message": message,
-                "balance": self.ledger.get_balance(),
+                "account": account.account_id,
+                "balance": account.ledger.get_balance(),
+                "balance_minor": account.ledger.get_balance_minor(),
                 "request_id": request_id,
                 "client_id": client_id,
                 "timestamp": datetime.now().isoformat()
@@ -208,16 +948,20 @@ class MiniCoinServer:
         """Processa uma requisição de retirada."""
         amount = request.get("amount", 0)
         client_id = request.get("client_id", request.get("id", "unknown"))
+        account = self.accounts.get(request.get("account"))
         
-        current_balance = self.ledger.get_balance()
-        success, message, block = self.ledger.withdraw(amount)
+        success, message, block = await self.execute_write(
+            account, "WITHDRAW", amount, self.idempotency_key(request.get("idempotency_key"))
+        )
         
         if success:
-            self.logger.info(f"[Request #{request_id}] Withdrawal successful: {amount:.2f}")
+            self.logger.info("[Request #%d] Withdrawal successful: %.2f", request_id, amount)
             return {
                 "status": "ok",
                 "message": message,
-                "balance": self.ledger.get_balance(),
+                "account": account.account_id,
+                "balance": account.ledger.get_balance(),
+                "balance_minor": account.ledger.get_balance_minor(),
                 "block_index": block.index,
                 "block_hash": block.hash,
                 "request_id": request_id,
@@ -225,56 +969,392 @@ class MiniCoinServer:
                 "timestamp": datetime.now().isoformat()
             }
         else:
-            self.logger.warning(f"[Request #{request_id}] Withdrawal rejected: {message}")
+            self.logger.warning("[Request #%d] Withdrawal rejected: %s", request_id, message)
             return {
                 "status": "error",
                 "message": message,
-                "balance": current_balance,
+                "account": account.account_id,
+                "balance": account.ledger.get_balance(),
+                "balance_minor": account.ledger.get_balance_minor(),
+                "request_id": request_id,
+                "client_id": client_id,
+                "timestamp": datetime.now().isoformat()
+            }
+
+    async def handle_batch(self, request: dict, request_id: int) -> dict:
+        """
+        Processa um lote de depósitos e retiradas.
+
+        Campos:
+        - operations: Lista de {"action": "deposit" | "withdraw", "amount": valor}
+        - atomic: Se verdadeiro, aplica o lote inteiro ou nenhuma operação
+
+        As operações são validadas em ordem contra o saldo corrente e os
+        blocos aceitos são gravados de uma só vez. A resposta traz um
+        resultado por operação e o hash do último bloco uma única vez.
+        """
+        client_id = request.get("client_id", request.get("id", "unknown"))
+        account = self.accounts.get(request.get("account"))
+        operations = request.get("operations")
+        atomic = bool(request.get("atomic", False))
+
+        error = None
+        if not isinstance(operations, list) or not operations:
+            error = "operations must be a non-empty list"
+        elif len(operations) > self.max_batch_operations:
+            error = f"Batch exceeds maximum of {self.max_batch_operations} operations"
+        else:
+            for position, item in enumerate(operations):
+                if not isinstance(item, dict) or item.get("action") not in ("deposit", "withdraw"):
+                    error = f"Invalid batch operation at position {position}"
+                    break
+        if error:
+            self.logger.warning("[Request #%d] Batch rejected: %s", request_id, error)
+            return {
+                "status": "error",
+                "message": error,
+                "account": account.account_id,
                 "request_id": request_id,
                 "client_id": client_id,
                 "timestamp": datetime.now().isoformat()
             }
 
+        async with account.lock:
+            results = account.ledger.apply_batch(
+                [(item["action"].upper(), item.get("amount", 0)) for item in operations],
+                atomic=atomic
+            )
+
+        applied = sum(1 for success, _, _ in results if success)
+        if applied:
+            self.notify_append(account)
+        self.metrics.rejected_withdrawals += sum(
+            1 for item, (success, _, _) in zip(operations, results)
+            if item["action"] == "withdraw" and not success
+        )
+        rejected = atomic and applied < len(results)
+        self.logger.info("[Request #%d] Batch%s: %d of %d operations applied", request_id,
+                         " (atomic)" if atomic else "", applied, len(results))
+
+        ledger = account.ledger
+        head = len(ledger.chain) - 1
+        return {
+            "status": "error" if rejected else "ok",
+            "message": ("Atomic batch rejected" if rejected
+                        else f"Applied {applied} of {len(results)} operations"),
+            "account": account.account_id,
+            "atomic": atomic,
+            "applied": applied,
+            "results": [
+                {"status": "ok", "message": message, "block_index": block.index} if success
+                else {"status": "error", "message": message}
+                for success, message, block in results
+            ],
+            "balance": ledger.get_balance(),
+            "balance_minor": ledger.get_balance_minor(),
+            "block_count": head + 1,
+            "head_index": head,
+            "head_hash": ledger.chain.hash_at(head),
+            "request_id": request_id,
+            "client_id": client_id,
+            "timestamp": datetime.now().isoformat()
+        }
+
     async def handle_balance(self, request: dict, request_id: int) -> dict:
         """Processa uma requisição de consulta de saldo."""
         client_id = request.get("client_id", request.get("id", "unknown"))
-        balance = self.ledger.get_balance()
+        account = self.accounts.get(request.get("account"))
+        balance = account.ledger.get_balance()
         
-        self.logger.info(f"[Request #{request_id}] Balance query: {balance:.2f}")
+        self.logger.info("[Request #%d] Balance query: %.2f", request_id, balance)
         return {
             "status": "ok",
+            "account": account.account_id,
             "balance": balance,
-            "block_count": self.ledger.get_block_count(),
+            "balance_minor": account.ledger.get_balance_minor(),
+            "block_count": account.ledger.get_block_count(),
+            "request_id": request_id,
+            "client_id": client_id,
+            "timestamp": datetime.now().isoformat()
+        }
+
+    async def handle_balance_at(self, request: dict, request_id: int) -> dict:
+        """Processa uma consulta de saldo em um bloco ou instante passado."""
+        client_id = request.get("client_id", request.get("id", "unknown"))
+        account = self.accounts.get(request.get("account"))
+        
+        try:
+            index = request.get("index")
+            point = account.ledger.balance_at(
+                index=int(index) if index is not None else None,
+                timestamp=request.get("timestamp")
+            )
+        except (ValueError, IndexError, TypeError) as e:
+            return {
+                "status": "error",
+                "message": str(e),
+                "account": account.account_id,
+                "request_id": request_id,
+                "client_id": client_id,
+                "timestamp": datetime.now().isoformat()
+            }
+        
+        self.logger.info("[Request #%d] Balance at block %d: %.2f", request_id, point["index"], point["balance"])
+        return {
+            "status": "ok",
+            "account": account.account_id,
+            "balance": point["balance"],
+            "balance_minor": point["balance_minor"],
+            "block_index": point["index"],
+            "block_timestamp": point["timestamp"],
             "request_id": request_id,
             "client_id": client_id,
             "timestamp": datetime.now().isoformat()
         }
 
-    async def handle_history(self, request: dict, request_id: int) -> dict:
-        """Processa uma requisição de histórico."""
+    async def handle_get_block(self, request: dict, request_id: int) -> dict:
+        """Processa a busca de um bloco pelo índice ou pelo hash."""
+        client_id = request.get("client_id", request.get("id", "unknown"))
+        account = self.accounts.get(request.get("account"))
+        
+        try:
+            index = request.get("index")
+            block = account.ledger.get_block(
+                index=int(index) if index is not None else None,
+                block_hash=request.get("hash")
+            )
+        except (ValueError, IndexError, TypeError) as e:
+            return {
+                "status": "error",
+                "message": str(e),
+                "account": account.account_id,
+                "request_id": request_id,
+                "client_id": client_id,
+                "timestamp": datetime.now().isoformat()
+            }
+        
+        self.logger.info("[Request #%d] Block %d lookup", request_id, block["index"])
+        return {
+            "status": "ok",
+            "account": account.account_id,
+            "block": block,
+            "verified": block["index"] <= account.ledger.verified_index,
+            "request_id": request_id,
+            "client_id": client_id,
+            "timestamp": datetime.now().isoformat()
+        }
+
+    async def handle_range_summary(self, request: dict, request_id: int) -> dict:
+        """Processa uma consulta de totais entre dois blocos."""
+        client_id = request.get("client_id", request.get("id", "unknown"))
+        account = self.accounts.get(request.get("account"))
+        
+        try:
+            to_index = request.get("to_index")
+            summary = account.ledger.range_summary(
+                int(request.get("from_index", 0)),
+                int(to_index) if to_index is not None else None
+            )
+        except (ValueError, IndexError, TypeError) as e:
+            return {
+                "status": "error",
+                "message": str(e),
+                "account": account.account_id,
+                "request_id": request_id,
+                "client_id": client_id,
+                "timestamp": datetime.now().isoformat()
+            }
+        
+        self.logger.info("[Request #%d] Range summary %d..%d", request_id,
+                         summary["from_index"], summary["to_index"])
+        return {
+            "status": "ok",
+            "account": account.account_id,
+            **summary,
+            "request_id": request_id,
+            "client_id": client_id,
+            "timestamp": datetime.now().isoformat()
+        }
+
+    async def handle_history(self, request: dict, request_id: int):
+        """
+        Processa uma requisição de histórico.
+
+        Parâmetros opcionais:
+        - from_index / cursor: Início da página (cursor vem de next_cursor)
+        - limit: Tamanho da página (limitado a history_page_size)
+        - stream: Se verdadeiro, envia o histórico em vários frames de
+          até chunk_size blocos, terminando com um frame "done"
+        """
         client_id = request.get("client_id", request.get("id", "unknown"))
-        history = self.ledger.get_history()
+        account = self.accounts.get(request.get("account"))
+        block_count = account.ledger.get_block_count()
+
+        cursor = request.get("cursor")
+        from_index = int(cursor) if cursor is not None else int(request.get("from_index", 0))
+        if from_index < 0:
+            raise ValueError("from_index must be non-negative")
+
+        if request.get("stream"):
+            chunk_size = max(1, min(int(request.get("chunk_size", 100)), self.history_page_size))
+            stop = block_count
+            if request.get("limit") is not None:
+                stop = min(block_count, from_index + int(request["limit"]))
+            self.logger.info("[Request #%d] History stream: blocks %d..%d", request_id, from_index, stop)
+            return self.stream_history(account.ledger, request, request_id, client_id,
+                                       from_index, stop, chunk_size)
+
+        limit = min(int(request.get("limit", self.history_page_size)), self.history_page_size)
+        # Blocos já existentes não mudam: a página, até o block_count lido
+        # aqui no event loop, é montada fora dele
+        history = await self.read_history(account.ledger, from_index,
+                                          min(block_count, from_index + max(limit, 0)))
+        next_index = from_index + len(history)
         
-        self.logger.info(f"[Request #{request_id}] History query: {len(history)} blocks")
+        self.logger.info("[Request #%d] History query: %d blocks from %d", request_id, len(history), from_index)
         return {
             "status": "ok",
+            "account": account.account_id,
             "history": history,
-            "block_count": len(history),
+            "block_count": block_count,
+            "from_index": from_index,
+            "next_cursor": str(next_index) if next_index < block_count else None,
             "request_id": request_id,
             "client_id": client_id,
             "timestamp": datetime.now().isoformat()
         }
 
+    async def read_history(self, ledger, start: int, stop: int) -> List[dict]:
+        """
+        Lê os blocos [start, stop) do histórico.
+
+        Como em verify_ledger, trechos com menos de offload_min_blocks
+        blocos são lidos no event loop, sem esperar na fila das threads
+        de fundo atrás de auditorias e snapshots.
+        """
+        if stop - start < self.offload_min_blocks:
+            return ledger.get_history(start, stop=stop)
+        return await self.offload.run(ledger.get_history, start, stop=stop)
+
+    async def stream_history(self, ledger, request: dict, request_id: int, client_id,
+                             from_index: int, stop: int,
+                             chunk_size: int) -> AsyncIterator[dict]:
+        """Gera os frames de um histórico em streaming, um trecho por vez."""
+        sent = 0
+        for start in range(from_index, stop, chunk_size):
+            chunk = await self.read_history(ledger, start, min(start + chunk_size, stop))
+            yield {
+                "status": "ok",
+                "id": request.get("id"),
+                "history": chunk,
+                "from_index": from_index + sent,
+                "done": False,
+                "request_id": request_id,
+                "client_id": client_id
+            }
+            sent += len(chunk)
+        yield {
+            "status": "ok",
+            "id": request.get("id"),
+            "history": [],
+            "block_count": sent,
+            "done": True,
+            "request_id": request_id,
+            "client_id": client_id,
+            "timestamp": datetime.now().isoformat()
+        }
+
+    async def handle_replicate(self, request: dict, request_id: int):
+        """
+        Processa um pedido de replicação (stream sem fim).
+
+        Parâmetros:
+        - from_index: Primeiro bloco desejado (o tamanho da cadeia da réplica)
+        - previous_hash: Hash do bloco from_index - 1 na réplica, conferido
+          para detectar cadeias divergentes
+        - heartbeat: Intervalo (s) dos frames sem blocos quando em dia
+        """
+        client_id = request.get("client_id", request.get("id", "unknown"))
+        account = self.accounts.get(request.get("account"))
+        ledger = account.ledger
+
+        try:
+            from_index = int(request.get("from_index", 0))
+            heartbeat = min(max(float(request.get("heartbeat", 1.0)), 0.05), 60.0)
+            if not 0 <= from_index <= len(ledger.chain):
+                raise ValueError(f"from_index {from_index} is outside the chain")
+            if from_index > 0 and request.get("previous_hash") != ledger.chain.hash_at(from_index - 1):
+                raise ValueError(f"Replica diverged from the primary at block {from_index - 1}")
+        except (ValueError, TypeError) as e:
+            self.logger.warning("[Request #%d] Replication refused: %s", request_id, e)
+            return {
+                "status": "error",
+                "message": str(e),
+                "account": account.account_id,
+                "request_id": request_id,
+                "client_id": client_id,
+                "timestamp": datetime.now().isoformat()
+            }
+
+        self.logger.info("[Request #%d] Replication of %s from block %d", request_id,
+                         account.account_id, from_index)
+        return self.stream_replication(account, request, request_id, client_id,
+                                       from_index, heartbeat)
+
+    async def stream_replication(self, account: Account, request: dict, request_id: int,
+                                 client_id, from_index: int,
+                                 heartbeat: float) -> AsyncIterator[dict]:
+        """
+        Gera os frames de replicação: trechos de até history_page_size
+        blocos enquanto houver atraso e, em dia, um frame a cada bloco
+        novo ou heartbeat. Termina quando a conexão cai.
+        """
+        ledger = account.ledger
+        index = from_index
+        while True:
+            head = len(ledger.chain)
+            if index < head:
+                count = min(head - index, self.history_page_size)
+                blocks = await self.read_history(ledger, index, index + count)
+            else:
+                # Em dia: espera um append (notify_append) ou o heartbeat
+                event = self.append_events.setdefault(account.account_id, asyncio.Event())
+                try:
+                    await asyncio.wait_for(event.wait(), heartbeat)
+                    continue
+                except asyncio.TimeoutError:
+                    blocks = []
+            yield {
+                "status": "ok",
+                "id": request.get("id"),
+                "blocks": blocks,
+                "from_index": index,
+                "head_index": len(ledger.chain) - 1,
+                "request_id": request_id,
+                "client_id": client_id,
+                "timestamp": datetime.now().isoformat()
+            }
+            index += len(blocks)
+
     async def handle_verify(self, request: dict, request_id: int) -> dict:
         """Processa uma requisição de verificação de integridade."""
         client_id = request.get("client_id", request.get("id", "unknown"))
-        valid, message = self.ledger.verify_integrity()
+        account = self.accounts.get(request.get("account"))
+        full = bool(request.get("full", False))
+        parallel = bool(request.get("parallel", False)) and self.verify_workers > 0
+        valid, message = await self.verify_ledger(account.ledger, full, parallel)
         
-        self.logger.info(f"[Request #{request_id}] Integrity check: {message}")
+        self.logger.info("[Request #%d] Integrity check (%s%s): %s", request_id,
+                         "full" if full else "incremental", ", parallel" if parallel else "", message)
         return {
             "status": "ok" if valid else "error",
             "valid": valid,
             "message": message,
+            "account": account.account_id,
+            "mode": "full" if full else "incremental",
+            "parallel": parallel,
+            "verified_index": account.ledger.verified_index,
+            "checkpoint_count": len(account.ledger.checkpoints),
             "request_id": request_id,
             "client_id": client_id,
             "timestamp": datetime.now().isoformat()
@@ -284,7 +1364,7 @@ class MiniCoinServer:
         """Processa uma requisição de ping."""
         client_id = request.get("client_id", request.get("id", "unknown"))
         
-        self.logger.debug(f"[Request #{request_id}] Ping from {client_id}")
+        self.logger.debug("[Request #%d] Ping from %s", request_id, client_id)
         return {
             "status": "ok",
             "message": "pong",
@@ -293,25 +1373,138 @@ class MiniCoinServer:
             "timestamp": datetime.now().isoformat()
         }
 
+    async def handle_metrics(self, request: dict, request_id: int) -> dict:
+        """
+        Processa uma consulta às métricas do servidor.
+
+        Com format="prometheus", a resposta inclui também o texto no
+        formato de exposição do Prometheus.
+        """
+        client_id = request.get("client_id", request.get("id", "unknown"))
+        chain_lengths = self.chain_lengths()
+
+        response = {
+            "status": "ok",
+            "metrics": self.metrics.snapshot(chain_lengths),
+            "admission": self.admission.snapshot(),
+            "response_cache": self.response_cache.snapshot(),
+            "idempotency": self.idempotency.snapshot(),
+            "request_id": request_id,
+            "client_id": client_id,
+            "timestamp": datetime.now().isoformat()
+        }
+        if self.replica is not None:
+            response["replication"] = self.replica.status()
+        if request.get("format") == "prometheus":
+            response["text"] = self.render_metrics()
+        return response
+
+    def chain_lengths(self) -> Dict[str, int]:
+        """Número de blocos da cadeia de cada conta."""
+        return {account.account_id: len(account.ledger.chain) for account in self.accounts}
+
+    def render_metrics(self) -> str:
+        """Métricas no formato de texto do Prometheus (listener HTTP)."""
+        text = self.metrics.render(self.chain_lengths()) + self.response_cache.render()
+        if self.replica is not None:
+            text += self.replica.render()
+        return text
+
+    async def handle_create_account(self, request: dict, request_id: int) -> dict:
+        """Processa a criação de uma nova conta."""
+        client_id = request.get("client_id", request.get("id", "unknown"))
+        account_id = request.get("account")
+        
+        try:
+            account = self.accounts.create(
+                account_id,
+                owner=request.get("owner"),
+                initial_deposit=request.get("initial_deposit", 0.0)
+            )
+        except ValueError as e:
+            self.logger.warning("[Request #%d] Account creation failed: %s", request_id, e)
+            return {
+                "status": "error",
+                "message": str(e),
+                "request_id": request_id,
+                "client_id": client_id,
+                "timestamp": datetime.now().isoformat()
+            }
+        
+        self.logger.info("[Request #%d] Account created: %s", request_id, account_id)
+        return {
+            "status": "ok",
+            "message": f"Account {account_id} created",
+            "account": account.account_id,
+            "owner": account.ledger.owner,
+            "balance": account.ledger.get_balance(),
+            "balance_minor": account.ledger.get_balance_minor(),
+            "block_hash": account.ledger.chain.hash_at(0),
+            "request_id": request_id,
+            "client_id": client_id,
+            "timestamp": datetime.now().isoformat()
+        }
+
     async def start(self):
         """Inicia o servidor."""
+        replication = None
+        if self.replica is not None:
+            # Uma réplica só atende depois de receber o genesis do primário
+            replication = asyncio.create_task(self.replica.run())
+            try:
+                await self.replica.wait_ready()
+            except asyncio.CancelledError:
+                replication.cancel()
+                raise
+            default_account = self.accounts.get(None)
+            self.ledger = default_account.ledger
+            self.store = default_account.store
+
         server = await asyncio.start_server(
-            self.handle_client, self.host, self.port
+            self.handle_client, self.host, self.port, limit=self.max_frame_size
         )
 
         addr = server.sockets[0].getsockname()
         self.logger.info(f"Server listening on {addr[0]}:{addr[1]}")
+
+        lag_monitor = asyncio.create_task(self.metrics.monitor_loop_lag(self.loop_lag_interval))
+        metrics_server = None
+        if self.metrics_port is not None:
+            metrics_server = await asyncio.start_server(
+                functools.partial(serve_http, render=self.render_metrics),
+                self.host, self.metrics_port
+            )
+            metrics_addr = metrics_server.sockets[0].getsockname()
+            self.logger.info("Metrics listening on http://%s:%d/metrics",
+                             metrics_addr[0], metrics_addr[1])
         
         print(f"\n{'='*60}")
         print(f"MiniCoin Server Started")
         print(f"{'='*60}")
         print(f"Address: {addr[0]}:{addr[1]}")
+        if self.replica is not None:
+            print(f"Read-only replica of: {self.replica.primary}")
         print(f"Owner: {self.ledger.owner}")
         print(f"Initial Balance: {self.ledger.get_balance():.2f} MiniCoins")
         print(f"{'='*60}\n")
 
-        async with server:
-            await server.serve_forever()
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            lag_monitor.cancel()
+            if replication is not None:
+                replication.cancel()
+            if metrics_server is not None:
+                metrics_server.close()
+            if self.verify_executor is not None:
+                self.verify_executor.shutdown()
+            for batcher in self.batchers.values():
+                await batcher.drain()
+            if self.snapshot_tasks:
+                await asyncio.gather(*self.snapshot_tasks.values(), return_exceptions=True)
+            self.offload.shutdown()
+            self.accounts.close()
 
 
 def main():
@@ -323,6 +1516,66 @@ def main():
     parser.add_argument("--port", type=int, default=8888, help="Server port (default: 8888)")
     parser.add_argument("--owner", default="João Silva", help="Account owner name")
     parser.add_argument("--initial", type=float, default=100.0, help="Initial deposit (default: 100.0)")
+    parser.add_argument("--data-dir", default=None, help="Directory for the persistent block store (default: in-memory)")
+    parser.add_argument("--fsync", choices=FSYNC_POLICIES, default=FSYNC_ALWAYS,
+                        help="Block store fsync policy (default: always)")
+    parser.add_argument("--max-frame-size", type=int, default=64 * 1024,
+                        help="Maximum request line size in bytes (default: 65536)")
+    parser.add_argument("--max-inflight", type=int, default=64,
+                        help="Maximum pipelined requests in flight per connection (default: 64)")
+    parser.add_argument("--history-page-size", type=int, default=500,
+                        help="Maximum blocks per history page or stream chunk (default: 500)")
+    parser.add_argument("--shards", type=int, default=16,
+                        help="Number of account registry shards (default: 16)")
+    parser.add_argument("--batch-window-ms", type=float, default=0.0,
+                        help="Group-commit window for deposits/withdrawals in ms (default: 0, disabled)")
+    parser.add_argument("--batch-max", type=int, default=64,
+                        help="Maximum operations per group-commit batch (default: 64)")
+    parser.add_argument("--log-mode", choices=LOG_MODES, default="sync",
+                        help="sync: write logs on the event loop; queue: background thread (default: sync)")
+    parser.add_argument("--log-format", choices=LOG_FORMATS, default="text",
+                        help="Log line format (default: text)")
+    parser.add_argument("--payload-log-rate", type=float, default=1.0,
+                        help="Fraction of request/response payloads logged, 0 disables (default: 1.0)")
+    parser.add_argument("--payload-log-max-per-sec", type=float, default=None,
+                        help="Maximum payload log lines per second (default: unlimited)")
+    parser.add_argument("--verify-workers", type=int, default=0,
+                        help="Worker processes for parallel verify requests (default: 0, disabled)")
+    parser.add_argument("--snapshot-interval", type=int, default=0,
+                        help="Blocks between chain snapshots per account, requires --data-dir (default: 0, disabled)")
+    parser.add_argument("--snapshot-retention", type=int, default=2,
+                        help="Snapshots kept per account (default: 2)")
+    parser.add_argument("--max-batch-operations", type=int, default=1000,
+                        help="Maximum operations in one batch request (default: 1000)")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="Serve Prometheus metrics over HTTP on this port (default: disabled)")
+    parser.add_argument("--max-offloaded", type=int, default=1,
+                        help="Verify/history jobs run concurrently off the event loop (default: 1)")
+    parser.add_argument("--offload-min-blocks", type=int, default=256,
+                        help="Verifications and history reads of fewer blocks stay on "
+                             "the event loop (default: 256)")
+    parser.add_argument("--max-connections", type=int, default=1024,
+                        help="Maximum open client connections (default: 1024)")
+    parser.add_argument("--max-active", type=int, default=128,
+                        help="Maximum requests executing at once (default: 128)")
+    parser.add_argument("--max-bulk", type=int, default=4,
+                        help="Maximum verify/history requests executing at once (default: 4)")
+    parser.add_argument("--queue-limit", type=int, default=256,
+                        help="Maximum queued requests per action before busy replies (default: 256)")
+    parser.add_argument("--max-queue-wait-ms", type=float, default=2000.0,
+                        help="Maximum time a request waits in its queue (default: 2000)")
+    parser.add_argument("--max-replication-streams", type=int, default=16,
+                        help="Maximum open replicate streams from replicas (default: 16)")
+    parser.add_argument("--replica-of", default=None, metavar="HOST:PORT",
+                        help="Run as a read-only replica of this primary (default: primary)")
+    parser.add_argument("--replica-accounts", default="",
+                        help="Comma-separated accounts to replicate besides the default one")
+    parser.add_argument("--response-cache-size", type=int, default=1024,
+                        help="Cached balance/history/verify/ping responses (0 = disabled, default: 1024)")
+    parser.add_argument("--idempotency-ttl", type=float, default=300.0,
+                        help="Seconds an idempotency key is remembered (default: 300)")
+    parser.add_argument("--idempotency-max-keys", type=int, default=100_000,
+                        help="Idempotency keys remembered at most (default: 100000)")
     
     args = parser.parse_args()
     
@@ -330,7 +1583,37 @@ def main():
         host=args.host,
         port=args.port,
         owner=args.owner,
-        initial_deposit=args.initial
+        initial_deposit=args.initial,
+        data_dir=args.data_dir,
+        fsync_policy=args.fsync,
+        max_frame_size=args.max_frame_size,
+        max_inflight=args.max_inflight,
+        history_page_size=args.history_page_size,
+        shard_count=args.shards,
+        batch_window=args.batch_window_ms / 1000.0,
+        batch_max=args.batch_max,
+        log_mode=args.log_mode,
+        log_format=args.log_format,
+        payload_log_rate=args.payload_log_rate,
+        payload_log_max_per_sec=args.payload_log_max_per_sec,
+        verify_workers=args.verify_workers,
+        snapshot_interval=args.snapshot_interval,
+        snapshot_retention=args.snapshot_retention,
+        metrics_port=args.metrics_port,
+        max_batch_operations=args.max_batch_operations,
+        max_offloaded=args.max_offloaded,
+        offload_min_blocks=args.offload_min_blocks,
+        max_connections=args.max_connections,
+        max_active=args.max_active,
+        max_bulk=args.max_bulk,
+        queue_limit=args.queue_limit,
+        max_queue_wait=args.max_queue_wait_ms / 1000.0,
+        max_replication_streams=args.max_replication_streams,
+        replica_of=args.replica_of,
+        replica_accounts=[a for a in args.replica_accounts.split(",") if a],
+        response_cache_size=args.response_cache_size,
+        idempotency_ttl=args.idempotency_ttl,
+        idempotency_max_keys=args.idempotency_max_keys
     )
     
     try:
@@ -0,0 +1,181 @@
+"""
+MiniCoin Snapshot - Snapshots da cadeia para inicialização rápida
+Grava periodicamente as colunas da cadeia (saldos, hashes, índices
+auxiliares) em um arquivo compacto. Na reinicialização o ledger carrega
+o snapshot mais recente e reprocessa apenas os blocos gravados depois
+dele, em vez de decodificar e recalcular o hash da cadeia inteira.
+
+Formato de cada arquivo (snapshot-<número de blocos>.snap):
+- Cabeçalho: assinatura "MCSNAP01" + tamanho dos metadados (uint32, big-endian)
+- Metadados: JSON (UTF-8) com contagem de blocos, saldo, hash do último
+  bloco, descrição das colunas e SHA-256 do payload
+- Payload: colunas binárias exportadas pelo ChainStore
+
+Os arquivos são gravados em um temporário e renomeados, de modo que uma
+queda durante a escrita nunca deixa um snapshot incompleto no lugar.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import struct
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+from minicoin.chain import ChainStore
+
+
+SNAPSHOT_MAGIC = b"MCSNAP01"
+SNAPSHOT_HEADER = struct.Struct(">8sI")
+SNAPSHOT_PREFIX = "snapshot-"
+SNAPSHOT_SUFFIX = ".snap"
+
+
+class SnapshotManager:
+    """
+    Grava, poda e carrega os snapshots de uma cadeia.
+    """
+
+    def __init__(self, directory: str, interval: int = 0, retention: int = 2):
+        """
+        Inicializa o gerenciador.
+
+        Args:
+            directory: Diretório dos snapshots
+            interval: Blocos novos entre snapshots (0 = só sob demanda)
+            retention: Número de snapshots mantidos em disco
+        """
+        if interval < 0:
+            raise ValueError("interval não pode ser negativo")
+        if retention <= 0:
+            raise ValueError("retention deve ser positivo")
+
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.interval = interval
+        self.retention = retention
+        self.logger = logging.getLogger("MiniCoinSnapshot")
+
+        snapshots = self.list()
+        # Número de blocos do snapshot mais recente
+        self.last_count = snapshots[-1][0] if snapshots else 0
+
+    def _path(self, block_count: int) -> Path:
+        return self.directory / f"{SNAPSHOT_PREFIX}{block_count:020d}{SNAPSHOT_SUFFIX}"
+
+    def list(self) -> List[Tuple[int, Path]]:
+        """Lista os snapshots existentes, do mais antigo ao mais recente."""
+        snapshots = []
+        for path in self.directory.glob(f"{SNAPSHOT_PREFIX}*{SNAPSHOT_SUFFIX}"):
+            number = path.name[len(SNAPSHOT_PREFIX):-len(SNAPSHOT_SUFFIX)]
+            if number.isdigit():
+                snapshots.append((int(number), path))
+        return sorted(snapshots)
+
+    def due(self, block_count: int) -> bool:
+        """Retorna True se já passaram `interval` blocos desde o último snapshot."""
+        return self.interval > 0 and block_count - self.last_count >= self.interval
+
+    def write(self, chain: ChainStore) -> Path:
+        """
+        Grava um snapshot da cadeia e remove os excedentes da retenção.
+
+        Returns:
+            Caminho do snapshot gravado
+        """
+        metadata, payload = chain.to_snapshot()
+        block_count = len(chain)
+        metadata.update({
+            "block_count": block_count,
+            "balance": chain.balance_at(-1) if block_count else 0.0,
+            "head_hash": chain.hash_at(-1) if block_count else None,
+            "checksum": hashlib.sha256(payload).hexdigest(),
+            "created": datetime.now().isoformat(),
+        })
+        header = json.dumps(metadata, separators=(",", ":")).encode()
+
+        path = self._path(block_count)
+        temporary = path.with_suffix(".tmp")
+        with open(temporary, "wb") as snapshot:
+            snapshot.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, len(header)))
+            snapshot.write(header)
+            snapshot.write(payload)
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+        os.replace(temporary, path)
+
+        self.last_count = block_count
+        self.logger.info("Snapshot written: %s (%d blocks, %d bytes)",
+                         path.name, block_count, len(payload))
+        self._prune()
+        return path
+
+    def _prune(self):
+        """Remove os snapshots mais antigos além da retenção."""
+        for _, path in self.list()[:-self.retention]:
+            path.unlink()
+
+    def read(self, path: Path) -> ChainStore:
+        """
+        Lê e valida um snapshot.
+
+        Raises:
+            ValueError: Arquivo corrompido ou em formato desconhecido
+        """
+        data = path.read_bytes()
+        if len(data) < SNAPSHOT_HEADER.size:
+            raise ValueError("Snapshot truncado")
+        magic, header_size = SNAPSHOT_HEADER.unpack_from(data)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError("Arquivo não é um snapshot da MiniCoin")
+
+        start = SNAPSHOT_HEADER.size
+        metadata = json.loads(data[start:start + header_size])
+        payload = data[start + header_size:]
+        if hashlib.sha256(payload).hexdigest() != metadata["checksum"]:
+            raise ValueError("Checksum do snapshot não confere")
+
+        chain = ChainStore.from_snapshot(metadata, payload)
+        if len(chain) != metadata["block_count"] or \
+                (len(chain) and chain.hash_at(-1) != metadata["head_hash"]):
+            raise ValueError("Metadados do snapshot não conferem com as colunas")
+        return chain
+
+    def load_latest(self, max_blocks: int,
+                    stored_hash: Optional[Callable[[int], str]] = None) -> Optional[ChainStore]:
+        """
+        Carrega o snapshot válido mais recente com até `max_blocks` blocos.
+
+        Snapshots à frente do armazenamento (por exemplo, blocos perdidos
+        antes do fsync) ou corrompidos são ignorados. O checksum só
+        detecta corrupção acidental; com `stored_hash`, o hash do último
+        bloco do snapshot também é conferido com o do armazenamento, e
+        snapshots que não conferem são ignorados.
+
+        Args:
+            max_blocks: Número de blocos do armazenamento
+            stored_hash: Hash do bloco gravado em um índice
+
+        Returns:
+            Cadeia do snapshot, ou None se nenhum servir
+        """
+        for block_count, path in reversed(self.list()):
+            if block_count > max_blocks:
+                self.logger.warning("Skipping %s: ahead of the block store (%d blocks)",
+                                    path.name, max_blocks)
+                continue
+            try:
+                chain = self.read(path)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                self.logger.warning("Skipping unreadable snapshot %s: %s", path.name, e)
+                continue
+            if stored_hash is not None and len(chain) and \
+                    stored_hash(len(chain) - 1) != chain.hash_at(-1):
+                self.logger.warning("Skipping %s: head hash does not match the block store",
+                                    path.name)
+                continue
+            self.logger.info("Loaded snapshot %s (%d blocks)", path.name, block_count)
+            return chain
+        return None
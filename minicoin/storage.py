@@ -0,0 +1,409 @@
+"""
+MiniCoin Storage - Armazenamento persistente append-only da blockchain
+Grava cada bloco como um registro com prefixo de tamanho em arquivos de
+segmento, permitindo que o servidor sobreviva a reinícios.
+
+Formato de cada registro:
+- Tamanho do payload (uint32, big-endian)
+- CRC32 do payload (uint32, big-endian)
+- Payload: bloco serializado em JSON (UTF-8)
+
+Os segmentos se chamam segment-<índice do primeiro bloco>.log e são
+rotacionados quando atingem `segment_max_bytes`.
+
+Políticas de fsync:
+- always: fsync a cada bloco gravado
+- group: fsync a cada `group_size` blocos
+- interval: fsync quando passaram `fsync_interval` segundos desde o último
+
+Leitura: os segmentos são mapeados em memória (mmap) e um índice de
+offsets (8 bytes por bloco) localiza qualquer registro em O(1). Páginas
+de histórico e a reconstrução da cadeia decodificam só os registros
+pedidos, direto das páginas do sistema operacional, sem carregar
+segmentos inteiros. As leituras podem rodar em threads de fundo
+(histórico fora do event loop) enquanto o event loop grava.
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from minicoin.block import LEGACY_VERSION, Block
+
+
+FSYNC_ALWAYS = "always"
+FSYNC_GROUP = "group"
+FSYNC_INTERVAL = "interval"
+FSYNC_POLICIES = (FSYNC_ALWAYS, FSYNC_GROUP, FSYNC_INTERVAL)
+
+RECORD_HEADER = struct.Struct(">II")
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".log"
+
+
+class StorageError(Exception):
+    """Erro irrecuperável no armazenamento em disco."""
+
+
+def encode_record(block: Block) -> bytes:
+    """Serializa um bloco em um registro com prefixo de tamanho e CRC."""
+    payload = json.dumps(block.to_dict(), separators=(",", ":")).encode()
+    return RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def decode_payload(payload: bytes) -> Block:
+    """Desserializa o payload JSON de um registro em um bloco."""
+    return Block(**json.loads(payload))
+
+
+class BlockStore:
+    """
+    Armazenamento append-only de blocos em arquivos de segmento.
+
+    Na abertura, todos os segmentos são percorridos e cada registro é
+    validado (tamanho e CRC; no último segmento, também o índice
+    sequencial, já que nos anteriores ele decorre do nome do segmento
+    seguinte). Um registro incompleto
+    ou corrompido no final do último segmento é tratado como resultado
+    de uma queda durante a escrita e descartado (o arquivo é truncado).
+    Corrupção em qualquer outro ponto gera StorageError.
+    """
+
+    def __init__(self, directory: str, fsync_policy: str = FSYNC_ALWAYS,
+                 group_size: int = 32, fsync_interval: float = 1.0,
+                 segment_max_bytes: int = 64 * 1024 * 1024):
+        """
+        Abre (ou cria) o armazenamento e recupera o estado do disco.
+
+        Args:
+            directory: Diretório dos arquivos de segmento
+            fsync_policy: always, group ou interval (padrão: always)
+            group_size: Blocos por fsync na política group
+            fsync_interval: Segundos entre fsyncs na política interval
+            segment_max_bytes: Tamanho máximo de cada segmento
+        """
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"Política de fsync inválida: {fsync_policy}")
+
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.fsync_policy = fsync_policy
+        self.group_size = max(1, group_size)
+        self.fsync_interval = fsync_interval
+        self.segment_max_bytes = segment_max_bytes
+        self.logger = logging.getLogger("MiniCoinStorage")
+
+        # Lista de (índice do primeiro bloco, caminho) em ordem
+        self.segments: List[Tuple[int, Path]] = []
+        # Offset de cada registro, por segmento (paralelo a segments)
+        self._offsets: List[array] = []
+        # Mapeamentos abertos, por posição do segmento
+        self._maps: Dict[int, mmap.mmap] = {}
+        # Serializa remapeamentos de leitores em outras threads com a
+        # troca do arquivo aberto (rotação e fechamento)
+        self._lock = threading.Lock()
+        # Serializa o fsync (que pode vir de outra thread, nos snapshots
+        # em segundo plano) com a troca do arquivo aberto
+        self._sync_lock = threading.Lock()
+        self.block_count = 0
+        self._file = None
+        self._file_size = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+        self._recover()
+        self._open_tail()
+
+    # ------------------------------------------------------------------
+    # Recuperação
+    # ------------------------------------------------------------------
+
+    def _segment_path(self, first_index: int) -> Path:
+        """Caminho do segmento cujo primeiro bloco é `first_index`."""
+        return self.directory / f"{SEGMENT_PREFIX}{first_index:020d}{SEGMENT_SUFFIX}"
+
+    def _list_segments(self) -> List[Tuple[int, Path]]:
+        """Lista os segmentos existentes ordenados pelo primeiro índice."""
+        segments = []
+        for path in self.directory.glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}"):
+            number = path.name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]
+            if number.isdigit():
+                segments.append((int(number), path))
+        return sorted(segments)
+
+    def _scan_segment(self, path: Path, first_index: int,
+                      decode: bool = True) -> Tuple[array, int]:
+        """
+        Valida os registros de um segmento, lendo-o através de um mmap.
+
+        Com decode=False só o tamanho e o CRC são conferidos, sem
+        desserializar os blocos.
+
+        Returns:
+            Tupla (offsets dos registros válidos, offset do fim do último
+            registro válido)
+        """
+        offsets = array("Q")
+        if path.stat().st_size == 0:
+            return offsets, 0
+
+        with open(path, "rb") as segment, \
+                mmap.mmap(segment.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            size = len(data)
+            offset = 0
+            while offset + RECORD_HEADER.size <= size:
+                length, crc = RECORD_HEADER.unpack_from(data, offset)
+                start = offset + RECORD_HEADER.size
+                if start + length > size:
+                    break
+                with memoryview(data)[start:start + length] as payload:
+                    if zlib.crc32(payload) != crc:
+                        break
+                if decode:
+                    try:
+                        block = decode_payload(data[start:start + length])
+                    except (ValueError, TypeError):
+                        break
+                    if block.index != first_index + len(offsets):
+                        break
+                offsets.append(offset)
+                offset = start + length
+        return offsets, offset
+
+    def _recover(self):
+        """Percorre os segmentos, validando e reparando a cauda se preciso."""
+        segments = self._list_segments()
+        expected_index = 0
+
+        for position, (first_index, path) in enumerate(segments):
+            if first_index != expected_index:
+                raise StorageError(
+                    f"Segmento {path.name} começa no bloco {first_index}, esperado {expected_index}"
+                )
+
+            is_last = position == len(segments) - 1
+            offsets, valid_end = self._scan_segment(path, first_index, decode=is_last)
+            count = len(offsets)
+            size = path.stat().st_size
+
+            if valid_end != size:
+                if not is_last:
+                    raise StorageError(f"Registro corrompido no segmento {path.name}")
+                self.logger.warning(
+                    "Discarding %d bytes of torn tail in %s (recovered %d blocks)",
+                    size - valid_end, path.name, count
+                )
+                with open(path, "r+b") as segment:
+                    segment.truncate(valid_end)
+                    segment.flush()
+                    os.fsync(segment.fileno())
+
+            if count == 0 and is_last and first_index > 0:
+                # Segmento vazio deixado por uma rotação interrompida
+                path.unlink()
+                continue
+
+            self.segments.append((first_index, path))
+            self._offsets.append(offsets)
+            expected_index += count
+
+        self.block_count = expected_index
+
+    def _open_tail(self):
+        """Abre o último segmento (ou cria o primeiro) para escrita."""
+        if not self.segments:
+            self.segments.append((0, self._segment_path(0)))
+            self._offsets.append(array("Q"))
+        path = self.segments[-1][1]
+        self._file = open(path, "ab")
+        self._file_size = self._file.tell()
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+
+    def _segment_for(self, index: int) -> int:
+        """Posição (em segments) do segmento que contém o bloco `index`."""
+        low, high = 0, len(self.segments) - 1
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.segments[middle][0] <= index:
+                low = middle
+            else:
+                high = middle - 1
+        return low
+
+    def _map(self, position: int, end: int) -> mmap.mmap:
+        """
+        Mapeamento do segmento `position` cobrindo ao menos `end` bytes.
+
+        Segmentos selados são mapeados uma única vez; o último, que
+        ainda cresce, é remapeado quando a leitura passa do fim mapeado.
+        O mapeamento substituído não é fechado: outro leitor pode estar
+        iterando sobre ele, e ele é liberado quando deixa de ser usado.
+        """
+        mapped = self._maps.get(position)
+        if mapped is not None and len(mapped) >= end:
+            return mapped
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+            with open(self.segments[position][1], "rb") as segment:
+                mapped = mmap.mmap(segment.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[position] = mapped
+        return mapped
+
+    def iter_records(self, start: int = 0, stop: Optional[int] = None) -> Iterator[dict]:
+        """
+        Itera sobre os blocos [start, stop) como dicionários, no formato
+        de Block.to_dict(), decodificando cada registro direto do mmap.
+
+        Args:
+            start: Índice do primeiro bloco desejado
+            stop: Índice final exclusivo (padrão: todos os blocos gravados)
+        """
+        stop = self.block_count if stop is None else min(stop, self.block_count)
+        if start >= stop:
+            return
+
+        position = self._segment_for(start)
+        index = start
+        while index < stop:
+            first_index = self.segments[position][0]
+            offsets = self._offsets[position]
+            last = min(stop, first_index + len(offsets))
+            mapped = self._map(position, offsets[last - 1 - first_index] + RECORD_HEADER.size)
+            for offset in offsets[index - first_index:last - first_index]:
+                length, _ = RECORD_HEADER.unpack_from(mapped, offset)
+                begin = offset + RECORD_HEADER.size
+                if begin + length > len(mapped):
+                    mapped = self._map(position, begin + length)
+                record = json.loads(mapped[begin:begin + length])
+                # Registros anteriores ao versionamento dos blocos
+                record.setdefault("version", LEGACY_VERSION)
+                yield record
+            index = last
+            position += 1
+
+    def read_block(self, index: int) -> Block:
+        """
+        Lê um único bloco do disco em O(1).
+
+        Raises:
+            IndexError: Índice fora do armazenamento
+        """
+        if not 0 <= index < self.block_count:
+            raise IndexError("block index out of range")
+        return Block(**next(self.iter_records(index, index + 1)))
+
+    def iter_blocks(self, start: int = 0) -> Iterator[Block]:
+        """
+        Itera sobre os blocos gravados a partir do índice `start`.
+
+        Args:
+            start: Índice do primeiro bloco desejado
+        """
+        for record in self.iter_records(start):
+            yield Block(**record)
+
+    # ------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------
+
+    def _rotate(self):
+        """Fecha o segmento atual e inicia um novo."""
+        path = self._segment_path(self.block_count)
+        with self._sync_lock:
+            self._sync()
+            with self._lock:
+                self._file.close()
+                self.segments.append((self.block_count, path))
+                self._offsets.append(array("Q"))
+                self._file = open(path, "ab")
+        self._file_size = 0
+
+    def _write(self, block: Block):
+        """Grava um bloco sem aplicar a política de fsync."""
+        if block.index != self.block_count:
+            raise StorageError(
+                f"Bloco {block.index} fora de ordem (esperado {self.block_count})"
+            )
+        if self._file_size >= self.segment_max_bytes:
+            self._rotate()
+
+        record = encode_record(block)
+        self._file.write(record)
+        self._offsets[-1].append(self._file_size)
+        self._file_size += len(record)
+        self.block_count += 1
+        self._unsynced += 1
+
+    def _apply_fsync_policy(self):
+        """Decide se é hora de forçar os dados para o disco."""
+        self._file.flush()
+        if self.fsync_policy == FSYNC_ALWAYS:
+            self.sync()
+        elif self.fsync_policy == FSYNC_GROUP:
+            if self._unsynced >= self.group_size:
+                self.sync()
+        elif time.monotonic() - self._last_sync >= self.fsync_interval:
+            self.sync()
+
+    def append(self, block: Block):
+        """
+        Grava um bloco no final do armazenamento.
+
+        Os dados sempre chegam ao sistema operacional (flush); a
+        política de fsync define quando são forçados para o disco.
+        """
+        self._write(block)
+        self._apply_fsync_policy()
+
+    def append_many(self, blocks: Iterable[Block]):
+        """Grava vários blocos, aplicando a política de fsync uma única vez."""
+        for block in blocks:
+            self._write(block)
+        self._apply_fsync_policy()
+
+    def sync(self):
+        """
+        Força a gravação em disco de todos os blocos pendentes.
+
+        Pode ser chamado de outra thread enquanto o event loop grava
+        novos blocos; os gravados durante o fsync continuam pendentes.
+        """
+        with self._sync_lock:
+            self._sync()
+
+    def _sync(self):
+        if self._file is None:
+            return
+        pending = self._unsynced
+        self._file.flush()
+        if pending:
+            os.fsync(self._file.fileno())
+            self._unsynced -= pending
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        """Sincroniza e fecha o segmento aberto e os mapeamentos."""
+        with self._sync_lock, self._lock:
+            for mapped in self._maps.values():
+                mapped.close()
+            self._maps.clear()
+            if self._file is not None:
+                self._sync()
+                self._file.close()
+                self._file = None
+
+    def __len__(self) -> int:
+        """Número de blocos gravados."""
+        return self.block_count
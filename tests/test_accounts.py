@@ -0,0 +1,81 @@
+"""
+Testes unitários para o registro de contas da MiniCoin.
+Testa a criação, o particionamento em shards e a persistência das contas.
+"""
+
+import pytest
+from minicoin.accounts import AccountRegistry, DEFAULT_ACCOUNT, UnknownAccountError
+
+
+class TestAccountRegistry:
+    """Testes para a classe AccountRegistry."""
+
+    def test_accounts_have_independent_chains(self):
+        """Testa que cada conta tem sua própria blockchain e lock."""
+        registry = AccountRegistry(shard_count=4)
+        alice = registry.create("alice", initial_deposit=10.0)
+        bob = registry.create("bob", owner="Bob", initial_deposit=20.0)
+
+        alice.ledger.deposit(5.0)
+
+        assert alice.ledger.get_balance() == 15.0
+        assert bob.ledger.get_balance() == 20.0
+        assert bob.ledger.owner == "Bob"
+        assert alice.lock is not bob.lock
+        assert len(registry) == 2
+
+    def test_get_default_and_unknown(self):
+        """Testa a conta padrão e contas inexistentes."""
+        registry = AccountRegistry()
+        default = registry.open_default("Carol", 100.0)
+
+        assert registry.get(None) is default
+        assert registry.get(DEFAULT_ACCOUNT) is default
+        with pytest.raises(UnknownAccountError):
+            registry.get("ghost")
+
+    def test_invalid_or_duplicate_account(self):
+        """Testa identificadores inválidos e duplicados."""
+        registry = AccountRegistry()
+        registry.create("dave")
+
+        with pytest.raises(ValueError):
+            registry.create("dave")
+        with pytest.raises(ValueError):
+            registry.create("")
+        with pytest.raises(ValueError):
+            registry.create("x" * 100)
+
+    def test_invalid_initial_deposit(self, tmp_path):
+        """Testa a recusa de depósitos iniciais negativos ou não numéricos."""
+        registry = AccountRegistry(data_dir=str(tmp_path))
+
+        for initial_deposit in (-50.0, "100", None, 1e17):
+            with pytest.raises(ValueError):
+                registry.create("erin", initial_deposit=initial_deposit)
+
+        assert "erin" not in registry
+        assert registry.create("erin", initial_deposit=5.0).ledger.get_balance() == 5.0
+
+    def test_accounts_are_spread_across_shards(self):
+        """Testa a distribuição das contas entre os shards."""
+        registry = AccountRegistry(shard_count=8)
+        for i in range(64):
+            registry.create(f"account-{i}")
+
+        assert sum(1 for shard in registry.shards if shard) > 1
+
+    def test_accounts_survive_restart(self, tmp_path):
+        """Testa que as contas persistidas são recarregadas."""
+        registry = AccountRegistry(str(tmp_path))
+        registry.open_default("Default Owner", 100.0)
+        registry.create("conta ç", owner="Eve", initial_deposit=30.0).ledger.withdraw(10.0)
+        registry.close()
+
+        reopened = AccountRegistry(str(tmp_path))
+        reopened.open_default("Ignored", 0.0)
+
+        assert reopened.get("conta ç").ledger.get_balance() == 20.0
+        assert reopened.get("conta ç").ledger.owner == "Eve"
+        assert reopened.get(None).ledger.owner == "Default Owner"
+        reopened.close()
@@ -0,0 +1,97 @@
+"""
+Testes unitários para o controle de admissão do servidor da MiniCoin.
+Testa a ordem de prioridade das filas, o limite das auditorias e as
+recusas rápidas com fila cheia ou espera esgotada.
+"""
+
+import asyncio
+
+import pytest
+from minicoin.admission import AdmissionController, ServerBusy
+
+
+class TestAdmissionController:
+    """Testes para a classe AdmissionController."""
+
+    @pytest.mark.asyncio
+    async def test_writes_are_served_before_bulk_reads(self):
+        """Testa que uma vaga liberada vai para a escrita, não para a auditoria."""
+        admission = AdmissionController(max_active=1)
+        ticket = await admission.enter("deposit")
+        order = []
+
+        async def request(action):
+            entered = await admission.enter(action)
+            order.append(action)
+            admission.leave(entered)
+
+        tasks = [asyncio.create_task(request(action))
+                 for action in ("history", "verify", "balance", "withdraw")]
+        await asyncio.sleep(0)
+        admission.leave(ticket)
+        await asyncio.gather(*tasks)
+
+        assert order == ["withdraw", "balance", "history", "verify"]
+        assert admission.active == 0
+
+    @pytest.mark.asyncio
+    async def test_bulk_limit_leaves_room_for_other_actions(self):
+        """Testa que auditorias acima de max_bulk esperam sem bloquear consultas."""
+        admission = AdmissionController(max_active=4, max_bulk=1)
+        audit = await admission.enter("verify")
+        waiting = asyncio.create_task(admission.enter("history"))
+        await asyncio.sleep(0)
+
+        balance = await admission.enter("balance")
+
+        assert not waiting.done()
+        admission.leave(audit)
+        admission.leave(await waiting)
+        admission.leave(balance)
+        assert admission.active == 0
+
+    @pytest.mark.asyncio
+    async def test_full_queue_is_rejected_immediately(self):
+        """Testa a recusa com a fila da ação cheia."""
+        admission = AdmissionController(max_active=1, queue_limit=1)
+        ticket = await admission.enter("deposit")
+        queued = asyncio.create_task(admission.enter("history"))
+        await asyncio.sleep(0)
+
+        with pytest.raises(ServerBusy) as busy:
+            await admission.enter("history")
+
+        assert busy.value.retry_after > 0
+        assert admission.rejected == 1
+        assert admission.snapshot()["queued"] == {"history": 1}
+        admission.leave(ticket)
+        admission.leave(await queued)
+
+    @pytest.mark.asyncio
+    async def test_wait_is_bounded(self):
+        """Testa a recusa quando a espera passa de max_wait."""
+        admission = AdmissionController(max_active=1, max_wait=0.05)
+        ticket = await admission.enter("verify")
+
+        with pytest.raises(ServerBusy):
+            await admission.enter("balance")
+
+        admission.leave(ticket)
+        assert admission.snapshot()["queued"] == {}
+        admission.leave(await admission.enter("balance"))
+
+    @pytest.mark.asyncio
+    async def test_replication_streams_have_their_own_limit(self):
+        """Testa que streams de replicação não ocupam as vagas das auditorias."""
+        admission = AdmissionController(max_active=4, max_bulk=1, max_replication=1,
+                                        max_wait=0.05)
+        stream = await admission.enter("replicate")
+        audit = await admission.enter("verify")
+
+        with pytest.raises(ServerBusy):
+            await admission.enter("replicate")
+
+        admission.leave(audit)
+        admission.leave(stream)
+        admission.leave(await admission.enter("replicate"))
+        assert admission.active == 0
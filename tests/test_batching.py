@@ -0,0 +1,72 @@
+"""
+Testes unitários para o agrupamento de escritas da MiniCoin.
+Testa a entrega dos resultados de cada lote e o esvaziamento no
+encerramento.
+"""
+
+import asyncio
+
+import pytest
+from minicoin.accounts import AccountRegistry
+from minicoin.batching import WriteBatcher
+
+
+class TestWriteBatcher:
+    """Testes para a classe WriteBatcher."""
+
+    @pytest.mark.asyncio
+    async def test_batch_delivers_individual_results(self):
+        """Testa que cada operação do lote recebe o seu resultado."""
+        account = AccountRegistry().create("alice", initial_deposit=10.0)
+        batcher = WriteBatcher(account, window=0.01)
+
+        results = await asyncio.gather(
+            batcher.submit("DEPOSIT", 5.0),
+            batcher.submit("WITHDRAW", 100.0),
+        )
+
+        assert [success for success, _, _ in results] == [True, False]
+        assert batcher.batches == 1
+        assert not batcher._flushes
+
+    @pytest.mark.asyncio
+    async def test_drain_applies_open_batch(self):
+        """Testa que drain aplica o lote em aberto e aguarda sua gravação."""
+        account = AccountRegistry().create("alice", initial_deposit=10.0)
+        batcher = WriteBatcher(account, window=60.0)
+        pending = asyncio.ensure_future(batcher.submit("DEPOSIT", 5.0))
+        await asyncio.sleep(0)
+
+        await batcher.drain()
+
+        assert account.ledger.get_balance() == 15.0
+        assert batcher.batches == 1
+        assert not batcher._flushes
+        assert (await pending)[0]
+
+    @pytest.mark.asyncio
+    async def test_bad_operation_does_not_fail_the_batch(self):
+        """Testa que uma operação inválida no lote afeta só o próprio resultado."""
+        account = AccountRegistry().create("alice", initial_deposit=10.0)
+        batcher = WriteBatcher(account, window=0.01)
+        apply_batch = account.ledger.apply_batch
+
+        def failing_apply_batch(operations, atomic=False):
+            if any(amount == 13.0 for _, amount in operations):
+                raise OSError("falha simulada")
+            return apply_batch(operations, atomic)
+
+        account.ledger.apply_batch = failing_apply_batch
+        results = await asyncio.gather(
+            batcher.submit("DEPOSIT", 5.0),
+            batcher.submit("DEPOSIT", 1e17),
+            batcher.submit("DEPOSIT", 13.0),
+            batcher.submit("WITHDRAW", 3.0),
+            return_exceptions=True,
+        )
+
+        assert results[0][0] is True
+        assert results[1][0] is False
+        assert isinstance(results[2], OSError)
+        assert results[3][0] is True
+        assert account.ledger.get_balance() == 12.0
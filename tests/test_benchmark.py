@@ -0,0 +1,85 @@
+"""
+Testes para o gerador de carga da MiniCoin.
+Testa a configuração da mistura de requisições, o cálculo de
+percentis e uma execução curta contra um servidor real.
+"""
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+from clients.benchmark import LoadGenerator, parse_mix, percentile
+from minicoin.server import MiniCoinServer
+
+
+@pytest_asyncio.fixture
+async def server():
+    """Fixture que cria e inicia um servidor de teste."""
+    test_server = MiniCoinServer(host="127.0.0.1", port=9996, owner="Bench", initial_deposit=1000.0)
+    server_task = asyncio.create_task(test_server.start())
+    await asyncio.sleep(0.5)
+    
+    yield test_server
+    
+    server_task.cancel()
+    try:
+        await server_task
+    except asyncio.CancelledError:
+        pass
+
+
+def test_parse_mix():
+    """Testa a leitura da mistura de requisições."""
+    assert parse_mix("deposit=3, balance=1") == {"deposit": 3.0, "balance": 1.0}
+    with pytest.raises(ValueError):
+        parse_mix("transfer=1")
+    with pytest.raises(ValueError):
+        parse_mix("deposit=0")
+
+
+def test_percentile():
+    """Testa o percentil pelo posto mais próximo."""
+    values = [float(v) for v in range(1, 101)]
+    
+    assert percentile(values, 0.50) == 50.0
+    assert percentile(values, 0.99) == 99.0
+    assert percentile(values, 0.999) == 100.0
+    assert percentile([], 0.5) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_closed_loop_run(server):
+    """Testa uma execução curta em laço fechado."""
+    generator = LoadGenerator("127.0.0.1", 9996, connections=2, duration=0.3,
+                              mix={"deposit": 1, "balance": 1}, seed=1)
+    report = await generator.run()
+    
+    assert report["mode"] == "closed-loop"
+    assert report["operations"] > 0
+    assert report["failures"] == 0
+    assert report["per_action"]["deposit"]["error"] == 0
+    assert report["latency_ms"]["p50"] <= report["latency_ms"]["p999"]
+
+
+@pytest.mark.asyncio
+async def test_open_loop_run(server):
+    """Testa uma execução curta em laço aberto."""
+    generator = LoadGenerator("127.0.0.1", 9996, connections=2, duration=0.3, rate=100, seed=1)
+    report = await generator.run()
+    
+    assert report["mode"] == "open-loop"
+    assert 20 <= report["operations"] <= 31
+
+
+@pytest.mark.asyncio
+async def test_binary_protocol_run(server):
+    """Testa uma execução curta pelo protocolo binário."""
+    generator = LoadGenerator("127.0.0.1", 9996, connections=2, duration=0.3,
+                              mix={"deposit": 1, "balance": 1, "history": 1}, seed=1,
+                              protocol="binary")
+    report = await generator.run()
+    
+    assert report["protocol"] == "binary"
+    assert report["operations"] > 0
+    assert report["failures"] == 0
+    assert all(counts["error"] == 0 for counts in report["per_action"].values())
@@ -0,0 +1,64 @@
+"""
+Testes unitários para o cache de respostas do servidor da MiniCoin.
+Testa a serialização com os campos de cada requisição, o descarte LRU
+e a invalidação por conta.
+"""
+
+import json
+
+from minicoin.cache import ResponseCache
+
+
+def response(balance: float) -> dict:
+    return {"status": "ok", "balance": balance, "request_id": 1,
+            "client_id": "c1", "id": "0001", "timestamp": "2024-01-01T00:00:00"}
+
+
+class TestResponseCache:
+    """Testes para a classe ResponseCache."""
+
+    def test_prepared_response_carries_request_fields(self):
+        """Testa que os bytes guardados recebem os campos da nova requisição."""
+        cache = ResponseCache()
+        key = ResponseCache.key("default", (1, 0, -1), "balance", {})
+        cache.put(key, response(10.0))
+
+        prepared = cache.get(key).prepare({"request_id": 7, "id": "0002"})
+
+        assert prepared.status == "ok"
+        assert json.loads(prepared.payload) == {"status": "ok", "balance": 10.0,
+                                                "request_id": 7, "id": "0002"}
+        assert cache.snapshot()["hits"] == 1
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Testa o descarte da entrada usada há mais tempo."""
+        cache = ResponseCache(max_entries=2)
+        keys = [ResponseCache.key("default", (i, 0, -1), "balance", {}) for i in range(3)]
+        cache.put(keys[0], response(1.0))
+        cache.put(keys[1], response(2.0))
+        cache.get(keys[0])
+        cache.put(keys[2], response(3.0))
+
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[0]) is not None
+        assert len(cache) == 2
+
+    def test_invalidate_drops_only_the_account(self):
+        """Testa que um append descarta apenas as respostas da conta."""
+        cache = ResponseCache()
+        default = ResponseCache.key("default", (1, 0, -1), "history", {"limit": 10})
+        other = ResponseCache.key("poupanca", (1, 0, -1), "history", {"limit": 10})
+        cache.put(default, response(1.0))
+        cache.put(other, response(2.0))
+
+        cache.invalidate("default")
+
+        assert cache.get(default) is None
+        assert cache.get(other) is not None
+
+    def test_params_order_does_not_change_key(self):
+        """Testa que a ordem dos parâmetros não muda a chave."""
+        first = ResponseCache.key("default", (1, 0, -1), "history", {"limit": 5, "from_index": 0})
+        second = ResponseCache.key("default", (1, 0, -1), "history", {"from_index": 0, "limit": 5})
+
+        assert first == second
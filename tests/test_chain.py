@@ -0,0 +1,109 @@
+"""
+Testes unitários para o armazenamento colunar da cadeia da MiniCoin.
+Testa a materialização sob demanda e a preservação exata dos campos.
+"""
+
+import dataclasses
+import pickle
+
+import pytest
+from minicoin.block import Block
+from minicoin.chain import ChainStore
+from minicoin.ledger import MiniCoinLedger
+
+
+def make_block(index, previous_hash, **overrides):
+    """Cria um bloco de teste com hash canônico."""
+    fields = dict(
+        index=index,
+        timestamp=f"2025-10-28T10:00:0{index}.123456",
+        operation="DEPOSIT" if index else "CREATE",
+        amount=10.0,
+        balance=10.0 * (index + 1),
+        owner="Test User",
+        previous_hash=previous_hash,
+        hash=f"{index:064x}",
+    )
+    fields.update(overrides)
+    return Block(**fields)
+
+
+class TestChainStore:
+    """Testes para a classe ChainStore."""
+
+    def test_round_trip(self):
+        """Testa que os blocos materializados são idênticos aos originais."""
+        chain = ChainStore("Test User")
+        blocks = [make_block(0, None)]
+        for i in range(1, 5):
+            blocks.append(make_block(i, blocks[-1].hash))
+        chain.extend(blocks)
+
+        assert len(chain) == 5
+        assert list(chain) == blocks
+        assert chain[-1] == blocks[-1]
+        assert chain[1:3] == blocks[1:3]
+        assert chain._irregular == {}
+
+    def test_irregular_fields_are_preserved(self):
+        """Testa blocos que não cabem no formato compacto."""
+        chain = ChainStore("Test User")
+        genesis = make_block(0, None, amount=100, balance=100,
+                             timestamp="2025-10-28T10:00:00+00:00", hash="abc123")
+        odd = make_block(1, "not-the-previous-hash", owner="Someone Else",
+                         operation="TRANSFER")
+        chain.extend([genesis, odd])
+
+        assert chain[0] == genesis
+        assert chain[1] == odd
+        assert type(chain[0].amount) is int
+
+    def test_setitem_keeps_following_link(self):
+        """Testa que substituir um bloco não altera o previous_hash seguinte."""
+        chain = ChainStore("Test User")
+        first = make_block(0, None)
+        second = make_block(1, first.hash)
+        chain.extend([first, second])
+
+        chain[0] = dataclasses.replace(first, hash=f"{99:064x}")
+
+        assert chain[0].hash == f"{99:064x}"
+        assert chain[1].previous_hash == first.hash
+
+        chain[0] = first
+        assert chain._irregular == {}
+
+    def test_segment_materializes_same_blocks(self):
+        """Testa que um trecho copiado preserva índices e encadeamento."""
+        chain = ChainStore("Test User")
+        blocks = [make_block(0, None)]
+        for i in range(1, 6):
+            blocks.append(make_block(i, blocks[-1].hash))
+        blocks[3] = make_block(3, "pinned", amount=7)
+        chain.extend(blocks)
+
+        part = pickle.loads(pickle.dumps(chain.segment(2, 5)))
+
+        assert part.first_index == 2
+        assert list(part) == blocks[2:5]
+
+    def test_index_out_of_range(self):
+        """Testa o acesso fora dos limites."""
+        chain = ChainStore("Test User")
+        with pytest.raises(IndexError):
+            chain[0]
+
+    def test_blocks_have_no_instance_dict(self):
+        """Testa que Block usa __slots__."""
+        assert not hasattr(make_block(0, None), "__dict__")
+
+    def test_ledger_uses_compact_columns(self):
+        """Testa que o ledger guarda poucos bytes por bloco."""
+        ledger = MiniCoinLedger("Test User", 100.0)
+        for _ in range(1000):
+            ledger.deposit(1.0)
+
+        assert ledger.chain.memory_usage() / len(ledger.chain) < 96
+        assert ledger.chain._irregular == {}
+        valid, _ = ledger.verify_integrity()
+        assert valid is True
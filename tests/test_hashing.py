@@ -0,0 +1,103 @@
+"""
+Testes unitários para o hash versionado dos blocos da MiniCoin.
+Testa a preimage binária, a verificação direto das colunas e a
+compatibilidade com blocos gravados nos formatos anteriores.
+"""
+
+import pytest
+from minicoin.block import BLOCK_VERSION, Block
+from minicoin.chain import ChainStore
+from minicoin.hashing import BINARY_VERSION, calculate_hash, first_invalid_hash
+from minicoin.ledger import MiniCoinLedger
+from minicoin.storage import BlockStore
+
+
+class TestBlockHashing:
+    """Testes para o formato binário e os formatos antigos."""
+
+    def test_new_blocks_use_binary_preimage(self):
+        """Testa que os blocos novos são da versão binária e recalculáveis."""
+        ledger = MiniCoinLedger("Alice", 100.0)
+        _, _, block = ledger.deposit(2.5)
+
+        assert block.version == BLOCK_VERSION == BINARY_VERSION
+        assert block.hash == calculate_hash(block.index, block.timestamp, block.operation,
+                                            block.amount, block.balance, block.owner,
+                                            block.previous_hash, block.version)
+        assert block.previous_hash == ledger.chain.hash_at(0)
+        assert ledger.chain.digest_at(1) == bytes.fromhex(block.hash)
+
+    def test_version_changes_the_hash(self):
+        """Testa que os mesmos campos têm hashes diferentes em cada versão."""
+        fields = (1, "2024-01-01T00:00:00", "DEPOSIT", 100, 200, "Alice", "ab" * 32)
+
+        hashes = {calculate_hash(*fields, version=version) for version in (2, 3, 4)}
+
+        assert len(hashes) == 3
+
+    def test_binary_preimage_rejects_irregular_fields(self):
+        """Testa os campos que não cabem na preimage binária."""
+        fields = dict(index=1, timestamp="2024-01-01T00:00:00", operation="DEPOSIT",
+                      amount=100, balance=200, owner="Alice", previous_hash=None)
+
+        with pytest.raises(ValueError):
+            calculate_hash(**dict(fields, timestamp="2024-01-01T00:00:00+00:00"))
+        with pytest.raises(ValueError):
+            calculate_hash(**dict(fields, operation="TRANSFER"))
+        with pytest.raises(TypeError):
+            calculate_hash(**dict(fields, amount=1.5))
+
+    def test_verification_reads_columns_only(self, monkeypatch):
+        """Testa que a verificação não materializa blocos binários."""
+        ledger = MiniCoinLedger("Bruno", 100.0)
+        for _ in range(20):
+            ledger.deposit(1.0)
+
+        materialized = []
+        original = ChainStore._materialize
+
+        def spy(self, index):
+            materialized.append(index)
+            return original(self, index)
+
+        monkeypatch.setattr(ChainStore, "_materialize", spy)
+        assert ledger.verify_integrity(full=True) == (True, "Blockchain integra")
+        # Só o genesis, para conferir o previous_hash None
+        assert materialized == [0]
+
+    def test_tampered_columns_are_detected(self):
+        """Testa que uma coluna alterada invalida o hash do bloco."""
+        ledger = MiniCoinLedger("Carla", 100.0)
+        for _ in range(5):
+            ledger.deposit(1.0)
+
+        ledger.chain._amounts[3] += 1
+
+        assert first_invalid_hash(ledger.chain) == 3
+        assert first_invalid_hash(ledger.chain.segment(2, 6)) == 3
+        assert ledger.verify_integrity() == (False, "Hash inválido no bloco 3")
+
+    def test_text_format_chain_still_verifies(self, tmp_path):
+        """Testa que blocos da versão 2 (texto) seguem válidos ao lado dos novos."""
+        store = BlockStore(tmp_path)
+        previous_hash = None
+        for index, (operation, amount, balance) in enumerate([("CREATE", 1000, 1000),
+                                                              ("DEPOSIT", 250, 1250)]):
+            timestamp = f"2024-01-01T00:00:0{index}"
+            block_hash = calculate_hash(index, timestamp, operation, amount, balance,
+                                        "Texto", previous_hash, version=2)
+            store.append(Block(index, timestamp, operation, amount, balance,
+                               "Texto", previous_hash, block_hash, version=2))
+            previous_hash = block_hash
+        store.close()
+
+        reopened = BlockStore(tmp_path)
+        ledger = MiniCoinLedger("Texto", store=reopened)
+        success, _, block = ledger.deposit(1.0)
+
+        assert success is True
+        assert block.version == BINARY_VERSION
+        assert block.previous_hash == previous_hash
+        assert [b.version for b in ledger.chain] == [2, 2, 3]
+        assert ledger.verify_integrity(full=True) == (True, "Blockchain integra")
+        reopened.close()
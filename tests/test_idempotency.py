@@ -0,0 +1,127 @@
+"""
+Testes unitários para a tabela de idempotência do servidor da MiniCoin.
+Testa a repetição com o resultado original, os conflitos de chave, as
+repetições concorrentes e os limites de tempo e tamanho.
+"""
+
+import asyncio
+
+import pytest
+from minicoin.idempotency import IdempotencyKeyReused, IdempotencyTable
+
+
+class Counter:
+    """Operação de teste que conta as execuções."""
+
+    def __init__(self, delay: float = 0.0):
+        self.calls = 0
+        self.delay = delay
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.calls
+
+
+class TestIdempotencyTable:
+    """Testes para a classe IdempotencyTable."""
+
+    @pytest.mark.asyncio
+    async def test_retry_returns_original_result(self):
+        """Testa que a repetição devolve o resultado sem executar de novo."""
+        table = IdempotencyTable()
+        operation = Counter()
+
+        first = await table.run(("default", "k1"), ("DEPOSIT", 10.0), operation)
+        retry = await table.run(("default", "k1"), ("DEPOSIT", 10.0), operation)
+        other = await table.run(("default", "k2"), ("DEPOSIT", 10.0), operation)
+
+        assert first == retry == 1
+        assert other == 2
+        assert table.snapshot()["replays"] == 1
+
+    @pytest.mark.asyncio
+    async def test_key_reused_with_other_amount_is_refused(self):
+        """Testa a recusa da mesma chave com outro valor."""
+        table = IdempotencyTable()
+        await table.run(("default", "k1"), ("DEPOSIT", 10.0), Counter())
+
+        with pytest.raises(IdempotencyKeyReused):
+            await table.run(("default", "k1"), ("DEPOSIT", 20.0), Counter())
+
+        assert table.conflicts == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_retries_wait_for_first_execution(self):
+        """Testa que repetições em andamento aguardam a primeira execução."""
+        table = IdempotencyTable()
+        operation = Counter(delay=0.05)
+
+        results = await asyncio.gather(*(
+            table.run(("default", "k1"), ("WITHDRAW", 5.0), operation) for _ in range(5)
+        ))
+
+        assert results == [1] * 5
+        assert operation.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_execution_releases_key(self):
+        """Testa que uma exceção libera a chave para a próxima tentativa."""
+        table = IdempotencyTable()
+
+        async def failing():
+            raise OSError("disk full")
+
+        with pytest.raises(OSError):
+            await table.run(("default", "k1"), ("DEPOSIT", 10.0), failing)
+
+        assert await table.run(("default", "k1"), ("DEPOSIT", 10.0), Counter()) == 1
+        assert len(table) == 1
+
+    @pytest.mark.asyncio
+    async def test_keys_are_bounded_by_ttl_and_size(self):
+        """Testa o descarte por tempo e pelo tamanho máximo."""
+        table = IdempotencyTable(ttl=0.05, max_entries=2)
+        operation = Counter()
+        for key in ("k1", "k2", "k3"):
+            await table.run(("default", key), ("DEPOSIT", 1.0), operation)
+
+        assert len(table) == 2
+        assert await table.run(("default", "k1"), ("DEPOSIT", 1.0), operation) == 4
+
+        await asyncio.sleep(0.06)
+        assert await table.run(("default", "k1"), ("DEPOSIT", 1.0), operation) == 5
+
+    @pytest.mark.asyncio
+    async def test_rejected_result_is_not_remembered(self):
+        """Testa que um resultado recusado libera a chave para a próxima tentativa."""
+        table = IdempotencyTable()
+        results = iter([(False, "Saldo insuficiente"), (True, "ok")])
+
+        async def withdraw():
+            return next(results)
+
+        def accepted(result):
+            return result[0]
+
+        first = await table.run(("default", "k1"), ("WITHDRAW", 5.0), withdraw, keep=accepted)
+        retry = await table.run(("default", "k1"), ("WITHDRAW", 5.0), withdraw, keep=accepted)
+        replay = await table.run(("default", "k1"), ("WITHDRAW", 5.0), withdraw, keep=accepted)
+
+        assert first == (False, "Saldo insuficiente")
+        assert retry == replay == (True, "ok")
+        assert table.replays == 1
+
+    @pytest.mark.asyncio
+    async def test_size_limit_keeps_pending_keys(self):
+        """Testa que o limite de tamanho não descarta uma chave em andamento."""
+        table = IdempotencyTable(max_entries=1)
+        slow = Counter(delay=0.05)
+
+        first = asyncio.ensure_future(table.run(("default", "k1"), ("DEPOSIT", 1.0), slow))
+        await asyncio.sleep(0)
+        await table.run(("default", "k2"), ("DEPOSIT", 1.0), Counter())
+        retry = await table.run(("default", "k1"), ("DEPOSIT", 1.0), slow)
+
+        assert await first == retry == 1
+        assert slow.calls == 1
@@ -7,8 +7,9 @@ import pytest
 import pytest_asyncio
 import asyncio
 import json
+from minicoin.admission import PRIORITY_BULK, PRIORITY_REPLICATION
 from minicoin.server import MiniCoinServer
-from clients.simulator import MiniCoinClient
+from clients.simulator import MiniCoinClient, MiniCoinPool
 
 
 @pytest_asyncio.fixture
@@ -93,6 +94,7 @@ async def test_deposit_transaction(server, client):
     
     assert response["status"] == "ok"
     assert response["balance"] == initial_balance + 50.0
+    assert response["balance_minor"] == 15000
     assert "block_index" in response
     assert "block_hash" in response
     
@@ -187,6 +189,29 @@ async def test_integrity_verification(server, client):
     await writer.wait_closed()
 
 
+@pytest.mark.asyncio
+async def test_full_integrity_verification(server, client):
+    """Testa a auditoria completa da blockchain."""
+    reader, writer = await client.connect()
+    
+    await client.deposit(reader, writer, 10.0)
+    incremental = await client.verify_integrity(reader, writer)
+    full = await client.verify_integrity(reader, writer, full=True)
+    
+    assert incremental["mode"] == "incremental"
+    assert full["mode"] == "full"
+    assert full["valid"] is True
+    assert full["verified_index"] == server.ledger.get_block_count() - 1
+    
+    # Sem --verify-workers o pedido paralelo cai na verificação serial
+    parallel = await client.verify_integrity(reader, writer, full=True, parallel=True)
+    assert parallel["valid"] is True
+    assert parallel["parallel"] is False
+    
+    writer.close()
+    await writer.wait_closed()
+
+
 @pytest.mark.asyncio
 async def test_multiple_sequential_transactions(server, client):
     """Testa múltiplas transações sequenciais."""
@@ -280,6 +305,388 @@ async def test_invalid_json_handling(server):
     await writer.wait_closed()
 
 
+@pytest.mark.asyncio
+async def test_pipelined_requests_in_one_segment(server):
+    """Testa várias requisições enviadas em um único write."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", 9999)
+    
+    payload = "".join(
+        json.dumps({"action": "deposit", "amount": 1.0, "id": f"p{i}"}) + "\n"
+        for i in range(20)
+    )
+    writer.write(payload.encode())
+    await writer.drain()
+    
+    responses = [json.loads(await reader.readline()) for _ in range(20)]
+    
+    assert sorted(r["id"] for r in responses) == sorted(f"p{i}" for i in range(20))
+    assert all(r["status"] == "ok" for r in responses)
+    assert server.ledger.get_balance() == 120.0
+    
+    writer.close()
+    await writer.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_client_pipeline_matches_ids(server, client):
+    """Testa o pipeline do cliente com respostas correlacionadas por id."""
+    reader, writer = await client.connect()
+    
+    responses = await client.pipeline(reader, writer, [
+        {"action": "deposit", "amount": 10.0},
+        {"action": "withdraw", "amount": 5.0},
+        {"action": "balance"},
+    ])
+    
+    assert [r["status"] for r in responses] == ["ok", "ok", "ok"]
+    assert responses[2]["balance"] == 105.0
+    
+    writer.close()
+    await writer.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_large_history_response(server, client):
+    """Testa respostas de histórico maiores que 4 KB."""
+    reader, writer = await client.connect()
+    
+    await client.pipeline(reader, writer, [
+        {"action": "deposit", "amount": 1.0} for _ in range(50)
+    ])
+    response = await client.get_history(reader, writer)
+    
+    assert response["status"] == "ok"
+    assert len(response["history"]) == 51
+    
+    writer.close()
+    await writer.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_paginated_history(server, client):
+    """Testa a paginação do histórico com cursor."""
+    reader, writer = await client.connect()
+    
+    await client.pipeline(reader, writer, [
+        {"action": "deposit", "amount": 1.0} for _ in range(9)
+    ])
+    
+    pages = []
+    response = await client.get_history(reader, writer, limit=4)
+    pages.append(response["history"])
+    while response["next_cursor"] is not None:
+        response = await client.get_history(reader, writer, cursor=response["next_cursor"], limit=4)
+        pages.append(response["history"])
+    
+    assert [len(page) for page in pages] == [4, 4, 2]
+    assert [b["index"] for page in pages for b in page] == list(range(10))
+    assert response["block_count"] == 10
+    
+    writer.close()
+    await writer.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_streaming_history(server, client):
+    """Testa o histórico em streaming, em vários frames."""
+    reader, writer = await client.connect()
+    
+    await client.pipeline(reader, writer, [
+        {"action": "deposit", "amount": 1.0} for _ in range(24)
+    ])
+    
+    chunks = [chunk async for chunk in client.stream_history(reader, writer, chunk_size=10, from_index=2)]
+    
+    assert [len(chunk) for chunk in chunks] == [10, 10, 3]
+    assert chunks[0][0]["index"] == 2
+    assert chunks[-1][-1]["index"] == 24
+    
+    # A conexão continua utilizável após o stream
+    response = await client.get_balance(reader, writer)
+    assert response["status"] == "ok"
+    
+    writer.close()
+    await writer.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_balance_at_and_range_summary(server, client):
+    """Testa as consultas de saldo passado e totais por intervalo."""
+    reader, writer = await client.connect()
+    
+    await client.deposit(reader, writer, 50.0)
+    await client.withdraw(reader, writer, 20.0)
+    
+    at_block = await client.balance_at(reader, writer, index=1)
+    at_time = await client.balance_at(reader, writer, timestamp=at_block["block_timestamp"])
+    summary = await client.range_summary(reader, writer, 1)
+    invalid = await client.range_summary(reader, writer, 5)
+    
+    assert at_block["balance"] == 150.0
+    assert at_time["block_index"] == 1
+    assert summary["deposited"] == 50.0
+    assert summary["withdrawn"] == 20.0
+    assert summary["closing_balance"] == 130.0
+    assert invalid["status"] == "error"
+    
+    writer.close()
+    await writer.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_get_block_by_index_and_hash(server, client):
+    """Testa a busca de um bloco pelo recibo (hash) e pelo índice."""
+    reader, writer = await client.connect()
+    
+    receipt = await client.deposit(reader, writer, 25.0)
+    by_hash = await client.get_block(reader, writer, block_hash=receipt["block_hash"])
+    by_index = await client.get_block(reader, writer, index=receipt["block_index"])
+    missing = await client.get_block(reader, writer, block_hash="00" * 32)
+    
+    assert by_hash["status"] == "ok"
+    assert by_hash["block"]["hash"] == receipt["block_hash"]
+    assert by_hash["block"] == by_index["block"]
+    assert by_hash["block"]["operation"] == "DEPOSIT"
+    assert missing["status"] == "error"
+
+    writer.close()
+    await writer.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_repeated_reads_are_served_from_cache(server, client):
+    """Testa o cache de respostas das consultas e a invalidação a cada depósito."""
+    reader, writer = await client.connect()
+
+    first = await client.get_balance(reader, writer)
+    second = await client.get_balance(reader, writer)
+    history = await client.get_history(reader, writer)
+    await client.get_history(reader, writer)
+
+    assert server.response_cache.hits == 2
+    assert second["balance"] == first["balance"] == 100.0
+    assert second["id"] != first["id"]
+    assert second["request_id"] == first["request_id"] + 1
+    assert len(history["history"]) == 1
+
+    await client.deposit(reader, writer, 10.0)
+    after = await client.get_balance(reader, writer)
+    history = await client.get_history(reader, writer)
+
+    assert after["balance"] == 110.0
+    assert len(history["history"]) == 2
+    assert server.response_cache.hits == 2
+
+    metrics = await client.get_metrics(reader, writer)
+    assert metrics["response_cache"]["hits"] == 2
+
+    writer.close()
+    await writer.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_idempotent_retries_do_not_duplicate_blocks(server, client):
+    """Testa que repetir uma escrita com a mesma chave devolve o bloco original."""
+    reader, writer = await client.connect()
+
+    first = await client.deposit(reader, writer, 25.0, idempotency_key="pagamento-1")
+    retry = await client.deposit(reader, writer, 25.0, idempotency_key="pagamento-1")
+    reused = await client.withdraw(reader, writer, 25.0, idempotency_key="pagamento-1")
+
+    assert first["status"] == retry["status"] == "ok"
+    assert retry["block_hash"] == first["block_hash"]
+    assert retry["block_index"] == first["block_index"] == 1
+    assert reused["status"] == "error"
+    assert server.ledger.get_block_count() == 2
+    assert server.ledger.get_balance() == 125.0
+
+    writer.close()
+    await writer.wait_closed()
+
+    binary = MiniCoinClient(host="127.0.0.1", port=9999, client_id="binary", protocol="binary")
+    reader, writer = await binary.connect()
+    first = await binary.withdraw(reader, writer, 5.0, idempotency_key="saque-1")
+    retry = await binary.withdraw(reader, writer, 5.0, idempotency_key="saque-1")
+
+    assert retry["block_hash"] == first["block_hash"]
+    assert server.ledger.get_balance() == 120.0
+    assert server.idempotency.replays == 2
+
+    writer.close()
+    await writer.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_streams_hold_admission_slot_until_finished(server):
+    """Testa que history em streaming e replicate ocupam a vaga até o fim do stream."""
+    for _ in range(5):
+        server.ledger.deposit(1.0)
+    admission = server.admission
+
+    stream = await server.process_request(json.dumps(
+        {"action": "history", "id": "h1", "stream": True, "chunk_size": 2}))
+    assert admission.active_by_priority[PRIORITY_BULK] == 1
+    frames = [frame async for frame in stream]
+    assert frames[-1]["done"] is True
+    assert admission.active == 0
+
+    replication = await server.process_request(json.dumps(
+        {"action": "replicate", "id": "r1", "from_index": 0, "heartbeat": 0.05}))
+    assert admission.active_by_priority[PRIORITY_REPLICATION] == 1
+    first = await replication.__anext__()
+    assert len(first["blocks"]) == 6
+    await replication.aclose()
+    assert admission.active == 0
+
+
+@pytest.mark.asyncio
+async def test_audit_does_not_block_other_requests(server, client):
+    """Testa que pings e páginas pequenas são respondidos durante uma auditoria."""
+    for _ in range(20):
+        server.ledger.apply_batch([("DEPOSIT", 1.0)] * 2000)
+    reader, writer = await client.connect()
+    ping_reader, ping_writer = await client.connect()
+    
+    audit = asyncio.create_task(client.verify_integrity(reader, writer, full=True))
+    await asyncio.sleep(0)
+    pong = await client.ping(ping_reader, ping_writer)
+    page = await client.get_history(ping_reader, ping_writer, from_index=100, limit=10)
+    answered_first = not audit.done()
+    result = await audit
+    
+    assert pong["message"] == "pong"
+    assert [block["index"] for block in page["history"]] == list(range(100, 110))
+    assert answered_first
+    assert result["valid"] is True
+    assert result["verified_index"] == 40000
+    assert server.offload.completed >= 1
+    
+    for w in (writer, ping_writer):
+        w.close()
+        await w.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_multiple_accounts(server, client):
+    """Testa contas independentes no mesmo servidor."""
+    reader, writer = await client.connect()
+    
+    created = await client.create_account(reader, writer, "bob", owner="Bob", initial_deposit=10.0)
+    duplicate = await client.create_account(reader, writer, "bob")
+    negative = await client.create_account(reader, writer, "eve", initial_deposit=-50.0)
+    
+    bob = MiniCoinClient("127.0.0.1", 9999, "bob-client", account="bob")
+    await bob.deposit(reader, writer, 5.0)
+    overdraft = await bob.withdraw(reader, writer, 50.0)
+    bob_balance = await bob.get_balance(reader, writer)
+    default_balance = await client.get_balance(reader, writer)
+    
+    assert created["status"] == "ok"
+    assert duplicate["status"] == "error"
+    assert negative["status"] == "error"
+    assert overdraft["status"] == "error"
+    assert bob_balance["account"] == "bob"
+    assert bob_balance["balance"] == 15.0
+    assert bob_balance["block_count"] == 2
+    assert default_balance["balance"] == 100.0
+    
+    writer.close()
+    await writer.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_unknown_account(server, client):
+    """Testa requisições para contas inexistentes."""
+    reader, writer = await client.connect()
+    
+    response = await client.send_request(reader, writer, "balance", account="ghost")
+    
+    assert response["status"] == "error"
+    assert "Unknown account" in response["message"]
+    
+    writer.close()
+    await writer.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_oversized_frame_rejected(server):
+    """Testa a rejeição de requisições maiores que o limite de frame."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", 9999)
+    
+    writer.write(b"{" + b" " * (server.max_frame_size + 10) + b"}\n")
+    await writer.drain()
+    
+    response = json.loads(await reader.readline())
+    
+    assert response["status"] == "error"
+    assert "maximum size" in response["message"]
+    assert await reader.readline() == b""
+    
+    writer.close()
+    await writer.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_binary_protocol(server):
+    """Testa as operações pelo protocolo binário negociado com hello."""
+    client = MiniCoinClient("127.0.0.1", 9999, "binary-client", protocol="binary")
+    reader, writer = await client.connect()
+    
+    deposit = await client.deposit(reader, writer, 12.34)
+    assert deposit["status"] == "ok"
+    assert deposit["balance_minor"] == 11234
+    assert deposit["block_hash"] == server.ledger.chain[-1].hash
+    
+    rejected = await client.withdraw(reader, writer, 1000.0)
+    assert rejected["status"] == "error"
+    assert "Saldo insuficiente" in rejected["message"]
+    
+    balance = await client.get_balance(reader, writer)
+    assert balance["balance"] == 112.34
+    assert balance["block_count"] == 2
+    
+    verify = await client.verify_integrity(reader, writer, full=True)
+    assert verify["valid"] is True
+    assert verify["verified_index"] == 1
+    
+    # Ações sem opcode próprio seguem em JSON encapsulado
+    history = await client.get_history(reader, writer)
+    assert len(history["history"]) == 2
+    chunks = [chunk async for chunk in client.stream_history(reader, writer, chunk_size=1)]
+    assert len(chunks) == 2
+    
+    responses = await client.pipeline(reader, writer, [
+        {"action": "deposit", "amount": 1.0},
+        {"action": "ping"},
+        {"action": "balance"},
+    ])
+    assert [r["status"] for r in responses] == ["ok", "ok", "ok"]
+    assert responses[2]["balance"] == 113.34
+    
+    writer.close()
+    await writer.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_hello_json_keeps_line_protocol(server, client):
+    """Testa que um hello pedindo JSON mantém o protocolo de linhas."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", 9999)
+    
+    writer.write(b'{"action": "hello", "protocol": "json"}\n')
+    writer.write(b'{"action": "ping", "id": "p1"}\n')
+    await writer.drain()
+    
+    hello = json.loads(await reader.readline())
+    ping = json.loads(await reader.readline())
+    
+    assert hello["protocol"] == "json"
+    assert ping["message"] == "pong"
+    assert ping["id"] == "p1"
+    
+    writer.close()
+    await writer.wait_closed()
+
+
 @pytest.mark.asyncio
 async def test_unknown_action(server, client):
     """Testa o tratamento de ação desconhecida."""
@@ -328,5 +735,326 @@ async def test_session_persistence(server, client):
     await writer2.wait_closed()
 
 
+@pytest.mark.asyncio
+async def test_group_commit_batches_writes(tmp_path):
+    """Testa o agrupamento de escritas concorrentes em lotes."""
+    test_server = MiniCoinServer(
+        host="127.0.0.1",
+        port=9997,
+        owner="Batch Test",
+        initial_deposit=10.0,
+        data_dir=str(tmp_path),
+        batch_window=0.05,
+        batch_max=100
+    )
+    
+    server_task = asyncio.create_task(test_server.start())
+    await asyncio.sleep(0.5)
+    
+    try:
+        client = MiniCoinClient("127.0.0.1", 9997, "batch-client")
+        reader, writer = await client.connect()
+        
+        operations = [{"action": "deposit", "amount": 1.0} for _ in range(10)]
+        operations.append({"action": "withdraw", "amount": 1000.0})
+        responses = await client.pipeline(reader, writer, operations)
+        
+        assert [r["status"] for r in responses] == ["ok"] * 10 + ["error"]
+        assert test_server.ledger.get_balance() == 20.0
+        assert test_server.batchers["default"].batches == 1
+        assert test_server.store.block_count == 11
+        
+        writer.close()
+        await writer.wait_closed()
+    finally:
+        server_task.cancel()
+        try:
+            await server_task
+        except asyncio.CancelledError:
+            pass
+
+
+@pytest.mark.asyncio
+async def test_periodic_snapshots_are_written_off_the_loop(tmp_path):
+    """Testa que os snapshots periódicos são gravados em segundo plano."""
+    test_server = MiniCoinServer(
+        host="127.0.0.1",
+        port=9990,
+        owner="Snapshot Test",
+        initial_deposit=10.0,
+        data_dir=str(tmp_path),
+        snapshot_interval=5
+    )
+    assert not test_server.ledger.auto_snapshot
+
+    server_task = asyncio.create_task(test_server.start())
+    await asyncio.sleep(0.5)
+
+    try:
+        client = MiniCoinClient("127.0.0.1", 9990, "snapshot-client")
+        reader, writer = await client.connect()
+
+        operations = [{"action": "deposit", "amount": 1.0} for _ in range(12)]
+        responses = await client.pipeline(reader, writer, operations)
+        assert [r["status"] for r in responses] == ["ok"] * 12
+
+        for _ in range(50):
+            if not test_server.snapshot_tasks:
+                break
+            await asyncio.sleep(0.05)
+
+        snapshots = test_server.ledger.snapshots.list()
+        assert snapshots
+        assert snapshots[-1][0] >= 10
+        assert test_server.ledger._verified_index >= snapshots[-1][0] - 1
+
+        writer.close()
+        await writer.wait_closed()
+    finally:
+        server_task.cancel()
+        try:
+            await server_task
+        except asyncio.CancelledError:
+            pass
+
+
+@pytest.mark.asyncio
+async def test_metrics_action(server, client):
+    """Testa as métricas por ação, retiradas rejeitadas e tamanho da cadeia."""
+    reader, writer = await client.connect()
+    await client.deposit(reader, writer, 10.0)
+    await client.withdraw(reader, writer, 1000.0)
+    await client.verify_integrity(reader, writer, full=True)
+
+    response = await client.get_metrics(reader, writer, prometheus=True)
+    metrics = response["metrics"]
+
+    assert response["status"] == "ok"
+    assert metrics["requests"]["deposit"] == {"ok": 1}
+    assert metrics["requests"]["withdraw"] == {"error": 1}
+    assert metrics["rejected_withdrawals"] == 1
+    assert metrics["latency_seconds"]["deposit"]["count"] == 1
+    assert metrics["verify_duration_seconds"]["full"]["count"] == 1
+    assert metrics["open_connections"] == 1
+    assert metrics["chain_length"] == {"default": 2}
+    assert 'minicoin_requests_total{action="deposit",status="ok"} 1' in response["text"]
+
+    writer.close()
+    await writer.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_metrics_http_listener():
+    """Testa o endpoint HTTP GET /metrics."""
+    test_server = MiniCoinServer(host="127.0.0.1", port=9996, owner="Metrics",
+                                 initial_deposit=10.0, metrics_port=9195)
+    server_task = asyncio.create_task(test_server.start())
+    await asyncio.sleep(0.5)
+
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", 9195)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        await writer.drain()
+        data = (await reader.read()).decode()
+        writer.close()
+
+        head, _, body = data.partition("\r\n\r\n")
+        assert head.startswith("HTTP/1.1 200 OK")
+        assert "version=0.0.4" in head
+        assert 'minicoin_chain_length{account="default"} 1' in body
+        assert "# TYPE minicoin_request_duration_seconds histogram" in body
+
+        reader, writer = await asyncio.open_connection("127.0.0.1", 9195)
+        writer.write(b"GET / HTTP/1.1\r\n\r\n")
+        await writer.drain()
+        assert (await reader.read()).startswith(b"HTTP/1.1 404")
+        writer.close()
+    finally:
+        server_task.cancel()
+        try:
+            await server_task
+        except asyncio.CancelledError:
+            pass
+
+
+@pytest.mark.asyncio
+async def test_admission_limits():
+    """Testa a recusa de conexões acima do limite e de requisições com a fila cheia."""
+    test_server = MiniCoinServer(host="127.0.0.1", port=9995, owner="Admission",
+                                 initial_deposit=10.0, max_connections=1,
+                                 max_active=1, queue_limit=1)
+    server_task = asyncio.create_task(test_server.start())
+    await asyncio.sleep(0.5)
+    client = MiniCoinClient(host="127.0.0.1", port=9995, client_id="admission")
+
+    try:
+        reader, writer = await client.connect()
+        await client.ping(reader, writer)
+        extra_reader, extra_writer = await asyncio.open_connection("127.0.0.1", 9995)
+        refused = json.loads(await extra_reader.readline())
+        assert refused["status"] == "busy"
+        assert await extra_reader.read() == b""
+        extra_writer.close()
+
+        # Com a única vaga ocupada, um balance espera e o seguinte é recusado
+        ticket = await test_server.admission.enter("deposit")
+        writer.write(b'{"action": "balance", "id": "a"}\n{"action": "balance", "id": "b"}\n')
+        await writer.drain()
+        busy = json.loads(await reader.readline())
+        test_server.admission.leave(ticket)
+        queued = json.loads(await reader.readline())
+
+        assert (busy["id"], busy["status"]) == ("b", "busy")
+        assert busy["retry_after"] > 0
+        assert (queued["id"], queued["status"]) == ("a", "ok")
+        assert test_server.metrics.rejected_connections == 1
+        writer.close()
+    finally:
+        server_task.cancel()
+        try:
+            await server_task
+        except asyncio.CancelledError:
+            pass
+
+
+@pytest.mark.asyncio
+async def test_read_only_replica():
+    """Testa uma réplica seguindo o primário, com escritas recusadas e atraso exposto."""
+    primary = MiniCoinServer(host="127.0.0.1", port=9994, owner="Primaria", initial_deposit=50.0)
+    replica = MiniCoinServer(host="127.0.0.1", port=9993, replica_of="127.0.0.1:9994",
+                             replica_accounts=["poupanca"])
+    primary_task = asyncio.create_task(primary.start())
+    await asyncio.sleep(0.3)
+    primary.ledger.deposit(10.0)
+    replica_task = asyncio.create_task(replica.start())
+    await asyncio.sleep(0.5)
+    primary_client = MiniCoinClient(host="127.0.0.1", port=9994, client_id="primary")
+    replica_client = MiniCoinClient(host="127.0.0.1", port=9993, client_id="replica")
+
+    try:
+        reader, writer = await primary_client.connect()
+        await primary_client.deposit(reader, writer, 15.0)
+        await primary_client.send_request(reader, writer, "create_account",
+                                          account="poupanca", initial_deposit=5.0)
+        # A conta ainda não existia no primário: a réplica tenta de novo após 1 s
+        for _ in range(30):
+            if "poupanca" in replica.accounts:
+                break
+            await asyncio.sleep(0.1)
+
+        replica_reader, replica_writer = await replica_client.connect()
+        balance = await replica_client.get_balance(replica_reader, replica_writer)
+        refused = await replica_client.deposit(replica_reader, replica_writer, 1.0)
+        verify = await replica_client.verify_integrity(replica_reader, replica_writer, full=True)
+        metrics = await replica_client.get_metrics(replica_reader, replica_writer)
+
+        assert replica.ledger.owner == "Primaria"
+        assert balance["balance"] == 75.0
+        assert balance["block_count"] == 3
+        assert refused["status"] == "error"
+        assert "Read-only replica" in refused["message"]
+        assert verify["valid"] is True
+        assert replica.accounts.get("poupanca").ledger.get_balance() == 5.0
+        assert metrics["replication"]["default"]["lag_blocks"] == 0
+        assert [b["hash"] for b in replica.ledger.get_history()] == \
+            [b["hash"] for b in primary.ledger.get_history()]
+
+        # Um replicate com hash anterior divergente é recusado
+        diverged = await primary_client.send_request(reader, writer, "replicate",
+                                                     from_index=1, previous_hash="00" * 32)
+        assert diverged["status"] == "error"
+
+        writer.close()
+        replica_writer.close()
+    finally:
+        for task in (replica_task, primary_task):
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+
+@pytest.mark.asyncio
+async def test_batch_action(server, client):
+    """Testa o lote com resultados por operação, o modo atômico e a validação."""
+    reader, writer = await client.connect()
+    
+    response = await client.batch(reader, writer, [
+        {"action": "deposit", "amount": 50.0},
+        {"action": "withdraw", "amount": 500.0},
+        {"action": "withdraw", "amount": 25.0},
+    ])
+    
+    assert response["status"] == "ok"
+    assert response["applied"] == 2
+    assert [r["status"] for r in response["results"]] == ["ok", "error", "ok"]
+    assert response["results"][2]["block_index"] == 2
+    assert response["balance"] == 125.0
+    assert response["head_index"] == 2
+    assert response["head_hash"] == server.ledger.chain.hash_at(-1)
+    
+    response = await client.batch(reader, writer, [
+        {"action": "deposit", "amount": 10.0},
+        {"action": "withdraw", "amount": 1000.0},
+    ], atomic=True)
+    
+    assert response["status"] == "error"
+    assert response["applied"] == 0
+    assert server.ledger.get_block_count() == 3
+    
+    response = await client.batch(reader, writer, [{"action": "transfer", "amount": 1.0}])
+    assert response["status"] == "error"
+    assert "position 0" in response["message"]
+    
+    writer.close()
+    await writer.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_pool_multiplexes_concurrent_calls(server):
+    """Testa muitas chamadas concorrentes distribuídas pelo pool."""
+    async with MiniCoinPool("127.0.0.1", 9999, size=3) as pool:
+        responses = await asyncio.gather(*(pool.deposit(1.0) for _ in range(30)))
+        balance = await pool.balance()
+
+    assert [r["status"] for r in responses] == ["ok"] * 30
+    assert len({r["block_index"] for r in responses}) == 30
+    assert balance["balance"] == 130.0
+    assert server.metrics.connections_total == 3
+
+
+@pytest.mark.asyncio
+async def test_pool_reconnects_and_times_out(server):
+    """Testa a reconexão automática e o timeout por requisição."""
+    async with MiniCoinPool("127.0.0.1", 9999, size=1) as pool:
+        assert (await pool.ping())["message"] == "pong"
+
+        # Derruba a conexão: a próxima chamada abre outra
+        pool._connections[0].writer.close()
+        await asyncio.sleep(0.1)
+        assert (await pool.ping())["message"] == "pong"
+        assert pool.reconnects == 1
+
+        with pytest.raises(asyncio.TimeoutError):
+            await pool.request("balance", timeout=0)
+        # A resposta atrasada é descartada sem afetar as próximas
+        assert (await pool.balance())["balance"] == 100.0
+
+
+def test_server_restart_with_data_dir(tmp_path):
+    """Testa que o servidor recupera a blockchain do disco ao reiniciar."""
+    first = MiniCoinServer(owner="Persistent", initial_deposit=100.0, data_dir=str(tmp_path))
+    first.ledger.deposit(25.0)
+    first.store.close()
+
+    second = MiniCoinServer(owner="Ignored", initial_deposit=0.0, data_dir=str(tmp_path))
+    
+    assert second.ledger.owner == "Persistent"
+    assert second.ledger.get_balance() == 125.0
+    assert second.ledger.get_block_count() == 2
+    second.store.close()
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v", "-s"])
@@ -3,7 +3,13 @@ Testes unitários para o módulo ledger da MiniCoin.
 Testa a funcionalidade do blockchain, validação de transações e integridade.
 """
 
+import dataclasses
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
+from minicoin.block import BLOCK_VERSION, MinorAmount
 from minicoin.ledger import Block, MiniCoinLedger
 
 
@@ -70,8 +76,9 @@ class TestMiniCoinLedger:
         genesis = ledger.chain[0]
         assert genesis.index == 0
         assert genesis.operation == "CREATE"
-        assert genesis.amount == 50.0
-        assert genesis.balance == 50.0
+        assert genesis.amount == 5000  # centavos
+        assert genesis.balance == 5000
+        assert genesis.version == BLOCK_VERSION
         assert genesis.owner == "Alice"
         assert genesis.previous_hash is None
         assert genesis.hash is not None
@@ -89,7 +96,7 @@ class TestMiniCoinLedger:
         assert ledger.get_balance() == 150.0
         assert len(ledger.chain) == 2
         assert block.operation == "DEPOSIT"
-        assert block.amount == 50.0
+        assert block.amount == 5000
     
     def test_deposit_negative_amount(self):
         """Testa depósito com valor negativo."""
@@ -125,7 +132,7 @@ class TestMiniCoinLedger:
         assert ledger.get_balance() == 70.0
         assert len(ledger.chain) == 2
         assert block.operation == "WITHDRAW"
-        assert block.amount == 30.0
+        assert block.amount == 3000
     
     def test_withdraw_insufficient_balance(self):
         """Testa retirada com saldo insuficiente."""
@@ -201,6 +208,67 @@ class TestMiniCoinLedger:
         # Todos os hashes devem ser únicos
         assert len(hashes) == len(set(hashes))
     
+    def test_apply_batch(self):
+        """Testa a aplicação de um lote contra o saldo corrente."""
+        ledger = MiniCoinLedger("Olga", 100.0)
+        
+        results = ledger.apply_batch([
+            ("WITHDRAW", 80.0),
+            ("WITHDRAW", 50.0),   # Rejeitada: saldo corrente é 20
+            ("DEPOSIT", 30.0),
+            ("WITHDRAW", 50.0),
+        ])
+        
+        assert [success for success, _, _ in results] == [True, False, True, True]
+        assert "insuficiente" in results[1][1].lower()
+        assert results[1][2] is None
+        assert ledger.get_balance() == 0.0
+        assert ledger.get_block_count() == 4
+        assert results[2][2].previous_hash == results[0][2].hash
+        assert ledger.verify_integrity()[0] is True
+    
+    def test_apply_batch_atomic(self):
+        """Testa que um lote atômico com uma falha não grava nenhum bloco."""
+        ledger = MiniCoinLedger("Otto", 100.0)
+        
+        results = ledger.apply_batch([("DEPOSIT", 10.0), ("WITHDRAW", 500.0),
+                                      ("DEPOSIT", 5.0)], atomic=True)
+        
+        assert [success for success, _, _ in results] == [False, False, False]
+        assert "insuficiente" in results[1][1].lower()
+        assert results[0][1] == "Lote rejeitado: operação 1 falhou"
+        assert ledger.get_block_count() == 1
+        assert ledger.get_balance() == 100.0
+        
+        results = ledger.apply_batch([("DEPOSIT", 10.0), ("WITHDRAW", 110.0)], atomic=True)
+        assert all(success for success, _, _ in results)
+        assert ledger.get_balance() == 0.0
+    
+    def test_minor_amount_keeps_precision(self):
+        """Testa que valores em centavos não passam por float."""
+        ledger = MiniCoinLedger("Otto", 0.0)
+        amount = 2 ** 53 + 1
+        
+        success, _, block = ledger.deposit(MinorAmount(amount))
+        
+        assert success
+        assert block.amount == amount
+        assert ledger.get_balance_minor() == amount
+        assert MiniCoinLedger.minor_amount(1.5) == 150
+    
+    def test_amount_above_int64_is_rejected(self):
+        """Testa a rejeição de valores que não cabem em 64 bits, item a item."""
+        ledger = MiniCoinLedger("Otto", 0.0)
+        
+        results = ledger.apply_batch([("DEPOSIT", 1.0), ("DEPOSIT", 1e17), ("DEPOSIT", 2.0)])
+        
+        assert [success for success, _, _ in results] == [True, False, True]
+        assert "limite" in results[1][1]
+        assert ledger.get_block_count() == 3
+        assert ledger.get_balance() == 3.0
+        assert ledger.deposit(MinorAmount(2 ** 63 - 300))[0] is False
+        assert ledger.deposit(MinorAmount(2 ** 63 - 301))[0] is True
+    
     def test_get_history(self):
         """Testa a obtenção do histórico."""
         ledger = MiniCoinLedger("Laura", 100.0)
@@ -216,6 +284,27 @@ class TestMiniCoinLedger:
         assert history[1]["operation"] == "DEPOSIT"
         assert history[2]["operation"] == "WITHDRAW"
     
+    def test_get_history_page(self):
+        """Testa a obtenção de uma página do histórico."""
+        ledger = MiniCoinLedger("Laura", 100.0)
+        for _ in range(5):
+            ledger.deposit(1.0)
+        
+        page = ledger.get_history(from_index=2, limit=3)
+        
+        assert [entry["index"] for entry in page] == [2, 3, 4]
+        assert ledger.get_history(from_index=10) == []
+    
+    def test_iter_history_chunks(self):
+        """Testa a geração do histórico em trechos."""
+        ledger = MiniCoinLedger("Laura", 100.0)
+        for _ in range(6):
+            ledger.deposit(1.0)
+        
+        chunks = list(ledger.iter_history(chunk_size=3))
+        
+        assert [len(chunk) for chunk in chunks] == [3, 3, 1]
+    
     def test_get_block_count(self):
         """Testa a contagem de blocos."""
         ledger = MiniCoinLedger("Mike", 100.0)
@@ -271,6 +360,355 @@ class TestMiniCoinLedger:
         assert ledger.get_balance() == 50.0
 
 
+class TestPointInTimeQueries:
+    """Testes para as consultas de saldo passado e totais por intervalo."""
+
+    def test_balance_at_index(self):
+        """Testa o saldo em um bloco específico."""
+        ledger = MiniCoinLedger("Paula", 100.0)
+        ledger.deposit(50.0)
+        ledger.withdraw(30.0)
+
+        assert ledger.balance_at(index=1)["balance"] == 150.0
+        assert ledger.balance_at(index=-1)["balance"] == 120.0
+        with pytest.raises(IndexError):
+            ledger.balance_at(index=10)
+        with pytest.raises(ValueError):
+            ledger.balance_at()
+
+    def test_balance_at_timestamp(self):
+        """Testa o saldo vigente em um instante."""
+        ledger = MiniCoinLedger("Rita", 100.0)
+        ledger.deposit(50.0)
+        ledger.withdraw(30.0)
+        timestamps = [block.timestamp for block in ledger.chain]
+
+        assert ledger.balance_at(timestamp=timestamps[1])["index"] == 1
+        assert ledger.balance_at(timestamp="2999-01-01T00:00:00")["balance"] == 120.0
+        with pytest.raises(ValueError):
+            ledger.balance_at(timestamp="2000-01-01T00:00:00")
+
+    def test_range_summary(self):
+        """Testa os totais entre dois blocos."""
+        ledger = MiniCoinLedger("Sara", 100.0)
+        for operation, amount in [("deposit", 50.0), ("withdraw", 30.0),
+                                  ("deposit", 20.0), ("withdraw", 40.0)]:
+            getattr(ledger, operation)(amount)
+
+        summary = ledger.range_summary(2, 3)
+        assert summary["deposited"] == 20.0
+        assert summary["withdrawn"] == 30.0
+        assert summary["opening_balance"] == 150.0
+        assert summary["closing_balance"] == 140.0
+
+        whole = ledger.range_summary(0)
+        assert whole["net"] == whole["closing_balance"] - 100.0
+        with pytest.raises(IndexError):
+            ledger.range_summary(3, 2)
+
+    def test_get_block_by_hash(self):
+        """Testa a busca de blocos pelo hash, inclusive os criados depois da primeira busca."""
+        ledger = MiniCoinLedger("Tais", 100.0)
+        _, _, first = ledger.deposit(50.0)
+
+        assert ledger.get_block(block_hash=first.hash)["index"] == 1
+        _, _, second = ledger.withdraw(30.0)
+        assert ledger.get_block(block_hash=second.hash) == ledger.get_block(index=-1)
+        assert ledger.get_block(index=0)["operation"] == "CREATE"
+        with pytest.raises(IndexError):
+            ledger.get_block(block_hash="ab" * 32)
+        with pytest.raises(IndexError):
+            ledger.get_block(index=3)
+        with pytest.raises(ValueError):
+            ledger.get_block()
+
+
+class TestIncrementalVerification:
+    """Testes para a verificação incremental com checkpoints."""
+
+    def test_incremental_advances_watermark(self):
+        """Testa que a marca d'água avança após cada verificação."""
+        ledger = MiniCoinLedger("Uma", 100.0)
+        assert ledger.verified_index == -1
+
+        ledger.deposit(10.0)
+        valid, _ = ledger.verify_integrity(full=False)
+        assert valid is True
+        assert ledger.verified_index == 1
+
+        ledger.withdraw(5.0)
+        valid, _ = ledger.verify_integrity(full=False)
+        assert valid is True
+        assert ledger.verified_index == 2
+
+    def test_checkpoints_are_emitted_periodically(self):
+        """Testa a emissão de checkpoints a cada intervalo."""
+        ledger = MiniCoinLedger("Victor", 100.0, checkpoint_interval=3)
+
+        for _ in range(7):
+            ledger.deposit(1.0)
+        valid, _ = ledger.verify_integrity(full=False)
+
+        assert valid is True
+        assert [cp.index for cp in ledger.checkpoints] == [3, 6]
+
+    def test_incremental_detects_new_tampered_block(self):
+        """Testa que blocos novos adulterados são detectados."""
+        ledger = MiniCoinLedger("Wendy", 100.0)
+        ledger.deposit(10.0)
+        ledger.verify_integrity(full=False)
+
+        ledger.deposit(20.0)
+        ledger.chain[-1] = dataclasses.replace(ledger.chain[-1], amount=999.0)
+
+        valid, message = ledger.verify_integrity(full=False)
+        assert valid is False
+        assert "bloco 2" in message
+
+    def test_full_audit_detects_old_tampered_block(self):
+        """Testa que a auditoria completa detecta blocos antigos adulterados."""
+        ledger = MiniCoinLedger("Xavier", 100.0)
+        ledger.deposit(10.0)
+        ledger.deposit(20.0)
+        ledger.deposit(30.0)
+        ledger.verify_integrity(full=False)
+
+        ledger.chain[1] = dataclasses.replace(ledger.chain[1], amount=999.0)
+
+        valid, message = ledger.verify_integrity(full=True)
+        assert valid is False
+        assert "bloco 1" in message
+        assert ledger.verified_index == 0
+
+    def test_forged_checkpoint_is_rejected(self):
+        """Testa a rejeição de checkpoints com assinatura inválida."""
+        ledger = MiniCoinLedger("Yara", 100.0, checkpoint_interval=2)
+        ledger.deposit(10.0)
+        ledger.deposit(10.0)
+        ledger.verify_integrity(full=False)
+
+        forged = ledger.checkpoints[-1]
+        ledger.checkpoints[-1] = dataclasses.replace(forged, signature="00" * 32)
+
+        valid, message = ledger.verify_integrity(full=False)
+        assert valid is False
+        assert "checkpoint" in message.lower()
+
+    def test_detached_verification_is_merged_back(self):
+        """Testa a verificação de uma cópia enquanto a cadeia original cresce."""
+        ledger = MiniCoinLedger("Zeca", 100.0, checkpoint_interval=2)
+        for _ in range(4):
+            ledger.deposit(1.0)
+
+        detached = ledger.detached_copy()
+        ledger.deposit(1.0)
+        assert detached.verify_integrity(full=True) == (True, "Blockchain integra")
+        assert len(detached.chain) == 5
+        ledger.merge_verification(detached)
+
+        assert ledger.verified_index == 4
+        assert [cp.index for cp in ledger.checkpoints] == [2, 4]
+        assert ledger.verify_integrity(full=False) == (True, "Blockchain integra")
+        assert ledger.verified_index == 5
+
+    def test_detached_result_ignored_after_replacement(self):
+        """Testa que o resultado não é adotado se o bloco verificado mudou."""
+        ledger = MiniCoinLedger("Zilda", 100.0)
+        ledger.deposit(10.0)
+
+        detached = ledger.detached_copy()
+        detached.verify_integrity(full=True)
+        ledger.chain[1] = dataclasses.replace(ledger.chain[1], hash="ff" * 32)
+        ledger.merge_verification(detached)
+
+        assert ledger.verified_index == -1
+
+    def test_history_pages_while_appending(self):
+        """Testa páginas de histórico lidas em outra thread durante depósitos."""
+        ledger = MiniCoinLedger("Zilda", 100.0)
+        errors = []
+        pages = 0
+        done = threading.Event()
+
+        def reader():
+            nonlocal pages
+            while not done.is_set():
+                stop = len(ledger.chain)
+                try:
+                    # Sem stop, o tamanho é lido nesta thread
+                    ledger.get_history(max(0, len(ledger.chain) - 20))
+                    page = ledger.get_history(max(0, stop - 20), stop=stop)
+                except IndexError as e:
+                    errors.append(e)
+                    continue
+                assert page[-1]["index"] == stop - 1
+                pages += 1
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        thread = threading.Thread(target=reader)
+        thread.start()
+        try:
+            for _ in range(20000):
+                ledger.deposit(1.0)
+        finally:
+            done.set()
+            thread.join()
+            sys.setswitchinterval(interval)
+
+        assert errors == []
+        assert pages > 0
+
+    def test_replicated_blocks_are_appended_verified(self):
+        """Testa uma réplica criada a partir do genesis do primário."""
+        primary = MiniCoinLedger("Zilda", 100.0)
+        primary.deposit(10.0)
+        primary.withdraw(30.0)
+
+        replica = MiniCoinLedger("ignorado", 0.0, genesis=primary.chain[0])
+        success, _ = replica.append_replicated(list(primary.chain)[1:])
+
+        assert success is True
+        assert replica.owner == "Zilda"
+        assert replica.get_balance() == 80.0
+        assert replica.chain.hash_at(-1) == primary.chain.hash_at(-1)
+        assert replica.verified_index == 2
+
+    def test_tampered_replicated_block_is_refused(self):
+        """Testa que um bloco adulterado recusa o trecho inteiro."""
+        primary = MiniCoinLedger("Zilda", 100.0)
+        primary.deposit(10.0)
+        primary.deposit(20.0)
+        replica = MiniCoinLedger("Zilda", 0.0, genesis=primary.chain[0])
+
+        blocks = list(primary.chain)[1:]
+        blocks[1] = dataclasses.replace(blocks[1], amount=2000.0)
+        success, message = replica.append_replicated(blocks)
+
+        assert success is False
+        assert "Hash inválido no bloco 2" in message
+        assert len(replica.chain) == 1
+
+
+class TestParallelVerification:
+    """Testes para a verificação paralela da cadeia."""
+
+    @pytest.fixture
+    def executor(self):
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            yield pool
+
+    def test_parallel_verify_valid_chain(self, executor):
+        """Testa a verificação paralela de uma cadeia íntegra."""
+        ledger = MiniCoinLedger("Alice", 100.0, checkpoint_interval=10)
+        for i in range(50):
+            ledger.deposit(1.0 + i)
+
+        valid, message = ledger.verify_integrity(workers=4, executor=executor)
+
+        assert valid is True
+        assert message == "Blockchain integra"
+        assert ledger.verified_index == 50
+        assert [cp.index for cp in ledger.checkpoints] == [10, 20, 30, 40, 50]
+
+    def test_parallel_verify_with_processes(self):
+        """Testa a verificação paralela em um pool de processos."""
+        ledger = MiniCoinLedger("Bruno", 100.0)
+        for _ in range(20):
+            ledger.deposit(1.0)
+
+        valid, _ = ledger.verify_integrity(workers=2)
+        assert valid is True
+
+    def test_parallel_verify_reports_first_tampered_block(self, executor):
+        """Testa que o primeiro bloco adulterado é reportado, como no modo serial."""
+        ledger = MiniCoinLedger("Carla", 100.0)
+        for _ in range(40):
+            ledger.deposit(1.0)
+        ledger.chain[30] = dataclasses.replace(ledger.chain[30], amount=999.0)
+        ledger.chain[12] = dataclasses.replace(ledger.chain[12], amount=999.0)
+
+        serial = ledger.verify_integrity()
+        parallel = ledger.verify_integrity(workers=4, executor=executor)
+
+        assert parallel == serial == (False, "Hash inválido no bloco 12")
+
+    def test_parallel_verify_detects_broken_link(self, executor):
+        """Testa que o encadeamento é conferido na passada final."""
+        ledger = MiniCoinLedger("Diego", 100.0)
+        for _ in range(10):
+            ledger.deposit(1.0)
+        # Bloco com hash recalculado corretamente, mas fora da cadeia
+        block = ledger.chain[5]
+        forged = dataclasses.replace(block, previous_hash="00" * 32)
+        forged = dataclasses.replace(forged, hash=ledger._calculate_hash(
+            forged.index, forged.timestamp, forged.operation, forged.amount,
+            forged.balance, forged.owner, forged.previous_hash))
+        ledger.chain[5] = forged
+
+        valid, message = ledger.verify_integrity(workers=4, executor=executor)
+
+        assert valid is False
+        assert message == "Encadeamento quebrado no bloco 5"
+        assert ledger.verify_integrity() == (valid, message)
+
+
+class TestFixedPoint:
+    """Testes para os valores inteiros em centavos e os blocos legados."""
+
+    def test_balance_arithmetic_is_exact(self):
+        """Testa que somas de décimos não acumulam erro de float."""
+        ledger = MiniCoinLedger("Ana", 0.0)
+        for _ in range(10):
+            ledger.deposit(0.1)
+
+        assert ledger.get_balance_minor() == 100
+        assert ledger.get_balance() == 1.0
+        assert ledger.range_summary(1)["deposited_minor"] == 100
+
+    def test_sub_cent_amount_is_rejected(self):
+        """Testa que valores abaixo de um centavo são rejeitados."""
+        ledger = MiniCoinLedger("Beto", 10.0)
+
+        success, message, _ = ledger.deposit(0.001)
+
+        assert success is False
+        assert "positivo" in message
+
+    def test_legacy_chain_is_migrated_in_place(self, tmp_path):
+        """Testa que uma cadeia legada (floats) é verificada e continua em centavos."""
+        from minicoin.ledger import calculate_hash
+        from minicoin.storage import BlockStore
+
+        store = BlockStore(tmp_path)
+        previous_hash = None
+        balance = 0.0
+        for index, (operation, amount) in enumerate([("CREATE", 10.1), ("DEPOSIT", 0.2),
+                                                     ("WITHDRAW", 0.3)]):
+            balance = amount if operation == "CREATE" else (
+                balance + amount if operation == "DEPOSIT" else balance - amount)
+            timestamp = f"2024-01-01T00:00:0{index}"
+            block_hash = calculate_hash(index, timestamp, operation, amount, balance,
+                                        "Legado", previous_hash, version=1)
+            store.append(Block(index, timestamp, operation, amount, balance,
+                               "Legado", previous_hash, block_hash))
+            previous_hash = block_hash
+        store.close()
+
+        reopened = BlockStore(tmp_path)
+        ledger = MiniCoinLedger("Outro", store=reopened)
+        assert [block.version for block in ledger.chain] == [1, 1, 1]
+        assert ledger.chain[2].balance == balance
+        assert ledger.get_balance_minor() == 1000
+
+        success, _, block = ledger.deposit(5.0)
+        assert success is True
+        assert block.version == BLOCK_VERSION
+        assert block.balance == 1500
+        assert ledger.verify_integrity(full=True) == (True, "Blockchain integra")
+        reopened.close()
+
+
 class TestEdgeCases:
     """Testes de casos extremos."""
     
@@ -0,0 +1,58 @@
+"""
+Testes unitários para o pipeline de logging da MiniCoin.
+Testa a amostragem de payloads, o formato JSON lines e o handler de fila.
+"""
+
+import json
+import logging
+import queue
+
+from minicoin.logutil import DeferredQueueHandler, JsonLinesFormatter, PayloadSampler
+
+
+def make_record(msg="Received from %s: %s", args=("addr", "payload")):
+    """Cria um LogRecord de teste."""
+    return logging.LogRecord("MiniCoinServer", logging.INFO, __file__, 1, msg, args, None)
+
+
+class TestPayloadSampler:
+    """Testes para a classe PayloadSampler."""
+
+    def test_full_rate_logs_everything(self):
+        sampler = PayloadSampler(1.0)
+        assert all(sampler.should_log() for _ in range(10))
+
+    def test_sampling_every_nth(self):
+        sampler = PayloadSampler(0.25)
+        decisions = [sampler.should_log() for _ in range(8)]
+        assert decisions == [True, False, False, False] * 2
+
+    def test_zero_rate_disables(self):
+        sampler = PayloadSampler(0.0)
+        assert not any(sampler.should_log() for _ in range(10))
+
+    def test_rate_limit(self):
+        sampler = PayloadSampler(1.0, max_per_second=3)
+        decisions = [sampler.should_log() for _ in range(10)]
+        assert sum(decisions) == 3
+
+
+class TestFormattingPipeline:
+    """Testes para o formatador JSON e o handler de fila."""
+
+    def test_json_lines_formatter(self):
+        line = JsonLinesFormatter().format(make_record())
+        entry = json.loads(line)
+
+        assert "\n" not in line
+        assert entry["level"] == "INFO"
+        assert entry["message"] == "Received from addr: payload"
+
+    def test_queue_handler_defers_formatting(self):
+        records = queue.SimpleQueue()
+        handler = DeferredQueueHandler(records)
+        handler.emit(make_record())
+
+        queued = records.get_nowait()
+        assert queued.msg == "Received from %s: %s"
+        assert queued.args == ("addr", "payload")
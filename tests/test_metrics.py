@@ -0,0 +1,74 @@
+"""
+Testes unitários para as métricas do servidor da MiniCoin.
+Testa os histogramas, o formato de exposição do Prometheus e a
+medição do atraso do event loop.
+"""
+
+import asyncio
+import time
+
+import pytest
+from minicoin.metrics import Histogram, ServerMetrics
+
+
+class TestHistogram:
+    """Testes para a classe Histogram."""
+
+    def test_cumulative_buckets(self):
+        """Testa as contagens cumulativas por limite superior."""
+        histogram = Histogram((0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+
+        assert histogram.cumulative() == [("0.1", 2), ("1", 3), ("+Inf", 4)]
+        assert histogram.total == pytest.approx(3.65)
+
+
+class TestServerMetrics:
+    """Testes para a classe ServerMetrics."""
+
+    def test_snapshot_groups_requests_by_action(self):
+        """Testa o agrupamento por ação e status."""
+        metrics = ServerMetrics()
+        metrics.observe_request("deposit", "ok", 0.001)
+        metrics.observe_request("deposit", "error", 0.002)
+        metrics.connection_opened()
+        metrics.connection_opened()
+        metrics.connection_closed()
+
+        snapshot = metrics.snapshot({"default": 3})
+
+        assert snapshot["requests"] == {"deposit": {"error": 1, "ok": 1}}
+        assert snapshot["latency_seconds"]["deposit"]["count"] == 2
+        assert snapshot["open_connections"] == 1
+        assert snapshot["connections_total"] == 2
+        assert snapshot["chain_length"] == {"default": 3}
+
+    def test_render_prometheus_text(self):
+        """Testa o formato de exposição, inclusive o escape de labels."""
+        metrics = ServerMetrics()
+        metrics.observe_request("withdraw", "error", 0.003)
+        metrics.rejected_withdrawals += 1
+        metrics.observe_verify("full", 0.2)
+
+        text = metrics.render({'conta "x"': 5})
+
+        assert 'minicoin_requests_total{action="withdraw",status="error"} 1' in text
+        assert 'minicoin_request_duration_seconds_bucket{action="withdraw",le="0.005"} 1' in text
+        assert 'minicoin_request_duration_seconds_bucket{action="withdraw",le="+Inf"} 1' in text
+        assert "minicoin_rejected_withdrawals_total 1" in text
+        assert 'minicoin_verify_duration_seconds_count{mode="full"} 1' in text
+        assert 'minicoin_chain_length{account="conta \\"x\\""} 5' in text
+        assert text.endswith("\n")
+
+    @pytest.mark.asyncio
+    async def test_loop_lag_is_measured(self):
+        """Testa que um handler bloqueando o loop aparece como lag."""
+        metrics = ServerMetrics()
+        monitor = asyncio.create_task(metrics.monitor_loop_lag(0.01))
+        await asyncio.sleep(0)
+        time.sleep(0.1)
+        await asyncio.sleep(0.05)
+        monitor.cancel()
+
+        assert metrics.loop_lag_max >= 0.05
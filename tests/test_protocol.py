@@ -0,0 +1,65 @@
+"""
+Testes unitários para o protocolo binário da MiniCoin.
+Testa a serialização dos frames e a conversão de valores.
+"""
+
+import asyncio
+
+import pytest
+from minicoin.protocol import (
+    OP_DEPOSIT, OP_JSON, STATUS_OK, ProtocolError, encode_request, encode_response,
+    from_minor, read_request, read_response, to_minor
+)
+
+
+def make_reader(data: bytes) -> asyncio.StreamReader:
+    """Cria um StreamReader já alimentado com `data`."""
+    reader = asyncio.StreamReader()
+    reader.feed_data(data)
+    reader.feed_eof()
+    return reader
+
+
+class TestProtocol:
+    """Testes para os frames binários."""
+
+    def test_amount_conversion(self):
+        """Testa a conversão entre MiniCoins e unidades mínimas."""
+        assert to_minor(12.34) == 1234
+        assert to_minor(0.1 + 0.2) == 30
+        assert from_minor(1234) == 12.34
+
+    @pytest.mark.asyncio
+    async def test_request_round_trip(self):
+        """Testa a serialização de uma requisição com conta e payload."""
+        data = encode_request(OP_DEPOSIT, 7, 1050, account="poupança")
+        data += encode_request(OP_JSON, 8, payload=b'{"action": "history"}')
+        reader = make_reader(data)
+
+        first = await read_request(reader, 1024)
+        second = await read_request(reader, 1024)
+
+        assert (first.opcode, first.request_id, first.amount, first.account) == \
+            (OP_DEPOSIT, 7, 1050, "poupança")
+        assert second.account is None
+        assert second.payload == b'{"action": "history"}'
+
+    @pytest.mark.asyncio
+    async def test_oversized_payload(self):
+        """Testa a rejeição de payloads acima do limite."""
+        reader = make_reader(encode_request(OP_JSON, 1, payload=b"x" * 100))
+        with pytest.raises(ProtocolError):
+            await read_request(reader, 10)
+
+    @pytest.mark.asyncio
+    async def test_response_round_trip(self):
+        """Testa a serialização de uma resposta com hash cru."""
+        digest = bytes(range(32))
+        reader = make_reader(encode_response(OP_DEPOSIT, STATUS_OK, 7, 11050, 3, digest))
+
+        response = await read_response(reader)
+
+        assert response.balance == 11050
+        assert response.block_index == 3
+        assert response.block_hash == digest
+        assert response.payload == b""
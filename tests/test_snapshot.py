@@ -0,0 +1,139 @@
+"""
+Testes unitários para os snapshots da cadeia da MiniCoin.
+Testa a gravação, a retenção e a reinicialização a partir do snapshot
+mais recente com reprocessamento apenas da cauda.
+"""
+
+import pytest
+from minicoin.accounts import AccountRegistry
+from minicoin.ledger import MiniCoinLedger
+from minicoin.snapshot import SnapshotManager
+from minicoin.storage import BlockStore
+
+
+def open_ledger(directory, interval=5, retention=2, owner="Alice", initial=100.0):
+    """Abre um ledger persistido com snapshots."""
+    store = BlockStore(directory)
+    snapshots = SnapshotManager(directory / "snapshots", interval, retention)
+    return MiniCoinLedger(owner, initial, store=store, snapshots=snapshots)
+
+
+class TestSnapshotManager:
+    """Testes para a classe SnapshotManager."""
+
+    def test_columns_round_trip(self, tmp_path):
+        """Testa que o snapshot reproduz a cadeia, inclusive campos irregulares."""
+        ledger = MiniCoinLedger("Alice", 100)
+        for i in range(10):
+            ledger.deposit(1.5 + i)
+        manager = SnapshotManager(tmp_path)
+
+        restored = manager.read(manager.write(ledger.chain))
+
+        assert list(restored) == list(ledger.chain)
+        assert type(restored[0].amount) is int
+        assert restored.totals_through(10) == ledger.chain.totals_through(10)
+
+    def test_periodic_snapshots_and_retention(self, tmp_path):
+        """Testa a gravação a cada intervalo e a remoção dos antigos."""
+        ledger = open_ledger(tmp_path, interval=5, retention=2)
+        for _ in range(16):
+            ledger.deposit(1.0)
+
+        assert [count for count, _ in ledger.snapshots.list()] == [10, 15]
+        ledger.store.close()
+
+    def test_restart_replays_only_the_tail(self, tmp_path, monkeypatch):
+        """Testa que a reinicialização só lê os blocos após o snapshot."""
+        ledger = open_ledger(tmp_path, interval=5)
+        for _ in range(12):
+            ledger.deposit(1.0)
+        ledger.store.close()
+
+        starts = []
+        original = BlockStore.iter_blocks
+
+        def spy(self, start=0):
+            starts.append(start)
+            return original(self, start)
+
+        monkeypatch.setattr(BlockStore, "iter_blocks", spy)
+        restored = open_ledger(tmp_path, interval=5)
+
+        assert starts == [10]
+        assert restored.get_balance() == 112.0
+        assert [b.hash for b in restored.chain] == [b.hash for b in ledger.chain]
+        assert restored.verified_index == 12
+        assert restored.verify_integrity(full=True)[0] is True
+        restored.store.close()
+
+    def test_corrupted_snapshot_falls_back(self, tmp_path):
+        """Testa que um snapshot corrompido é ignorado."""
+        ledger = open_ledger(tmp_path, interval=5, retention=3)
+        for _ in range(11):
+            ledger.deposit(1.0)
+        ledger.store.close()
+
+        _, newest = ledger.snapshots.list()[-1]
+        data = bytearray(newest.read_bytes())
+        data[-1] ^= 0xFF
+        newest.write_bytes(bytes(data))
+
+        restored = open_ledger(tmp_path, interval=5)
+        assert restored.get_block_count() == 12
+        assert restored.get_balance() == 111.0
+        restored.store.close()
+
+    def test_snapshot_ahead_of_store_is_ignored(self, tmp_path):
+        """Testa que snapshots com mais blocos que o armazenamento são ignorados."""
+        ledger = open_ledger(tmp_path, interval=0)
+        ledger.deposit(1.0)
+        ledger.store.close()
+
+        longer = MiniCoinLedger("Alice", 100.0)
+        for _ in range(5):
+            longer.deposit(1.0)
+        SnapshotManager(tmp_path / "snapshots").write(longer.chain)
+
+        manager = SnapshotManager(tmp_path / "snapshots")
+        assert manager.load_latest(2) is None
+
+        restored = open_ledger(tmp_path)
+        assert restored.get_block_count() == 2
+        restored.store.close()
+
+    def test_snapshot_diverging_from_store_is_ignored(self, tmp_path):
+        """Testa que um snapshot de outra cadeia, com o mesmo tamanho, é ignorado."""
+        ledger = open_ledger(tmp_path, interval=0)
+        for _ in range(4):
+            ledger.deposit(1.0)
+        ledger.store.close()
+
+        other = MiniCoinLedger("Alice", 100.0)
+        for _ in range(4):
+            other.deposit(500.0)
+        SnapshotManager(tmp_path / "snapshots").write(other.chain)
+
+        restored = open_ledger(tmp_path)
+        assert restored.get_block_count() == 5
+        assert restored.get_balance() == 104.0
+        restored.store.close()
+
+    def test_invalid_retention(self, tmp_path):
+        """Testa a validação dos parâmetros."""
+        with pytest.raises(ValueError):
+            SnapshotManager(tmp_path, retention=0)
+
+    def test_registry_writes_final_snapshot_on_close(self, tmp_path):
+        """Testa o snapshot final de cada conta ao fechar o registro."""
+        registry = AccountRegistry(str(tmp_path), snapshot_interval=1000)
+        registry.open_default("Alice", 100.0)
+        account = registry.create("savings", initial_deposit=10.0)
+        account.ledger.deposit(5.0)
+        registry.close()
+
+        assert [count for count, _ in account.ledger.snapshots.list()] == [2]
+
+        reopened = AccountRegistry(str(tmp_path), snapshot_interval=1000)
+        assert reopened.get("savings").ledger.get_balance() == 15.0
+        reopened.close()
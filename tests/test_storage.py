@@ -0,0 +1,156 @@
+"""
+Testes unitários para o armazenamento persistente da MiniCoin.
+Testa a gravação append-only, a recuperação após quedas e a
+reconstrução do ledger a partir do disco.
+"""
+
+import threading
+
+import pytest
+from minicoin.chain import ChainStore
+from minicoin.ledger import MiniCoinLedger
+from minicoin.storage import BlockStore, StorageError
+
+
+class TestBlockStore:
+    """Testes para a classe BlockStore."""
+
+    def test_ledger_survives_restart(self, tmp_path):
+        """Testa que a cadeia é reconstruída a partir do disco."""
+        store = BlockStore(tmp_path)
+        ledger = MiniCoinLedger("Alice", 100.0, store=store)
+        ledger.deposit(50.0)
+        ledger.withdraw(20.0)
+        store.close()
+
+        reopened = BlockStore(tmp_path)
+        restored = MiniCoinLedger("Outro Nome", 0.0, store=reopened)
+
+        assert restored.owner == "Alice"
+        assert restored.get_balance() == 130.0
+        assert restored.get_block_count() == 3
+        assert [b.hash for b in restored.chain] == [b.hash for b in ledger.chain]
+
+        restored.deposit(1.0)
+        assert restored.get_block_count() == 4
+        reopened.close()
+
+    def test_torn_tail_is_discarded(self, tmp_path):
+        """Testa que um registro incompleto no final é descartado."""
+        store = BlockStore(tmp_path)
+        ledger = MiniCoinLedger("Bob", 100.0, store=store)
+        ledger.deposit(10.0)
+        store.close()
+
+        segment = store.segments[-1][1]
+        with open(segment, "ab") as f:
+            f.write(b"\x00\x00\x01\x00garbage")
+
+        reopened = BlockStore(tmp_path)
+        assert len(reopened) == 2
+        restored = MiniCoinLedger("Bob", 0.0, store=reopened)
+        assert restored.get_balance() == 110.0
+        reopened.close()
+
+    def test_segment_rotation(self, tmp_path):
+        """Testa a rotação de segmentos e a leitura entre segmentos."""
+        store = BlockStore(tmp_path, segment_max_bytes=512)
+        ledger = MiniCoinLedger("Carol", 100.0, store=store)
+        for _ in range(20):
+            ledger.deposit(1.0)
+        store.close()
+
+        assert len(store.segments) > 1
+
+        reopened = BlockStore(tmp_path, segment_max_bytes=512)
+        blocks = list(reopened.iter_blocks(start=15))
+        assert [b.index for b in blocks] == list(range(15, 21))
+        reopened.close()
+
+    def test_sync_from_another_thread_during_rotation(self, tmp_path):
+        """Testa o fsync em outra thread enquanto blocos são gravados e segmentos giram."""
+        store = BlockStore(tmp_path, fsync_policy="interval", segment_max_bytes=512)
+        ledger = MiniCoinLedger("Carol", 100.0, store=store)
+        done = threading.Event()
+
+        def sync_loop():
+            while not done.is_set():
+                store.sync()
+
+        syncer = threading.Thread(target=sync_loop)
+        syncer.start()
+        try:
+            for _ in range(200):
+                ledger.deposit(1.0)
+        finally:
+            done.set()
+            syncer.join()
+        store.close()
+
+        assert len(store.segments) > 1
+        assert len(BlockStore(tmp_path, segment_max_bytes=512)) == 201
+
+    def test_corruption_before_tail_is_fatal(self, tmp_path):
+        """Testa que corrupção fora da cauda gera StorageError."""
+        store = BlockStore(tmp_path, segment_max_bytes=256)
+        ledger = MiniCoinLedger("Dave", 100.0, store=store)
+        for _ in range(10):
+            ledger.deposit(1.0)
+        store.close()
+
+        first_segment = store.segments[0][1]
+        data = bytearray(first_segment.read_bytes())
+        data[20] ^= 0xFF
+        first_segment.write_bytes(bytes(data))
+
+        with pytest.raises(StorageError):
+            BlockStore(tmp_path, segment_max_bytes=256)
+
+    @pytest.mark.parametrize("policy", ["always", "group", "interval"])
+    def test_fsync_policies(self, tmp_path, policy):
+        """Testa que todas as políticas de fsync persistem os blocos."""
+        store = BlockStore(tmp_path, fsync_policy=policy, group_size=3)
+        ledger = MiniCoinLedger("Eve", 100.0, store=store)
+        for _ in range(5):
+            ledger.deposit(1.0)
+        store.close()
+
+        assert len(BlockStore(tmp_path)) == 6
+
+    def test_invalid_fsync_policy(self, tmp_path):
+        """Testa a rejeição de políticas de fsync desconhecidas."""
+        with pytest.raises(ValueError):
+            BlockStore(tmp_path, fsync_policy="sometimes")
+
+    def test_mmap_reads_across_segments_and_growing_tail(self, tmp_path):
+        """Testa a leitura pelo índice de offsets, inclusive do segmento que cresce."""
+        store = BlockStore(tmp_path, segment_max_bytes=512)
+        ledger = MiniCoinLedger("Fabio", 100.0, store=store)
+        for _ in range(20):
+            ledger.deposit(1.0)
+
+        assert store.read_block(7) == ledger.chain[7]
+        assert [r["index"] for r in store.iter_records(3, 18)] == list(range(3, 18))
+
+        # O último segmento já mapeado cresce e continua legível
+        ledger.deposit(2.0)
+        assert store.read_block(21) == ledger.chain[21]
+        with pytest.raises(IndexError):
+            store.read_block(22)
+        store.close()
+
+    def test_history_is_read_from_the_store(self, tmp_path, monkeypatch):
+        """Testa que o histórico persistido vem do disco, idêntico ao da cadeia."""
+        store = BlockStore(tmp_path, segment_max_bytes=512)
+        ledger = MiniCoinLedger("Gil", 100.0, store=store)
+        for _ in range(10):
+            ledger.deposit(1.5)
+
+        materialize = ChainStore._materialize
+        monkeypatch.setattr(ChainStore, "_materialize", None)
+        history = ledger.get_history(2, 5)
+        monkeypatch.setattr(ChainStore, "_materialize", materialize)
+
+        assert history == [block.to_dict() for block in ledger.chain[2:7]]
+        assert [len(chunk) for chunk in ledger.iter_history(0, 4)] == [4, 4, 3]
+        store.close()